@@ -0,0 +1,74 @@
+"""Compare the optimization times with and without incremental evaluation.
+
+The problem is a CDS with flanks (8.5kb in total) with pattern, GC content
+and translation constraints, and codon optimization and GC content
+objectives. The default path (``incremental_evaluation = False``) evaluates
+the specifications fully at each iteration of the random searches, as in
+earlier releases, and should not be slower than the incremental path.
+
+Usage:
+
+    python benchmark_incremental_evaluation.py [N_REPEATS]
+"""
+
+import sys
+import time
+
+import numpy as np
+from dnachisel import (
+    DnaOptimizationProblem,
+    AvoidPattern,
+    EnforceGCContent,
+    EnforceTranslation,
+    CodonOptimize,
+    random_dna_sequence,
+    random_protein_sequence,
+    reverse_translate,
+)
+
+
+def create_cds_with_flanks_problem(incremental_evaluation):
+    protein = random_protein_sequence(2000, seed=123)
+    cds = reverse_translate(protein)
+    flank = random_dna_sequence(1250, seed=123)
+    sequence = flank + cds + flank
+    cds_location = (len(flank), len(flank) + len(cds))
+    problem = DnaOptimizationProblem(
+        sequence=sequence,
+        constraints=[
+            AvoidPattern("BsaI_site"),
+            AvoidPattern("BsmBI_site"),
+            AvoidPattern("9xA"),
+            EnforceGCContent(mini=0.3, maxi=0.7, window=50),
+            EnforceTranslation(location=cds_location),
+        ],
+        objectives=[
+            CodonOptimize(species="e_coli", location=cds_location),
+            EnforceGCContent(target=0.5, window=200),
+        ],
+        logger=None,
+    )
+    problem.incremental_evaluation = incremental_evaluation
+    return problem
+
+
+def time_optimization(incremental_evaluation):
+    problem = create_cds_with_flanks_problem(incremental_evaluation)
+    np.random.seed(123)
+    problem.resolve_constraints()
+    t0 = time.perf_counter()
+    problem.optimize()
+    return time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    n_repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    for incremental_evaluation in [False, True]:
+        durations = [
+            time_optimization(incremental_evaluation)
+            for _ in range(n_repeats)
+        ]
+        print(
+            "incremental_evaluation=%s: optimize() in %.1f-%.1fs"
+            % (incremental_evaluation, min(durations), max(durations))
+        )
@@ -46,6 +46,10 @@ class CircularDnaOptimizationProblem(DnaOptimizationProblem):
     initialization, resolve_constraints(), and optimize() work the same way.
     """
 
+    def independent_zones(self):
+        """Return None: circular problems are not decomposed."""
+        return None
+
     def _circularized_specs(self, specs, central_specs_only=False):
         L = len(self.sequence)
         new_specs = []
@@ -122,8 +126,10 @@ class CircularDnaOptimizationProblem(DnaOptimizationProblem):
     def all_constraints_pass(self, autopass=True):
         """Return whether the current problem sequence passes all constraints.
         """
-        evals = self.constraints_evaluations(autopass=autopass)
-        return evals.all_evaluations_pass()
+        circularized = self._circularized_view(
+            with_constraints=True, central_specs_only=False
+        )
+        return circularized.all_constraints_pass(autopass=autopass)
 
     def objectives_evaluations(self):
         circularized = self._circularized_view(
@@ -4,22 +4,29 @@ DnaOptimizationProblem is where the whole problem is defined: sequence,
 constraints, objectives.
 """
 
+import time
+
+import numpy as np
 from Bio.SeqRecord import SeqRecord
 from proglog import default_bar_logger
 from ..Specification.SpecificationSet import SpecificationSet
+from ..Specification.IncrementalEvaluator import FallbackEvaluator
 from ..biotools import sequences_differences_array
-from ..MutationSpace import MutationSpace
+from ..MutationSpace import MutationSpace, CompactMutationSpace
 from ..reports.optimization_reports import (
     write_optimization_report,
     write_no_solution_report,
 )
 from .NoSolutionError import NoSolutionError
+from .SequenceBuffer import SequenceBuffer
+from .SpecificationsIndex import SpecificationsIndex
 from . import mixins
 
 
 class DnaOptimizationProblem(
     mixins.ConstraintsSolverMixin,
     mixins.ObjectivesMaximizerMixin,
+    mixins.ProblemDecompositionMixin,
     mixins.RecordRepresentationMixin,
 ):
     """Problem specifications: sequence, constraints, optimization objectives.
@@ -40,6 +47,8 @@ class DnaOptimizationProblem(
     >>> )
     >>> problem.resolve_constraints()
     >>> problem.optimize()
+    >>> # Or, for problems made of independent parts (e.g. several genes):
+    >>> problem.resolve_and_optimize_by_parts()
     >>> print(problem.constraints_text_summary())
     >>> print(problem.objectives_text_summary())
 
@@ -70,6 +79,17 @@ class DnaOptimizationProblem(
       core DNA Chisel methods will create optimization problems with a provided
       mutation_space to save computing time.
 
+    random_seed
+      If provided, the problem uses its own random generator, seeded with this
+      seed (see ``set_random_seed``), instead of numpy's global random state.
+
+    compact_mutation_space
+      If True, the mutation space computed at initialization is a
+      CompactMutationSpace, which stores the possible mutations in numpy
+      arrays rather than in one MutationChoice object per nucleotide. This
+      saves a lot of memory and time for very long sequences (e.g. whole
+      chromosomes).
+
     Attributes
     ----------
 
@@ -94,6 +114,142 @@ class DnaOptimizationProblem(
       zone by [N1, N2...] nucleotides on each side, until resolution works.
       (by default, an extension of 0bp is tried, then 5bp.
 
+    incremental_evaluation
+      When True, the random searches use the specifications' incremental
+      evaluators (when available) to update scores from the mutated segments
+      only, instead of re-evaluating every specification after each mutation.
+      This is off by default: on the small local problems of most runs, a
+      full evaluation is as fast, and incremental evaluation mostly pays off
+      for specifications evaluated on long segments (the results are the
+      same either way).
+
+    exhaustive_search_order
+      Either "least_change" (default) or "gray_code". In "gray_code" mode,
+      the exhaustive searches iterate over the variants in an order where
+      exactly one mutation choice changes between consecutive variants (see
+      ``MutationSpace.gray_code_mutations``), and the sequence and the
+      specifications' incremental evaluators are updated in place. This is
+      faster, but disables the pruning of the "least_change" mode and may
+      find different solutions.
+
+    evaluation_batch_size
+      When above 1, the exhaustive and random searches generate candidate
+      sequences in batches of this size, and each specification scores a
+      whole batch at once (see ``Specification.evaluate_many``), which is
+      much faster for specifications running external programs (BLAST,
+      Bowtie...) or with vectorized evaluations (EnforceGCContent,
+      MaximizeCAI, AvoidPattern with DNA-notation patterns, see
+      ``Specification.scores_many``). In the random searches, each iteration
+      then draws a batch of random variants of the current sequence and keeps
+      the best one (steepest ascent, e.g. with a batch size of 256).
+
+    local_search_strategy
+      Strategy of the random searches optimizing the objectives (see
+      ``optimize_by_random_mutations``). Either "hill_climbing" (default,
+      only improving mutations are accepted), "simulated_annealing" (see
+      ``optimize_by_simulated_annealing``), "tabu_search" (see
+      ``optimize_by_tabu_search``), or a custom function ``f(problem)``
+      optimizing the problem's sequence.
+
+    annealing_temperatures
+      Start and end temperatures of the simulated annealing. The temperature
+      decreases geometrically over the ``max_random_iters`` iterations.
+      Alternatively, a function ``f(iteration, max_random_iters)`` returning
+      the temperature at each iteration.
+
+    tabu_tenure
+      In tabu searches, number of iterations during which the mutation
+      choices which have just been changed cannot be changed again.
+
+    tabu_neighborhood_size
+      In tabu searches, number of random moves evaluated at each iteration.
+
+    local_solutions_cache
+      A LocalSolutionsCache (None by default). When provided, the solutions
+      of the local problems created to resolve constraint breaches are stored
+      in the cache, and re-used (after verification) when an identical local
+      problem is met, for instance in a repeated part of the sequence. The
+      same cache can be given to several problems.
+
+    time_limit
+      Time limit, in seconds, of each call to ``resolve_constraints`` and
+      ``optimize``. When it is reached, the remaining breaches (or
+      under-optimal locations) are not treated: the problem keeps the best
+      sequence found so far and records the skipped locations in
+      ``skipped_locations``. Local searches in progress are not interrupted.
+
+    specification_time_limit
+      Time limit, in seconds, for the resolution (or optimization) of each
+      constraint (or objective), working like ``time_limit``.
+
+    skipped_locations
+      List of ``(role, specification, location)`` (where ``role`` is
+      "constraint" or "objective") of the locations which were not treated
+      because a time limit was reached. They are listed in the reports.
+
+    adaptive_search
+      When True, the local problems choose between exhaustive and random
+      searches by estimating the cost of their evaluations, instead of using
+      ``randomization_threshold`` (see ``use_exhaustive_search``), and the
+      hill-climbing random searches adapt ``mutations_per_iteration`` to the
+      rate of accepted mutations, every ``adaptive_search_window`` iterations
+      (see ``adapt_mutations_per_iteration``). These decisions are written in
+      the logger's logs (``problem.logger.logs``). They don't depend on
+      measured times, so results are reproducible.
+
+    breach_mutations_boost
+      When provided (e.g. 10), the random searches solving constraints draw
+      the mutations overlapping the current breach locations this many times
+      more often than the other mutations, instead of drawing all mutations
+      uniformly. The breach locations are updated each time mutations are
+      accepted (see ``breach_mutations_weights``).
+
+    random_search_chains
+      When above 1, each random search of the local problems runs this many
+      independent, differently seeded chains from the same sequence, and
+      keeps the first chain solving the constraints, or the chain with the
+      best objectives score (see ``resolve_constraints_by_random_chains`` and
+      ``optimize_by_random_chains``). The chains run in parallel if
+      ``parallel_workers`` is above 1.
+
+    parallel_workers
+      When above 1, the breaches of a constraint which can be split into
+      groups that don't interact are resolved in parallel, on a pool of this
+      many processes. The subproblems of ``resolve_and_optimize_by_parts``
+      and the chains of ``random_search_chains`` are also run on such a
+      pool. Results are reproducible (with ``np.random.seed`` or
+      ``set_random_seed``) but differ from the results of the default,
+      sequential resolution.
+
+    random_generator
+      The ``numpy.random.Generator`` drawing the random mutations of the
+      problem and of its local problems, set by ``set_random_seed``. If None
+      (default), numpy's global random state is used, and the results are
+      determined by ``np.random.seed``. The tasks run in parallel (see
+      ``parallel_workers``) get independent generators spawned from the
+      problem's seed, so their results don't depend on the number of workers
+      or on the other computations of the session (with a random generator,
+      independent breaches are always resolved by groups, even sequentially,
+      see ``resolve_constraint``).
+
+    max_merged_variants
+      Maximal number of variants of a mutation choice obtained by merging
+      overlapping nucleotide restrictions (e.g. of overlapping out-of-frame
+      coding sequences) when the mutation space is computed. Above this, a
+      ValueError reporting the number of variants is raised before they are
+      built (see ``MutationChoice.merge_with``). As the mutation space is
+      computed at initialization, change it on the class (or a subclass).
+
+    sequence_buffer
+      The SequenceBuffer holding the current sequence. The random searches
+      edit this buffer in place and roll back rejected mutations. The
+      ``sequence`` attribute is a (cached) string view of this buffer.
+
+    constraints_index, objectives_index
+      SpecificationsIndex of the constraints and objectives, built in
+      ``initialize()``, used to only localize the specifications which can
+      overlap a given location.
+
     Notes
     -----
 
@@ -111,6 +267,24 @@ class DnaOptimizationProblem(
     mutations_per_iteration = 2
     optimization_stagnation_tolerance = 100
     local_extensions = (0, 5)
+    incremental_evaluation = False
+    exhaustive_search_order = "least_change"
+    evaluation_batch_size = 1
+    local_search_strategy = "hill_climbing"
+    annealing_temperatures = (1.0, 0.001)
+    tabu_tenure = 10
+    tabu_neighborhood_size = 10
+    local_solutions_cache = None
+    time_limit = None
+    specification_time_limit = None
+    adaptive_search = False
+    adaptive_search_window = 20
+    breach_mutations_boost = None
+    random_search_chains = 1
+    parallel_workers = None
+    random_generator = None
+    random_seed_sequence = None
+    max_merged_variants = 10 ** 6
 
     def __init__(
         self,
@@ -119,6 +293,8 @@ class DnaOptimizationProblem(
         objectives=None,
         logger="bar",
         mutation_space=None,
+        random_seed=None,
+        compact_mutation_space=False,
     ):
         """Initialize"""
         if isinstance(sequence, SeqRecord):
@@ -136,8 +312,24 @@ class DnaOptimizationProblem(
             min_time_interval=0.2,
         )
         self.mutation_space = mutation_space
+        self.compact_mutation_space = compact_mutation_space
+        if random_seed is not None:
+            self.set_random_seed(random_seed)
         self.initialize()
 
+    @property
+    def sequence(self):
+        """Return the current sequence of the problem, as a string."""
+        return self.sequence_buffer.to_string()
+
+    @sequence.setter
+    def sequence(self, new_sequence):
+        """Set the current sequence of the problem."""
+        if hasattr(self, "sequence_buffer"):
+            self.sequence_buffer.replace(new_sequence)
+        else:
+            self.sequence_buffer = SequenceBuffer(new_sequence)
+
     def initialize(self):
         """Precompute specification sets, evaluations, and mutation space."""
 
@@ -168,23 +360,114 @@ class DnaOptimizationProblem(
             for objective in self.objectives
         ]
 
+        # INDEX THE SPECIFICATIONS BY LOCATION, FOR FASTER LOCALIZATIONS
+
+        self.constraints_index = SpecificationsIndex(self.constraints)
+        self.objectives_index = SpecificationsIndex(self.objectives)
+
         # INITIALIZE THE "BEFORE" CLASS ATTRIBUTES, USED IN REPORTS
 
         self.sequence_before = self.sequence
         self._constraints_before = None
         self._objectives_before = None
 
+        self.skipped_locations = []
+
         # INITIALIZE THE MUTATION SPACE
 
         if self.mutation_space is None:
-            self.mutation_space = MutationSpace.from_optimization_problem(self)
+            if self.compact_mutation_space:
+                space_class = CompactMutationSpace
+            else:
+                space_class = MutationSpace
+            self.mutation_space = space_class.from_optimization_problem(self)
             # If the original sequence is outside of the allowed mutations
             # space, replace the sequence by a sequence which complies with
             # the mutation space.
             self.sequence = self.mutation_space.constrain_sequence(
-                self.sequence
+                self.sequence, rng=self.random_generator
             )
 
+    def set_random_seed(self, seed):
+        """Give the problem its own random generator, seeded with the seed.
+
+        The random searches of the problem (and of its local problems) then
+        use this ``numpy.random.Generator`` instead of numpy's global random
+        state.
+
+        Parameters
+        ----------
+
+        seed
+          An integer, or a ``numpy.random.SeedSequence``.
+        """
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        self.random_seed_sequence = seed
+        self.random_generator = np.random.default_rng(seed)
+
+    def spawn_random_seeds(self, n_seeds):
+        """Return seeds for independent random streams (e.g. parallel tasks).
+
+        If the problem has its own random generator, the seeds are
+        SeedSequences spawned from the problem's seed. Otherwise, they are
+        integers drawn from numpy's global random state. Either way, use
+        ``seed_random_stream`` to seed a (copy of the) problem with a seed.
+        """
+        if self.random_seed_sequence is None:
+            return list(np.random.randint(0, 2 ** 31, n_seeds))
+        return self.random_seed_sequence.spawn(n_seeds)
+
+    def seed_random_stream(self, seed):
+        """Seed the random searches with a seed from ``spawn_random_seeds``.
+        """
+        if isinstance(seed, np.random.SeedSequence):
+            self.set_random_seed(seed)
+        else:
+            np.random.seed(seed)
+
+    def local_problem(self, constraints, mutation_space, objectives=None):
+        """Return a local problem sharing this problem's sequence and logger.
+
+        This is how the solvers create the local problems around breaches and
+        under-optimal locations. The local problem is an instance of the same
+        class, but it is built without running ``__init__`` and
+        ``initialize()``: the specifications provided must be initialized
+        already (typically they are localized versions of this problem's
+        specifications), and no new logger is created.
+
+        The local problem edits this problem's sequence buffer directly, so
+        there is no need to copy its sequence back into this problem.
+
+        Parameters
+        ----------
+
+        constraints
+          A list of (initialized) specifications.
+
+        mutation_space
+          The (localized) MutationSpace of the local problem.
+
+        objectives
+          A list of (initialized) specifications, or None.
+        """
+        problem = self.__class__.__new__(self.__class__)
+        problem.record = None
+        problem.sequence_buffer = self.sequence_buffer
+        problem.constraints = list(constraints)
+        problem.objectives = [] if objectives is None else list(objectives)
+        problem.logger = self.logger
+        problem.mutation_space = mutation_space
+        problem.constraints_index = SpecificationsIndex(problem.constraints)
+        problem.objectives_index = SpecificationsIndex(problem.objectives)
+        problem.sequence_before = self.sequence
+        problem._constraints_before = None
+        problem._objectives_before = None
+        problem.skipped_locations = []
+        problem.random_generator = self.random_generator
+        problem.random_seed_sequence = self.random_seed_sequence
+        return problem
+
     def _replace_sequence(self, new_sequence):
         """Replace the current sequence of the problem.
 
@@ -194,6 +477,196 @@ class DnaOptimizationProblem(
         """
         self.sequence = new_sequence
 
+    def specifications_evaluators(self, specifications):
+        """Return a list of incremental evaluators, one per specification.
+
+        Specifications which do not support incremental evaluation (or all
+        specifications, if ``self.incremental_evaluation`` is False) get a
+        FallbackEvaluator which re-evaluates the specification fully.
+        """
+        evaluators = []
+        for specification in specifications:
+            evaluator = None
+            if self.incremental_evaluation:
+                evaluator = specification.incremental_evaluator(self)
+            if evaluator is None:
+                evaluator = FallbackEvaluator(specification, self)
+            evaluators.append(evaluator)
+        return evaluators
+
+    @staticmethod
+    def _deadline_after(time_limit, deadline=None):
+        """Return the earliest of the deadline and of the time limit's end.
+
+        Deadlines are given in the ``time.monotonic()`` clock. None means
+        "no deadline".
+        """
+        if time_limit is None:
+            return deadline
+        new_deadline = time.monotonic() + time_limit
+        if deadline is None:
+            return new_deadline
+        return min(deadline, new_deadline)
+
+    @staticmethod
+    def _deadline_reached(deadline):
+        return (deadline is not None) and (time.monotonic() >= deadline)
+
+    def _skip_locations(self, role, specification, locations):
+        """Record locations left untreated because of a time limit."""
+        for location in locations:
+            self.skipped_locations.append((role, specification, location))
+
+    def use_exhaustive_search(self, specifications):
+        """Return whether the local search should be exhaustive (or random).
+
+        By default, the search is exhaustive when the size of the mutation
+        space is below the problem's ``randomization_threshold``.
+
+        If ``adaptive_search`` is True, the costs of a full evaluation of the
+        specifications, and of an (incremental) evaluation of a mutation of
+        ``mutations_per_iteration`` choices, are estimated as the number of
+        nucleotides read: the length of each specification's
+        ``evaluation_location`` (the whole sequence if None) for a full
+        evaluation, and at most the length of the mutated segments for an
+        incremental evaluator. The search is exhaustive if evaluating all the
+        variants of the mutation space should cost less than
+        ``max_random_iters`` iterations of random search. In Gray-code
+        exhaustive searches, variants are evaluated incrementally. The
+        estimates don't depend on measured times, so the decision is
+        reproducible. It is written in the logger's logs.
+        """
+        space_size = self.mutation_space.space_size
+        if not self.adaptive_search:
+            return space_size < self.randomization_threshold
+        specifications = [
+            spec
+            for spec in specifications
+            if not spec.enforced_by_nucleotide_restrictions
+        ]
+        choices = self.mutation_space.multichoices
+        mutated_length = sum(
+            choice.end - choice.start
+            for choice in choices[: self.mutations_per_iteration]
+        )
+        evaluation_cost = mutation_cost = 0
+        evaluators = self.specifications_evaluators(specifications)
+        for specification, evaluator in zip(specifications, evaluators):
+            location = specification.evaluation_location()
+            if location is None:
+                cost = len(self.sequence)
+            else:
+                cost = len(location)
+            evaluation_cost += cost
+            if not isinstance(evaluator, FallbackEvaluator):
+                cost = min(cost, mutated_length)
+            mutation_cost += cost
+        if self.exhaustive_search_order == "gray_code":
+            variant_cost = mutation_cost
+        else:
+            variant_cost = evaluation_cost
+        exhaustive_cost = space_size * variant_cost
+        random_cost = self.max_random_iters * mutation_cost
+        exhaustive = exhaustive_cost <= random_cost
+        self.logger.log(
+            "Local problem at %s: %s search (%d variants, estimated %.1e "
+            "nucleotides read for an exhaustive search, %.1e for a random "
+            "search)."
+            % (
+                "%d-%d" % self.mutation_space.choices_span,
+                "exhaustive" if exhaustive else "random",
+                space_size,
+                exhaustive_cost,
+                random_cost,
+            )
+        )
+        return exhaustive
+
+    def adapt_mutations_per_iteration(self, acceptance_rate):
+        """Adapt the number of mutations per iteration to an acceptance rate.
+
+        Following the "one-fifth success rule" of evolution strategies, the
+        random searches try more mutations per iteration when more than 1/5
+        of the iterations get accepted, and fewer mutations when less than
+        1/5 of the iterations get accepted. The number of mutations stays
+        between 1 and the number of mutation choices. Changes are written in
+        the logger's logs.
+        """
+        n_mutations = self.mutations_per_iteration
+        if acceptance_rate > 0.2:
+            n_mutations += 1
+        elif acceptance_rate < 0.2:
+            n_mutations -= 1
+        n_mutations = max(
+            1, min(n_mutations, len(self.mutation_space.multichoices))
+        )
+        if n_mutations != self.mutations_per_iteration:
+            self.logger.log(
+                "Acceptance rate %.2f: mutations per iteration %d => %d"
+                % (acceptance_rate, self.mutations_per_iteration, n_mutations)
+            )
+            self.mutations_per_iteration = n_mutations
+
+    def random_candidates(self, n_candidates, weights=None):
+        """Return a list of random variants of the current sequence.
+
+        Each variant has ``mutations_per_iteration`` random mutations from the
+        mutation space (drawn with the given ``weights``, see
+        ``MutationSpace.pick_random_mutations``). The problem's sequence is
+        left unchanged.
+        """
+        return [
+            self.mutation_space.apply_random_mutations(
+                n_mutations=self.mutations_per_iteration,
+                sequence=self.sequence,
+                rng=self.random_generator,
+                weights=weights,
+            )
+            for i in range(n_candidates)
+        ]
+
+    def apply_random_mutations(self, evaluators=(), weights=None):
+        """Mutate the sequence in place with ``mutations_per_iteration``
+        random mutations from the mutation space.
+
+        The mutations are logged in the sequence buffer and passed to the
+        provided incremental evaluators. Use ``commit_mutations`` or
+        ``rollback_mutations`` to accept or undo them. The mutations can be
+        drawn with ``weights`` (see ``MutationSpace.pick_random_mutations``).
+        """
+        mutations = self.mutation_space.pick_random_mutations(
+            n_mutations=self.mutations_per_iteration,
+            sequence=self.sequence_buffer,
+            rng=self.random_generator,
+            weights=weights,
+        )
+        self.apply_mutations(mutations, evaluators)
+
+    def apply_mutations(self, mutations, evaluators=()):
+        """Mutate the sequence in place with the given mutations.
+
+        The mutations, of the form ``[((start, end), "ATG"), ...]``, are
+        logged in the sequence buffer and passed to the provided incremental
+        evaluators. Use ``commit_mutations`` or ``rollback_mutations`` to
+        accept or undo them.
+        """
+        self.sequence_buffer.apply_mutations(mutations)
+        segments = [segment for segment, variant in mutations]
+        for evaluator in evaluators:
+            evaluator.apply_mutations(segments)
+
+    def commit_mutations(self, evaluators=()):
+        """Accept all mutations applied since the last commit."""
+        self.sequence_buffer.commit()
+        for evaluator in evaluators:
+            evaluator.commit()
+
+    def rollback_mutations(self, evaluators=()):
+        """Undo all mutations applied since the last commit."""
+        self.sequence_buffer.rollback()
+        for evaluator in evaluators:
+            evaluator.rollback()
+
     def sequence_edits_as_array(self):
         """Return an array [False, False, True...] where True indicates an edit
         (i.e. a change at this position between the original problem sequence
@@ -264,4 +737,15 @@ class DnaOptimizationProblem(
             file_path=file_path,
             file_content=file_content,
         )
+        skipped_constraints = [
+            location
+            for (role, spec, location) in self.skipped_locations
+            if role == "constraint"
+        ]
+        if len(skipped_constraints):
+            message = (
+                "Time limit reached: %d constraint breaches were not "
+                "resolved." % len(skipped_constraints)
+            )
+            return False, message, data
         return True, "Optimization successful.", data
@@ -0,0 +1,125 @@
+"""Define the LocalSolutionsCache class.
+
+Constructs often repeat the same parts (promoters, terminators, linkers...),
+so the same local problems (same local sequence, same specifications, same
+possible mutations) are solved again and again. The cache remembers the
+solutions of local problems, so that identical local problems found later
+(elsewhere in the sequence, or in other problems) are solved at once.
+"""
+
+from collections import OrderedDict
+import hashlib
+
+
+class LocalSolutionsCache:
+    """Least-recently-used cache of the solutions of local problems.
+
+    Local problems are identified by a key computed from their context (see
+    ``problem_key``), independently of their position in the sequence. When
+    a cached solution is re-used, it is only kept if the local problem's
+    constraints pass with it.
+
+    Examples
+    --------
+
+    >>> cache = LocalSolutionsCache(max_size=1000)
+    >>> for problem in problems:
+    >>>     # The cache can be shared by several problems
+    >>>     problem.local_solutions_cache = cache
+    >>>     problem.resolve_constraints()
+    >>> print (cache.hits, cache.misses)
+
+    Parameters
+    ----------
+
+    max_size
+      Maximal number of solutions in the cache. When the cache is full, the
+      least recently used solution is dropped.
+    """
+
+    def __init__(self, max_size=1000):
+        """Initialize."""
+        self.max_size = max_size
+        self.solutions = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def problem_key(problem):
+        """Return a key describing the local problem, and the key's origin.
+
+        The key is a hash of the subsequence read by the problem's
+        constraints (and covered by its mutation space), of the constraints'
+        labels and locations, and of the mutation space's choices, all
+        positions being relative to the start (origin) of that subsequence.
+        Returns ``(None, None)`` if some constraint reads a region of unknown
+        extent.
+        """
+        span = problem.mutation_space.choices_span
+        if span is None:
+            return None, None
+        start, end = span
+        for constraint in problem.constraints:
+            location = constraint.evaluation_location()
+            if location is None:
+                return None, None
+            start, end = min(start, location.start), max(end, location.end)
+        constraints = []
+        for constraint in problem.constraints:
+            location = getattr(constraint, "location", None)
+            if location is not None:
+                location = (
+                    location.start - start,
+                    location.end - start,
+                    location.strand,
+                )
+            constraints.append(
+                (
+                    constraint.label(with_location=False),
+                    constraint.is_focus,
+                    location,
+                )
+            )
+        choices = [
+            (
+                choice.start - start,
+                choice.end - start,
+                list(choice.sorted_variants),
+            )
+            for choice in problem.mutation_space.multichoices
+        ]
+        constraints = sorted(constraints, key=repr)
+        context = (problem.sequence[start:end], constraints, choices)
+        key = hashlib.sha1(repr(context).encode()).hexdigest()
+        return key, start
+
+    def apply_solution(self, problem, key, origin):
+        """Apply the cached solution of the key to the problem, if any.
+
+        Returns True if a solution was found and all the problem's constraints
+        pass with it. Otherwise, the problem's sequence is left unchanged and
+        False is returned.
+        """
+        if key not in self.solutions:
+            self.misses += 1
+            return False
+        self.solutions.move_to_end(key)
+        relative_start, subsequence = self.solutions[key]
+        start = origin + relative_start
+        end = start + len(subsequence)
+        sequence = problem.sequence
+        problem.sequence = sequence[:start] + subsequence + sequence[end:]
+        if all(c.passes(problem) for c in problem.constraints):
+            self.hits += 1
+            return True
+        problem.sequence = sequence
+        self.misses += 1
+        return False
+
+    def add_solution(self, problem, key, origin):
+        """Store the problem's current sequence as the solution of the key."""
+        start, end = problem.mutation_space.choices_span
+        self.solutions[key] = (start - origin, problem.sequence[start:end])
+        self.solutions.move_to_end(key)
+        while len(self.solutions) > self.max_size:
+            self.solutions.popitem(last=False)
@@ -0,0 +1,250 @@
+"""Define the SequenceBuffer class.
+
+SequenceBuffer is the mutable, byte-encoded sequence owned by a
+DnaOptimizationProblem. It supports in-place edits and transactional rollbacks
+so that the solvers don't have to copy the whole sequence at each iteration.
+"""
+
+import weakref
+
+import numpy as np
+
+
+class SequenceBuffer:
+    """Mutable ATGC sequence with in-place edits and an undo log.
+
+    The sequence is stored as a bytearray. Edits are applied in place and
+    recorded in an undo log, so that rejected mutations can be rolled back in
+    O(k) (k being the size of the edited segments) instead of O(L).
+
+    The string version of the sequence (which is what most specifications
+    evaluate) is only computed when asked for, and is cached until the next
+    edit. When an edit is rolled back, the string cached before the edit is
+    restored, so it does not need to be decoded again.
+
+    The buffer can also tell which regions were edited since some object (for
+    instance a constraint found passing) was "marked" with ``mark``, see
+    ``edited_since``. For this, the segments written while some objects are
+    marked are recorded in a journal (``edits``). Edits which are rolled back
+    before any new mark cancel out and are removed from the journal, and the
+    journal is compacted up to the oldest mark. To keep the journal short,
+    the marks older than ``max_journal_length`` edits are dropped (the objects
+    are then considered edited).
+
+    Examples
+    --------
+
+    >>> buffer = SequenceBuffer("ATGCATGC")
+    >>> buffer.apply_mutations([((0, 3), "TTT")])
+    >>> buffer.to_string()
+    'TTTCATGC'
+    >>> buffer.rollback()
+    >>> buffer.to_string()
+    'ATGCATGC'
+
+    Parameters
+    ----------
+
+    sequence
+      An ATGC string (upper case!).
+    """
+
+    __slots__ = [
+        "array",
+        "undo_log",
+        "edits",
+        "journal_start",
+        "marks",
+        "_last_mark",
+        "_string",
+    ]
+
+    max_journal_length = 1000
+
+    def __init__(self, sequence):
+        """Initialize."""
+        self.array = bytearray(sequence.encode())
+        self.undo_log = []
+        self.edits = []
+        self.journal_start = 0
+        self.marks = weakref.WeakKeyDictionary()
+        self._last_mark = 0
+        self._string = sequence
+
+    @property
+    def journal_end(self):
+        """Position, in the journal, of the next edit to be recorded."""
+        return self.journal_start + len(self.edits)
+
+    def to_string(self):
+        """Return the current sequence as a string (cached between edits)."""
+        if self._string is None:
+            self._string = self.array.decode()
+        return self._string
+
+    def as_array(self):
+        """Return a uint8 numpy view of the sequence (no copy is made).
+
+        The view reflects any later in-place edit of the buffer.
+        """
+        return np.frombuffer(self.array, dtype="uint8")
+
+    def replace(self, sequence):
+        """Replace the whole sequence. This clears the undo log.
+
+        If some objects are marked, the span of the differences between the
+        new sequence and the previous one is recorded in the journal.
+        """
+        if sequence is self._string:
+            # Typically, a local problem's sequence copied back into the
+            # problem sharing its buffer. Nothing changes.
+            self.undo_log = []
+            return
+        new_array = bytearray(sequence.encode())
+        # Without marks, there is no need to compare the sequences.
+        if len(self.marks) and (len(new_array) != len(self.array)):
+            self._record_edit(0, max(len(new_array), len(self.array)))
+        elif len(self.marks):
+            differences = np.flatnonzero(
+                np.frombuffer(new_array, dtype="uint8") != self.as_array()
+            )
+            if len(differences):
+                self._record_edit(differences[0], differences[-1] + 1)
+        self.array = new_array
+        self.undo_log = []
+        self._string = sequence
+
+    def apply_mutations(self, mutations):
+        """Apply mutations in place and record them in the undo log.
+
+        Parameters
+        ----------
+
+        mutations
+          A list ``[((start, end), "ATG"), ...]`` of segments and the
+          subsequences to write in these segments, as returned by
+          ``MutationSpace.pick_random_mutations``.
+        """
+        for (start, end), variant in mutations:
+            journal_position = self._record_edit(start, end)
+            self.undo_log.append(
+                (
+                    start,
+                    end,
+                    bytes(self.array[start:end]),
+                    self._string,
+                    journal_position,
+                )
+            )
+            self.array[start:end] = variant.encode()
+            self._string = None
+
+    def checkpoint(self):
+        """Return a marker of the current state, to be used with rollback."""
+        return len(self.undo_log)
+
+    def rollback(self, checkpoint=0):
+        """Undo all edits made since the given checkpoint (default: all)."""
+        while len(self.undo_log) > checkpoint:
+            start, end, previous, string, position = self.undo_log.pop()
+            self.array[start:end] = previous
+            self._string = string
+            if position is None:
+                continue
+            is_last_edit = position == self.journal_end - 1
+            if is_last_edit and (
+                position >= max(self.journal_start, self._last_mark)
+            ):
+                # No object was marked since the edit: it never happened.
+                self.edits.pop()
+            else:
+                self._record_edit(start, end)
+
+    def commit(self):
+        """Accept all edits made so far by clearing the undo log."""
+        self.undo_log = []
+
+    def mark(self, key):
+        """Remember that the object ``key`` was marked at this point.
+
+        See ``edited_since``. The object is only weakly referenced.
+        """
+        self.marks[key] = self._last_mark = self.journal_end
+
+    def unmark(self, key):
+        """Forget the mark of the object ``key``, if any."""
+        self.marks.pop(key, None)
+
+    def edited_since(self, key, start, end):
+        """Return whether segment [start, end] may have been written since the
+        object ``key`` was marked (True if the object is not marked)."""
+        position = self.marks.get(key)
+        if position is None:
+            return True
+        return any(
+            (edit_start < end) and (start < edit_end)
+            for edit_start, edit_end in self.edits[
+                position - self.journal_start :
+            ]
+        )
+
+    def _record_edit(self, start, end):
+        """Record an edit in the journal, if some objects are marked.
+
+        Returns the position of the edit in the journal, or None.
+        """
+        if len(self.marks) == 0:
+            # Nobody will look at the journal before the next mark.
+            self.journal_start = self.journal_end
+            self.edits = []
+            return None
+        if len(self.edits) >= self.max_journal_length:
+            self._compact_journal()
+        self.edits.append((start, end))
+        return self.journal_end - 1
+
+    def _compact_journal(self):
+        """Drop the journal entries which no mark refers to anymore.
+
+        The marks older than ``max_journal_length / 2`` edits are dropped
+        first, so the journal at most halves in size.
+        """
+        oldest_allowed = self.journal_end - self.max_journal_length // 2
+        for key, position in list(self.marks.items()):
+            if position < oldest_allowed:
+                del self.marks[key]
+        oldest = min(self.marks.values(), default=self.journal_end)
+        del self.edits[: oldest - self.journal_start]
+        self.journal_start = oldest
+
+    def __reduce__(self):
+        """Pickle the buffer as a new buffer with the same sequence.
+
+        The undo log and the marks (weak references to local objects) are
+        not kept, e.g. in the copies of problems sent to other processes.
+        """
+        return (self.__class__, (self.to_string(),))
+
+    def __getitem__(self, index):
+        """Return a subsequence (as a string) without decoding the sequence."""
+        if self._string is not None:
+            return self._string[index]
+        result = self.array[index]
+        if isinstance(index, slice):
+            return result.decode()
+        return chr(result)
+
+    def __len__(self):
+        """Return the length of the sequence."""
+        return len(self.array)
+
+    def __str__(self):
+        """Return the current sequence as a string."""
+        return self.to_string()
+
+    def __repr__(self):
+        """Represent."""
+        return "SequenceBuffer(%d bp, %d edits logged)" % (
+            len(self.array),
+            len(self.undo_log),
+        )
@@ -0,0 +1,72 @@
+"""Define the SpecificationsIndex class.
+
+SpecificationsIndex enables to quickly find the specifications of a problem
+which may have a non-None localization on a given location, without calling
+the ``localized`` method of every specification of the problem.
+"""
+
+from bisect import bisect_right
+
+import numpy as np
+
+
+class SpecificationsIndex:
+    """Sorted-array index of specifications by localization location.
+
+    Specifications whose ``localization_location()`` is known are sorted by
+    start. For a query location, a bisection gives the specifications starting
+    before the end of the location, and these are filtered (in numpy) by end.
+    Specifications with an unknown localization location are always returned.
+
+    Examples
+    --------
+
+    >>> index = SpecificationsIndex(problem.constraints)
+    >>> localized_constraints = [
+    >>>     cst.localized(location, problem=problem)
+    >>>     for cst in index.overlapping(location)
+    >>> ]
+
+    Parameters
+    ----------
+
+    specifications
+      A list of (initialized) specifications.
+    """
+
+    def __init__(self, specifications):
+        """Initialize."""
+        self.specifications = list(specifications)
+        self.always_included = []
+        indexed = []
+        for i, spec in enumerate(self.specifications):
+            location = spec.localization_location()
+            if location is None:
+                self.always_included.append(i)
+            else:
+                indexed.append((location.start, location.end, i))
+        indexed = sorted(indexed)
+        self.starts = [start for (start, end, i) in indexed]
+        self.ends = np.array([end for (start, end, i) in indexed], dtype=int)
+        self.positions = np.array(
+            [i for (start, end, i) in indexed], dtype=int
+        )
+
+    def overlapping(self, location):
+        """Return the specifications which may overlap the location.
+
+        These are all specifications whose localization location overlaps
+        (or touches) the given location, plus all specifications with an
+        unknown localization location. The specifications are returned in
+        the same order as in the original list.
+        """
+        n_candidates = bisect_right(self.starts, location.end)
+        candidates = self.positions[:n_candidates][
+            self.ends[:n_candidates] >= location.start
+        ]
+        positions = sorted(self.always_included + candidates.tolist())
+        return [self.specifications[i] for i in positions]
+
+    def __len__(self):
+        """Return the number of indexed specifications."""
+        return len(self.specifications)
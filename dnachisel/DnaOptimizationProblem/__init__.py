@@ -1,9 +1,15 @@
 from .NoSolutionError import NoSolutionError
+from .SequenceBuffer import SequenceBuffer
+from .SpecificationsIndex import SpecificationsIndex
+from .LocalSolutionsCache import LocalSolutionsCache
 from .DnaOptimizationProblem import DnaOptimizationProblem
 from .CircularDnaOptimizationProblem import CircularDnaOptimizationProblem
 
 __all__ = [
     "NoSolutionError",
+    "SequenceBuffer",
+    "SpecificationsIndex",
+    "LocalSolutionsCache",
     "DnaOptimizationProblem",
     "CircularDnaOptimizationProblem"
 ]
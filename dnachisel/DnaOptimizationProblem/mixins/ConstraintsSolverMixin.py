@@ -1,8 +1,19 @@
+import copy
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from proglog import default_bar_logger
+
+from ...biotools import sequences_differences_segments
 from ...Location import Location
+from ...Specification.Specification import Specification
 from ...Specification.SpecEvaluation import (
     ProblemConstraintsEvaluations,
 )
 from ..NoSolutionError import NoSolutionError
+from ..SequenceBuffer import SequenceBuffer
+from ..SpecificationsIndex import SpecificationsIndex
 
 
 class ConstraintsSolverMixin:
@@ -32,11 +43,41 @@ class ConstraintsSolverMixin:
         if len(self.constraints) == 0:
             return True
         return all(
-            c.evaluate(self).passes
+            self.constraint_passes(c)
             for c in self.constraints
             if (not autopass) or (not c.enforced_by_nucleotide_restrictions)
         )
 
+    def constraint_passes(self, constraint):
+        """Return whether the current problem sequence passes the constraint.
+
+        If the constraint passed when last checked, and no nucleotide of its
+        ``evaluation_location()`` has been edited since, the constraint is
+        not re-evaluated.
+        """
+        location = constraint.evaluation_location()
+        if location is not None:
+            if not self.sequence_buffer.edited_since(
+                constraint, location.start, location.end
+            ):
+                return True
+        passes = constraint.passes(self)
+        self._register_constraint_pass(constraint, passes)
+        return passes
+
+    def _register_constraint_pass(self, constraint, passes):
+        """Remember whether the constraint passed on the current sequence.
+
+        This is used by ``constraint_passes`` to skip the re-evaluation of
+        constraints whose region of the sequence hasn't been edited. As the
+        mark is kept by the sequence buffer, it is shared with the local
+        problems editing the same buffer.
+        """
+        if passes:
+            self.sequence_buffer.mark(constraint)
+        else:
+            self.sequence_buffer.unmark(constraint)
+
     def constraints_text_summary(self, failed_only=False, autopass=True):
         evals = self.constraints_evaluations(autopass=autopass)
         if failed_only:
@@ -54,21 +95,60 @@ class ConstraintsSolverMixin:
     def resolve_constraints_by_exhaustive_search(self):
         """Solve all constraints by exploring the whole search space.
 
-        This method iterates over ``self.iter_mutations_space()`` (space of
-        all sequences that could be reached through successive mutations) and
-        stops when it finds a sequence which meets all the constraints of the
-        problem.
+        This method iterates over the space of all sequences that could be
+        reached through successive mutations, and stops when it finds a
+        sequence which meets all the constraints of the problem. The space
+        is explored depth-first, skipping the variants whose beginning
+        already breaches a constraint (see ``breached_prefixes_pruner``).
+        If the problem's ``evaluation_batch_size`` is above 1, the variants
+        are evaluated in batches (see ``candidates_passing_constraints``).
+
+        If the problem's ``exhaustive_search_order`` is "gray_code", this
+        runs ``resolve_constraints_by_gray_code_search`` instead.
         """
         focus_constraint, other_constraints = self.get_focus_constraint()
+        if focus_constraint is not None:
+            constraints = [focus_constraint] + other_constraints
+        else:
+            constraints = self.constraints
+        if self.exhaustive_search_order == "gray_code":
+            return self.resolve_constraints_by_gray_code_search(constraints)
         sequence_before = self.sequence
-        all_variants = self.mutation_space.all_variants(self.sequence)
+        all_variants = self.mutation_space.depth_first_variants(
+            self.sequence, prune=self.breached_prefixes_pruner(constraints)
+        )
         space_size = int(self.mutation_space.space_size)
+        batch_size = self.evaluation_batch_size
+        if batch_size > 1:
+            batches = iter(
+                lambda: list(itertools.islice(all_variants, batch_size)), []
+            )
+            n_batches = int(np.ceil(space_size / batch_size))
+            self.logger(mutation__total=n_batches)
+            constraints = [
+                cst
+                for cst in constraints
+                if not cst.enforced_by_nucleotide_restrictions
+            ]
+            for batch in self.logger.iter_bar(mutation=batches):
+                passing = self.candidates_passing_constraints(
+                    batch, constraints
+                )
+                if len(passing):
+                    self.sequence = batch[passing[0]]
+                    self.logger(mutation__index=n_batches)
+                    return
+            self.sequence = sequence_before
+            raise NoSolutionError(
+                "Exhaustive search failed to satisfy all constraints.",
+                problem=self,
+            )
         self.logger(mutation__total=space_size)
         for variant in self.logger.iter_bar(mutation=all_variants):
             self.sequence = variant
             if focus_constraint is not None:
-                if focus_constraint.evaluate(self).passes:
-                    if all(c.evaluate(self).passes for c in other_constraints):
+                if focus_constraint.passes(self):
+                    if all(c.passes(self) for c in other_constraints):
                         self.logger(mutation__index=space_size)
                         return
             elif self.all_constraints_pass():
@@ -80,6 +160,131 @@ class ConstraintsSolverMixin:
             problem=self,
         )
 
+    def resolve_constraints_by_gray_code_search(self, constraints=None):
+        """Solve the constraints by exploring the search space in Gray order.
+
+        Consecutive variants differ by a single mutation choice (see
+        ``MutationSpace.gray_code_mutations``). Each change is applied in
+        place to the sequence buffer and to the constraints' incremental
+        evaluators, so checking a variant is cheap. Raises a NoSolutionError
+        if no variant verifies all constraints.
+
+        Parameters
+        ----------
+
+        constraints
+          The constraints to verify (default: all the problem's constraints).
+          Constraints enforced by the mutation space are not evaluated.
+        """
+        if constraints is None:
+            constraints = self.constraints
+        evaluators = self.specifications_evaluators(
+            [
+                cst
+                for cst in constraints
+                if not cst.enforced_by_nucleotide_restrictions
+            ]
+        )
+        sequence_before = self.sequence
+        mutation_space = self.mutation_space
+        all_mutations = mutation_space.gray_code_mutations(sequence_before)
+        space_size = int(self.mutation_space.space_size)
+        self.logger(mutation__total=space_size)
+        for mutations in self.logger.iter_bar(mutation=all_mutations):
+            self.apply_mutations(mutations, evaluators)
+            self.commit_mutations(evaluators)
+            if all(evaluator.passes for evaluator in evaluators):
+                self.logger(mutation__index=space_size)
+                return
+        self.sequence = sequence_before
+        raise NoSolutionError(
+            "Exhaustive search failed to satisfy all constraints.",
+            problem=self,
+        )
+
+    def candidates_passing_constraints(self, candidates, constraints):
+        """Return the indices of the candidate sequences passing constraints.
+
+        Each constraint scores all remaining candidates at once (see
+        ``Specification.scores_many``), and only the candidates which pass
+        are scored by the next constraints.
+        """
+        indices = list(range(len(candidates)))
+        for constraint in constraints:
+            if len(indices) == 0:
+                break
+            scores = constraint.scores_many(
+                self, [candidates[i] for i in indices]
+            )
+            indices = [i for (i, score) in zip(indices, scores) if score >= 0]
+        return indices
+
+    def partial_variants_problem(self):
+        """Return a copy of the problem to follow the partial variants of a
+        depth-first search (see ``breached_prefixes_pruner``).
+
+        The copy has its own sequence buffer, so it can be mutated while the
+        problem's sequence is left unchanged.
+        """
+        problem = self.local_problem(
+            constraints=self.constraints,
+            mutation_space=self.mutation_space,
+            objectives=self.objectives,
+        )
+        problem.sequence_buffer = SequenceBuffer(self.sequence)
+        problem.incremental_evaluation = self.incremental_evaluation
+        return problem
+
+    def breached_prefixes_pruner(self, constraints, problem=None):
+        """Return a function detecting variant prefixes breaching constraints.
+
+        The returned function can be used as the ``prune`` parameter of
+        ``MutationSpace.depth_first_variants``. It returns True when one of
+        the constraints has a breach located entirely in the final prefix of
+        a partial variant. Only constraints with ``local_breaches=True`` are
+        considered, as their breaches will remain whatever the rest of the
+        sequence. Returns None if no constraint can be used.
+
+        The partial variants are followed by applying the search's mutations
+        to ``problem`` (by default a new ``partial_variants_problem()``),
+        whose incremental evaluators of the constraints are updated in place.
+        A failing constraint whose ``evaluation_location`` is entirely in the
+        prefix prunes the prefix without further evaluation. The breaches
+        locations are only computed for the other failing constraints.
+        """
+        constraints = [
+            cst
+            for cst in constraints
+            if cst.local_breaches
+            and not cst.enforced_by_nucleotide_restrictions
+        ]
+        if len(constraints) == 0:
+            return None
+        if problem is None:
+            problem = self.partial_variants_problem()
+        evaluators = problem.specifications_evaluators(constraints)
+        evaluators_ends = []
+        for evaluator, constraint in zip(evaluators, constraints):
+            location = constraint.evaluation_location()
+            end = np.inf if location is None else location.end
+            evaluators_ends.append((evaluator, end))
+        evaluators_ends.sort(key=lambda evaluator_end: evaluator_end[1])
+
+        def prune(mutations, prefix_end):
+            problem.apply_mutations(mutations, evaluators)
+            problem.commit_mutations(evaluators)
+            for evaluator, end in evaluators_ends:
+                if evaluator.passes:
+                    continue
+                if end <= prefix_end:
+                    return True
+                locations = evaluator.evaluation().locations or []
+                if any(loc.end <= prefix_end for loc in locations):
+                    return True
+            return False
+
+        return prune
+
     def resolve_constraints_by_random_mutations(self):
         """Solve all constraints by successive sets of random mutations.
 
@@ -94,36 +299,189 @@ class ConstraintsSolverMixin:
 
         This operation is repeated `max_iter` times at most, after which
         a ``NoSolutionError`` is thrown if no solution was found.
-        """
 
+        If the problem's ``random_search_chains`` is above 1, this runs
+        ``resolve_constraints_by_random_chains`` instead.
+        """
+        if self.random_search_chains > 1:
+            self.resolve_constraints_by_random_chains()
+            return
         focus_constraint, other_constraints = self.get_focus_constraint()
         if focus_constraint is not None:
             self.resolve_single_constraint_by_random_mutations(
                 focus_constraint, other_constraints
             )
             return
+        if self.evaluation_batch_size > 1:
+            self.resolve_constraints_by_random_batches()
+            return
 
-        evaluations = self.constraints_evaluations()
-        score = sum([e.score for e in evaluations if not e.passes])
+        # Constraints enforced by the mutation space always pass.
+        constraints = [
+            c
+            for c in self.constraints
+            if not c.enforced_by_nucleotide_restrictions
+        ]
+        evaluators = self.specifications_evaluators(constraints)
+        weights = self.breach_mutations_weights(constraints)
+        score = sum([e.score for e in evaluators if not e.passes])
         iters = range(self.max_random_iters)
+        accepted = 0
         for i in self.logger.iter_bar(mutation=iters):
 
-            if all(e.passes for e in evaluations):
+            if all(e.passes for e in evaluators):
                 self.logger(mutation__index=iters)
                 return
-            previous_sequence = self.sequence
-            self.sequence = self.mutation_space.apply_random_mutations(
-                n_mutations=self.mutations_per_iteration,
-                sequence=self.sequence,
-            )
-
-            evaluations = self.constraints_evaluations()
-            new_score = sum([e.score for e in evaluations if not e.passes])
+            self.apply_random_mutations(evaluators, weights=weights)
+            new_score = sum([e.score for e in evaluators if not e.passes])
 
             if new_score > score:
                 score = new_score
+                accepted += 1
+                self.commit_mutations(evaluators)
+                if self.breach_mutations_boost is not None:
+                    weights = self.breach_mutations_weights(constraints)
             else:
-                self.sequence = previous_sequence
+                self.rollback_mutations(evaluators)
+            window = self.adaptive_search_window
+            if self.adaptive_search and ((i + 1) % window == 0):
+                self.adapt_mutations_per_iteration(accepted / window)
+                accepted = 0
+        raise NoSolutionError(
+            "Random search did not find a solution in the given number of "
+            "attempts. Try to increase the number of attempts with:\n\n"
+            "problem.max_random_iters = 5000 # or even 10000, 20000, etc.\n\n"
+            "If the problem persists, you may be in presence of a complex or "
+            "unsolvable problem.",
+            problem=self,
+        )
+
+    def resolve_constraints_by_random_chains(self):
+        """Solve all constraints with several independent random searches.
+
+        Differently seeded random searches are run from the current sequence
+        (see ``_run_random_search_chains``) until one of them solves all
+        constraints. A ``NoSolutionError`` is raised if all
+        ``random_search_chains`` searches fail.
+        """
+        results = self._run_random_search_chains("constraints")
+        if results[-1] is None:
+            raise NoSolutionError(
+                "None of the %d random searches found a solution in the given "
+                "number of attempts. Try to increase the number of attempts "
+                "with:\n\n"
+                "problem.max_random_iters = 5000 # or even 10000, 20000, etc."
+                "\n\nIf the problem persists, you may be in presence of a "
+                "complex or unsolvable problem." % len(results),
+                problem=self,
+            )
+        self.sequence = results[-1]
+
+    def _run_random_search_chains(self, search):
+        """Run independent random searches from the current sequence.
+
+        A number ``random_search_chains`` of searches are run, each on a copy
+        of the problem and with its own random seed (see
+        ``spawn_random_seeds``), on a pool of ``parallel_workers`` processes
+        if it is above 1. The results only depend on the random state, not on
+        the number of workers. The problem's sequence is left unchanged.
+
+        Parameters
+        ----------
+
+        search
+          Either "constraints" (each chain runs
+          ``resolve_constraints_by_random_mutations``, and the chains after
+          the first successful one are not run, or cancelled) or "objectives"
+          (each chain runs ``optimize_by_random_mutations``).
+
+        Returns
+        -------
+
+        results
+          The list of the results of the chains which were run, in the order
+          of their seeds: the final sequence of the chain for constraints,
+          and a tuple ``(score, sequence)`` for objectives, or None if the
+          chain raised a NoSolutionError.
+        """
+        seeds = self.spawn_random_seeds(self.random_search_chains)
+        problem = self._parallel_worker_copy()
+        problem.random_search_chains = 1
+        results = []
+        if (self.parallel_workers or 1) > 1:
+            pool = ProcessPoolExecutor(
+                max_workers=self.parallel_workers,
+                initializer=_set_worker_problem,
+                initargs=(problem, None),
+            )
+            with pool:
+                futures = [
+                    pool.submit(_run_worker_random_search_chain, search, seed)
+                    for seed in seeds
+                ]
+                for future in futures:
+                    results.append(future.result())
+                    if (search == "constraints") and (results[-1] is not None):
+                        break
+                for future in futures:
+                    future.cancel()
+        else:
+            # The random state is restored after the chains, as in the
+            # parallel case, where the chains don't affect this process.
+            random_state = np.random.get_state()
+            for seed in seeds:
+                results.append(_run_random_search_chain(problem, search, seed))
+                if (search == "constraints") and (results[-1] is not None):
+                    break
+            np.random.set_state(random_state)
+        return results
+
+    def resolve_constraints_by_random_batches(self):
+        """Solve all constraints by evaluating batches of random variants.
+
+        At each iteration, ``evaluation_batch_size`` random variants of the
+        current sequence are drawn (see ``random_candidates``) and evaluated
+        together by each constraint (see ``Specification.scores_many``).
+        The variant with the best sum of failing constraints scores becomes
+        the new sequence if it improves on the current one. A
+        ``NoSolutionError`` is raised if no solution is found after
+        ``max_random_iters`` iterations.
+        """
+        constraints = [
+            c
+            for c in self.constraints
+            if not c.enforced_by_nucleotide_restrictions
+        ]
+        evaluations = [c.evaluate(self) for c in constraints]
+        score = sum([e.score for e in evaluations if not e.passes])
+        passes = all(e.passes for e in evaluations)
+        weights = self.breach_mutations_weights(constraints)
+        iters = range(self.max_random_iters)
+        for i in self.logger.iter_bar(mutation=iters):
+            if passes:
+                self.logger(mutation__index=iters)
+                return
+            candidates = self.random_candidates(
+                self.evaluation_batch_size, weights=weights
+            )
+            scores = np.zeros(len(candidates))
+            candidates_pass = np.ones(len(candidates), dtype=bool)
+            for constraint in constraints:
+                constraint_scores = constraint.scores_many(self, candidates)
+                constraint_passes = constraint_scores >= 0
+                scores = scores + np.where(
+                    constraint_passes, 0, constraint_scores
+                )
+                candidates_pass &= constraint_passes
+            best = int(np.argmax(scores))
+            if scores[best] > score:
+                score = scores[best]
+                passes = candidates_pass[best]
+                self.sequence = candidates[best]
+                if self.breach_mutations_boost is not None:
+                    weights = self.breach_mutations_weights(constraints)
+        if passes:
+            return
         raise NoSolutionError(
             "Random search did not find a solution in the given number of "
             "attempts. Try to increase the number of attempts with:\n\n"
@@ -136,26 +494,90 @@ class ConstraintsSolverMixin:
     def resolve_single_constraint_by_random_mutations(
         self, constraint, other_constraints
     ):
+        if self.evaluation_batch_size > 1:
+            self.resolve_single_constraint_by_random_batches(
+                constraint, other_constraints
+            )
+            return
         evaluation = constraint.evaluation
         score = evaluation.score
+        evaluators = self.specifications_evaluators(
+            [constraint] + other_constraints
+        )
+        evaluator, other_evaluators = evaluators[0], evaluators[1:]
+        weights = self.breach_mutations_weights([constraint])
         iters = range(self.max_random_iters)
+        accepted = 0
         for i in self.logger.iter_bar(mutation=iters):
-            previous_sequence = self.sequence
-            self.sequence = self.mutation_space.apply_random_mutations(
-                n_mutations=self.mutations_per_iteration,
-                sequence=self.sequence,
-            )
-            new_evaluation = constraint.evaluate(self)
-            if new_evaluation.score > score:
-                if all(c.evaluate(self).passes for c in other_constraints):
-                    score = new_evaluation.score
-                    if new_evaluation.passes:
+            self.apply_random_mutations(evaluators, weights=weights)
+            if evaluator.score > score:
+                if all(e.passes for e in other_evaluators):
+                    score = evaluator.score
+                    accepted += 1
+                    self.commit_mutations(evaluators)
+                    if evaluator.passes:
                         self.logger(mutation__index=iters)
                         return
+                    if self.breach_mutations_boost is not None:
+                        weights = self.breach_mutations_weights([constraint])
                 else:
-                    self.sequence = previous_sequence
+                    self.rollback_mutations(evaluators)
             else:
-                self.sequence = previous_sequence
+                self.rollback_mutations(evaluators)
+            window = self.adaptive_search_window
+            if self.adaptive_search and ((i + 1) % window == 0):
+                self.adapt_mutations_per_iteration(accepted / window)
+                accepted = 0
+
+        raise NoSolutionError(
+            "Random search did not find a solution in the given number of "
+            "attempts. Try to increase the number of attempts with:\n\n"
+            "problem.max_random_iters = 5000 # or even 10000, 20000, etc.\n\n"
+            "If the problem persists, you may be in presence of a complex or "
+            "unsolvable problem.",
+            problem=self,
+        )
+
+    def resolve_single_constraint_by_random_batches(
+        self, constraint, other_constraints
+    ):
+        """Solve a focus constraint by evaluating batches of random variants.
+
+        At each iteration, ``evaluation_batch_size`` random variants of the
+        current sequence are scored by the constraint. The best-scoring
+        variant which improves the constraint's score and passes all other
+        constraints becomes the new sequence.
+        """
+        score = constraint.evaluation.score
+        other_constraints = [
+            c
+            for c in other_constraints
+            if not c.enforced_by_nucleotide_restrictions
+        ]
+        weights = self.breach_mutations_weights([constraint])
+        iters = range(self.max_random_iters)
+        for i in self.logger.iter_bar(mutation=iters):
+            candidates = self.random_candidates(
+                self.evaluation_batch_size, weights=weights
+            )
+            scores = constraint.scores_many(self, candidates)
+            improving = sorted(
+                [i for i, s in enumerate(scores) if s > score],
+                key=lambda i: -scores[i],
+            )
+            passing = self.candidates_passing_constraints(
+                [candidates[i] for i in improving], other_constraints
+            )
+            if len(passing) == 0:
+                continue
+            best = improving[passing[0]]
+            score = scores[best]
+            self.sequence = candidates[best]
+            if score >= 0:
+                self.logger(mutation__index=iters)
+                return
+            if self.breach_mutations_boost is not None:
+                weights = self.breach_mutations_weights([constraint])
 
         raise NoSolutionError(
             "Random search did not find a solution in the given number of "
@@ -166,24 +588,70 @@ class ConstraintsSolverMixin:
             problem=self,
         )
 
+    def breach_mutations_weights(self, constraints):
+        """Return mutation weights favoring the breaches of the constraints.
+
+        The mutation choices overlapping the breach locations of the
+        constraints are ``breach_mutations_boost`` times more likely to be
+        drawn than the others (see ``MutationSpace.choices_weights``).
+        Returns None (uniform draws) if the problem's
+        ``breach_mutations_boost`` is None, or if no mutation choice overlaps
+        the breaches.
+        """
+        if self.breach_mutations_boost is None:
+            return None
+        locations = []
+        for constraint in constraints:
+            evaluation = constraint.evaluate(self)
+            if not evaluation.passes:
+                locations.extend(evaluation.locations or [])
+        return self.mutation_space.choices_weights(
+            locations, self.breach_mutations_boost
+        )
+
     def resolve_constraints_locally(self):
         """Perform a local search, either stochastic or exhaustive.
         """
-        if self.mutation_space.space_size < self.randomization_threshold:
+        if self.use_exhaustive_search(self.constraints):
             self.resolve_constraints_by_exhaustive_search()
         else:
             self.resolve_constraints_by_random_mutations()
 
-    def resolve_constraint(self, constraint):
-        """Resolve a constraint through successive localizations."""
+    def resolve_constraint(self, constraint, deadline=None):
+        """Resolve a constraint through successive localizations.
+
+        If the ``deadline`` (in the ``time.monotonic()`` clock) is reached,
+        the remaining breach locations are recorded in ``skipped_locations``
+        and left unresolved.
+
+        If ``parallel_workers`` is above 1 and the breaches of the constraint
+        can be split into groups which don't interact, the groups are solved
+        in parallel (see ``resolve_constraint_in_parallel``). This is also the
+        case, sequentially, when the problem has its own ``random_generator``,
+        so that the results don't depend on the number of workers.
+        """
 
         # EVALUATE THE CONSTRAINT, FIND BREACHING LOCATIONS
 
         evaluation = constraint.evaluate(self)
+        self._register_constraint_pass(constraint, evaluation.passes)
         if evaluation.passes:
             return
 
         locations = sorted(evaluation.locations)
+        if self._deadline_reached(deadline):
+            self._skip_locations("constraint", constraint, locations)
+            return
+        by_groups = ((self.parallel_workers or 1) > 1) or (
+            self.random_generator is not None
+        )
+        if by_groups and (len(locations) > 1):
+            groups = self.independent_breaches_groups(constraint, locations)
+            if (groups is not None) and (len(groups) > 1):
+                self.resolve_constraint_in_parallel(
+                    constraint, groups, deadline=deadline
+                )
+                return
         iterator = self.logger.iter_bar(
             location=locations, bar_message=lambda loc: str(loc)
         )
@@ -191,136 +659,369 @@ class ConstraintsSolverMixin:
         # FOR EACH LOCATION, CREATE A LOCAL PROBLEM AND RESOLVE LOCALLY.
 
         for i, location in enumerate(iterator):
+            if self._deadline_reached(deadline):
+                self._skip_locations("constraint", constraint, locations[i:])
+                self.logger(
+                    location__index=len(locations),
+                    location__message="Time limit reached",
+                )
+                return
+            is_last = i == len(locations) - 1
+            next_location = None if is_last else locations[i + 1]
+            try:
+                self.resolve_constraint_breach(
+                    constraint, location, next_location=next_location
+                )
+            except NoSolutionError as error:
+                self.logger(
+                    location__index=len(locations),
+                    location__message="Cold exit",
+                )
+                raise error
 
-            # SEVERAL "EXTENSIONS" OF THE LOCAL ZONE WILL BE TESTED IN TURN
-            # IN CASE THE LOCAL SEQUENCE IS FROZEN DUE TO NUCLEOTIDE INTER-
-            # DEPENDENCIES (CODONS, ETC.)
-
-            for extension in self.local_extensions:
-                new_location = location.extended(extension)
-                mutation_space = self.mutation_space.localized(new_location)
-
-                if mutation_space.space_size == 0:
-
-                    # If the sequence is frozen at this location, either
-                    # "continue" (go straight to the next, larger extension)
-                    # or if we are already in the largest extension, return
-                    # an error with data that will be used by the report
-                    # generator.
-
-                    if extension != self.local_extensions[-1]:
-                        continue
-                    else:
-                        error = NoSolutionError(
-                            location=new_location,
-                            problem=self,
-                            message="Constraint breach in region that cannot "
-                            "be mutated.",
-                        )
-                        error.location = new_location
-                        error.constraint = constraint
-                        error.message = "While solving %s in %s:\n\n%s" % (
-                            constraint,
-                            new_location,
-                            str(error),
-                        )
-                        self.logger(
-                            location__index=len(locations),
-                            location__message="Cold exit",
-                        )
-                        raise error
-                new_location = Location(*mutation_space.choices_span)
-
-                # This blocks solves the problem of overlapping breaches,
-                # which can make the local optimization impossible.
-                # If the next constraint breach overlaps with the current
-                # location, localize the constraint with a with_righthand=False
-                # flag, which will be used by the constraints ".localized"
-                # method to only consider the right-hand side.
-
-                if (i < (len(locations) - 1)) and (
-                    locations[i + 1].overlap_region(new_location)
-                ):
-                    this_local_constraint = constraint.localized(
-                        new_location, with_righthand=False, problem=self
-                    )
-                else:
-                    this_local_constraint = constraint.localized(
-                        new_location, problem=self
-                    )
-                evaluation = this_local_constraint.evaluate(self)
+    def resolve_constraint_breach(
+        self, constraint, location, next_location=None
+    ):
+        """Resolve a constraint at one of its breach locations.
 
-                # MAYBE THE LOCAL BREACH WAS ALREADY RESOLVED AS A SIDE EFFECT
-                # OF SOLVING PREVIOUS BREACHES. IN THAT CASE, PASS.
+        A local problem is created around the location and solved, with
+        larger and larger extensions of the location (see
+        ``local_extensions``) until this works. A NoSolutionError is raised
+        if the local problem with the largest extension can't be solved.
 
-                if evaluation.passes:
-                    continue
+        Parameters
+        ----------
 
-                # ELSE, CREATE A NEW LOCAL PROBLEM WITH LOCALIZED CONSTRAINTS
+        constraint
+          The constraint being resolved.
 
-                this_local_constraint.is_focus = True
-                this_local_constraint.evaluation = evaluation
+        location
+          The breach location of the constraint to resolve.
 
-                localized_constraints = [
-                    cst.localized(new_location, problem=self)
-                    for cst in self.constraints
-                    if cst != constraint
-                    and not cst.enforced_by_nucleotide_restrictions
-                ]
-                passing_localized_constraints = [
-                    cst
-                    for cst in localized_constraints
-                    if cst is not None and cst.evaluate(self).passes
-                ]
-                local_problem = self.__class__(
-                    sequence=self.sequence,
-                    constraints=(
-                        [this_local_constraint] + passing_localized_constraints
-                    ),
-                    mutation_space=mutation_space,
-                )
-                local_problem.randomization_threshold = (
-                    self.randomization_threshold
+        next_location
+          The next breach location of the constraint, if any. When it overlaps
+          the local zone, the constraint is localized with
+          ``with_righthand=False``.
+        """
+        # SEVERAL "EXTENSIONS" OF THE LOCAL ZONE WILL BE TESTED IN TURN
+        # IN CASE THE LOCAL SEQUENCE IS FROZEN DUE TO NUCLEOTIDE INTER-
+        # DEPENDENCIES (CODONS, ETC.)
+
+        # The sequence is restored after each failed extension, so the
+        # localizations of the specifications made for one extension are
+        # re-used by the next ones with the same mutable span. Specifications
+        # which don't override ``localized`` are the same for any location,
+        # so they are localized once. Evaluations are re-used for the same
+        # localized specifications.
+        localizations = {}
+        evaluations = {}
+        passing = {}
+
+        def localized(spec, location, **kwargs):
+            if type(spec).localized is Specification.localized:
+                location_key = None
+            else:
+                location_key = location.to_tuple()
+            key = (id(spec), location_key, tuple(kwargs.items()))
+            if key not in localizations:
+                localizations[key] = (
+                    spec,
+                    spec.localized(location, problem=self, **kwargs),
                 )
-                local_problem.max_random_iters = self.max_random_iters
-                local_problem.mutations_per_iteration = (
-                    self.mutations_per_iteration
+            return localizations[key][1]
+
+        def evaluate(spec):
+            if id(spec) not in evaluations:
+                evaluations[id(spec)] = (spec, spec.evaluate(self))
+            return evaluations[id(spec)][1]
+
+        def passes(spec):
+            if id(spec) not in passing:
+                passing[id(spec)] = (spec, spec.passes(self))
+            return passing[id(spec)][1]
+
+        for extension in self.local_extensions:
+            new_location = location.extended(extension)
+            mutation_space = self.mutation_space.localized(new_location)
+
+            if mutation_space.space_size == 0:
+
+                # If the sequence is frozen at this location, either
+                # "continue" (go straight to the next, larger extension)
+                # or if we are already in the largest extension, return
+                # an error with data that will be used by the report
+                # generator.
+
+                if extension != self.local_extensions[-1]:
+                    continue
+                else:
+                    error = NoSolutionError(
+                        location=new_location,
+                        problem=self,
+                        message="Constraint breach in region that cannot "
+                        "be mutated.",
+                    )
+                    error.location = new_location
+                    error.constraint = constraint
+                    error.message = "While solving %s in %s:\n\n%s" % (
+                        constraint,
+                        new_location,
+                        str(error),
+                    )
+                    raise error
+            new_location = Location(*mutation_space.choices_span)
+
+            # This blocks solves the problem of overlapping breaches,
+            # which can make the local optimization impossible.
+            # If the next constraint breach overlaps with the current
+            # location, localize the constraint with a with_righthand=False
+            # flag, which will be used by the constraints ".localized"
+            # method to only consider the right-hand side.
+
+            if (next_location is not None) and (
+                next_location.overlap_region(new_location)
+            ):
+                this_local_constraint = localized(
+                    constraint, new_location, with_righthand=False
                 )
+            else:
+                this_local_constraint = localized(constraint, new_location)
+            evaluation = evaluate(this_local_constraint)
 
-                # STORE THE LOCAL PROBLEM IN THE LOGGER.
-                # This is useful for troubleshooting.
+            # MAYBE THE LOCAL BREACH WAS ALREADY RESOLVED AS A SIDE EFFECT
+            # OF SOLVING PREVIOUS BREACHES. IN THAT CASE, PASS.
 
-                self.logger.store(
-                    problem=self,
-                    local_problem=local_problem,
-                    location=location,
+            if evaluation.passes:
+                continue
+
+            # ELSE, CREATE A NEW LOCAL PROBLEM WITH LOCALIZED CONSTRAINTS
+
+            this_local_constraint.is_focus = True
+            this_local_constraint.evaluation = evaluation
+
+            localized_constraints = [
+                localized(cst, new_location)
+                for cst in self.constraints_index.overlapping(new_location)
+                if cst != constraint
+                and not cst.enforced_by_nucleotide_restrictions
+            ]
+            passing_localized_constraints = [
+                cst
+                for cst in localized_constraints
+                if cst is not None and passes(cst)
+            ]
+            local_problem = self.local_problem(
+                constraints=(
+                    [this_local_constraint] + passing_localized_constraints
+                ),
+                mutation_space=mutation_space,
+            )
+            local_problem.randomization_threshold = (
+                self.randomization_threshold
+            )
+            local_problem.max_random_iters = self.max_random_iters
+            local_problem.mutations_per_iteration = (
+                self.mutations_per_iteration
+            )
+            local_problem.incremental_evaluation = (
+                self.incremental_evaluation
+            )
+            local_problem.exhaustive_search_order = (
+                self.exhaustive_search_order
+            )
+            local_problem.evaluation_batch_size = self.evaluation_batch_size
+            local_problem.random_search_chains = self.random_search_chains
+            local_problem.parallel_workers = self.parallel_workers
+            local_problem.breach_mutations_boost = (
+                self.breach_mutations_boost
+            )
+            local_problem.adaptive_search = self.adaptive_search
+            local_problem.adaptive_search_window = self.adaptive_search_window
+
+            # STORE THE LOCAL PROBLEM IN THE LOGGER.
+            # This is useful for troubleshooting.
+
+            self.logger.store(
+                problem=self,
+                local_problem=local_problem,
+                location=location,
+            )
+
+            # RE-USE THE SOLUTION OF AN IDENTICAL LOCAL PROBLEM, IF ANY.
+
+            cache = self.local_solutions_cache
+            if cache is not None:
+                key, origin = cache.problem_key(local_problem)
+                if key is not None:
+                    if cache.apply_solution(local_problem, key, origin):
+                        self._replace_sequence(local_problem.sequence)
+                        break
+
+            # RESOLVE THE LOCAL PROBLEM. RETURN AN ERROR IF IT FAILS.
+
+            sequence_before = self.sequence
+            try:
+                if hasattr(constraint, "resolution_heuristic"):
+                    constraint.resolution_heuristic(local_problem)
+                else:
+                    local_problem.resolve_constraints_locally()
+                if (cache is not None) and (key is not None):
+                    cache.add_solution(local_problem, key, origin)
+                self._replace_sequence(local_problem.sequence)
+                break
+            except NoSolutionError as error:
+                # The local problem shares this problem's sequence buffer. Give
+                # it its own buffer (with the failed sequence, for reports)
+                # and restore this problem's sequence.
+                local_problem.sequence_buffer = SequenceBuffer(
+                    local_problem.sequence
                 )
+                self.sequence = sequence_before
+                if extension == self.local_extensions[-1]:
+                    error.location = new_location
+                    error.constraint = constraint
+                    error.message = "While solving %s in %s:\n\n%s" % (
+                        constraint,
+                        new_location,
+                        str(error),
+                    )
+                    raise error
+                else:
+                    continue
+
+    def independent_breaches_groups(self, constraint, locations):
+        """Partition breach locations into groups which don't interact.
+
+        For each breach location, the zone which can be mutated when resolving
+        the breach (at the largest of the ``local_extensions``) and the zone
+        read by the constraints localized on it are computed. Breaches whose
+        zones overlap are grouped together, so that resolving a group cannot
+        change the outcome of the resolution of another group.
+
+        Returns a list of lists of locations (sorted), or None if some
+        constraint reads a region of unknown extent (for instance, a global
+        specification linking all the sequence).
+        """
+        extension = max(self.local_extensions)
+        constraints = [
+            cst
+            for cst in self.constraints
+            if not cst.enforced_by_nucleotide_restrictions
+        ]
+        index = SpecificationsIndex(constraints)
+        zones = []
+        for location in locations:
+            zone = location.extended(extension)
+            mutation_space = self.mutation_space.localized(zone)
+            if mutation_space.space_size > 0:
+                start, end = mutation_space.choices_span
+                zone = Location(min(start, zone.start), max(end, zone.end))
+            zone_start, zone_end = zone.start, zone.end
+            for cst in index.overlapping(zone):
+                localized = cst.localized(zone, problem=self)
+                if localized is None:
+                    continue
+                read_location = localized.evaluation_location()
+                if read_location is None:
+                    return None
+                zone_start = min(zone_start, read_location.start)
+                zone_end = max(zone_end, read_location.end)
+            zones.append((zone_start, zone_end, location))
+        groups = []
+        group_end = None
+        for zone_start, zone_end, location in sorted(zones):
+            if (group_end is None) or (zone_start > group_end):
+                groups.append([])
+                group_end = zone_end
+            groups[-1].append(location)
+            group_end = max(group_end, zone_end)
+        return [sorted(group) for group in groups]
+
+    def resolve_constraint_in_parallel(
+        self, constraint, groups, deadline=None
+    ):
+        """Resolve groups of non-interacting breaches on a process pool.
 
-                # RESOLVE THE LOCAL PROBLEM. RETURN AN ERROR IF IT FAILS.
+        Each group is resolved by a copy of the problem in a separate process
+        (or sequentially if ``parallel_workers`` is not above 1), with its own
+        random seed (see ``spawn_random_seeds``), so the result only depends
+        on the random state, not on the number of workers. The segments
+        mutated by the different groups are then written in the problem's
+        sequence, group after group.
 
-                try:
-                    if hasattr(constraint, "resolution_heuristic"):
-                        constraint.resolution_heuristic(local_problem)
-                    else:
-                        local_problem.resolve_constraints_locally()
-                    self._replace_sequence(local_problem.sequence)
+        If a group can't be resolved, the successful groups are merged and the
+        failing group is resolved again in the main process, which raises the
+        NoSolutionError (with the associated problem and location).
+
+        If the ``deadline`` (in the ``time.monotonic()`` clock, which the
+        processes share) is reached, the breaches not yet resolved in each
+        group are recorded in ``skipped_locations`` and left unresolved.
+        """
+        seeds = self.spawn_random_seeds(len(groups))
+        problem = self._parallel_worker_copy()
+        if (self.parallel_workers or 1) > 1:
+            pool = ProcessPoolExecutor(
+                max_workers=self.parallel_workers,
+                initializer=_set_worker_problem,
+                initargs=(problem, constraint),
+            )
+            tasks = zip(groups, seeds, itertools.repeat(deadline))
+            with pool:
+                results = list(pool.map(_resolve_worker_breaches_group, tasks))
+        else:
+            results = [
+                _resolve_breaches_group(
+                    problem, constraint, group, seed, deadline=deadline
+                )
+                for group, seed in zip(groups, seeds)
+            ]
+        sequence = bytearray(self.sequence.encode())
+        failed_groups = []
+        for group, result in zip(groups, results):
+            if result is None:
+                failed_groups.append(group)
+                continue
+            segments, skipped_locations = result
+            for start, end, subsequence in segments:
+                sequence[start:end] = subsequence.encode()
+            self._skip_locations("constraint", constraint, skipped_locations)
+        self._replace_sequence(sequence.decode())
+        for group in failed_groups:
+            for i, location in enumerate(group):
+                if self._deadline_reached(deadline):
+                    self._skip_locations("constraint", constraint, group[i:])
                     break
-                except NoSolutionError as error:
-                    if extension == self.local_extensions[-1]:
-                        error.location = new_location
-                        error.constraint = constraint
-                        error.message = "While solving %s in %s:\n\n%s" % (
-                            constraint,
-                            new_location,
-                            str(error),
-                        )
-                        self.logger(
-                            location__index=len(locations),
-                            location__message="Cold exit",
-                        )
-                        raise error
-                    else:
-                        continue
+                is_last = i == len(group) - 1
+                self.resolve_constraint_breach(
+                    constraint,
+                    location,
+                    next_location=None if is_last else group[i + 1],
+                )
+
+    def _parallel_worker_copy(self):
+        """Return a copy of the problem which can be sent to other processes.
+
+        The copy has a mute logger, its own sequence buffer, and none of the
+        attributes only used for reports.
+        """
+        problem = copy.copy(self)
+        problem.logger = default_bar_logger(None)
+        problem.sequence_buffer = SequenceBuffer(self.sequence)
+        problem.sequence_before = None
+        problem._constraints_before = None
+        problem._objectives_before = None
+        problem.parallel_workers = None
+        # The focus constraint of a local problem carries an evaluation which
+        # refers to the parent problem. Give the copy its own evaluation.
+        constraints = []
+        for constraint in self.constraints:
+            if getattr(constraint, "evaluation", None) is not None:
+                constraint = copy.copy(constraint)
+                constraint.evaluation = constraint.evaluate(problem)
+            constraints.append(constraint)
+        problem.constraints = constraints
+        problem.constraints_index = SpecificationsIndex(constraints)
+        return problem
 
     def resolve_constraints(self, final_check=True, cst_filter=None):
         """Solve a particular constraint using local, targeted searches.
@@ -340,6 +1041,9 @@ class ConstraintsSolverMixin:
         cst_filter
           An optional filter to only resolve a subset function (constraint => True/False)
 
+        If the problem's ``time_limit`` or ``specification_time_limit`` are
+        reached, the remaining breaches are recorded in ``skipped_locations``
+        and the final check is skipped.
         """
         constraints = [
             c
@@ -350,20 +1054,34 @@ class ConstraintsSolverMixin:
         if len(constraints) == 0:
             return
         constraints = sorted(constraints, key=lambda c: -c.priority)
+        deadline = self._deadline_after(self.time_limit)
+        n_skipped_locations = len(self.skipped_locations)
         for constraint in self.logger.iter_bar(
             constraint=constraints, bar_message=lambda c: str(c)
         ):
+            constraint_deadline = self._deadline_after(
+                self.specification_time_limit, deadline
+            )
             try:
-                self.resolve_constraint(constraint=constraint)
+                self.resolve_constraint(
+                    constraint=constraint, deadline=constraint_deadline
+                )
             except NoSolutionError as error:
                 self.logger(constraint__index=len(constraints))
                 raise error
+        if len(self.skipped_locations) > n_skipped_locations:
+            return
         if final_check:
             self.perform_final_constraints_check()
 
     def perform_final_constraints_check(self):
+        """Raise a NoSolutionError if some constraints do not pass.
+
+        Constraints which passed earlier and whose region of the sequence
+        hasn't been edited since are not re-evaluated.
+        """
         for cst in self.constraints:
-            if not cst.evaluate(self).passes:
+            if not self.constraint_passes(cst):
                 raise NoSolutionError(
                     "The solving of all constraints failed to solve"
                     " all constraints, as some appear unsolved at the end"
@@ -376,3 +1094,86 @@ class ConstraintsSolverMixin:
                     ),
                     problem=self,
                 )
+
+
+# Problem and constraint used by the processes of the pool, see below.
+_WORKER_DATA = {}
+
+
+def _set_worker_problem(problem, constraint):
+    """Store the problem in the (new) process, before any task is run."""
+    _WORKER_DATA["problem"] = problem
+    _WORKER_DATA["constraint"] = constraint
+
+
+def _resolve_breaches_group(
+    problem, constraint, locations, seed, deadline=None
+):
+    """Resolve a group of breaches on a copy of the problem.
+
+    See ``ConstraintsSolverMixin.resolve_constraint_in_parallel``. Returns
+    ``(segments, skipped_locations)`` where segments is the list
+    ``[(start, end, subsequence), ...]`` of mutated segments and
+    skipped_locations the breaches left when the deadline was reached, or
+    None if one of the breaches could not be resolved. The copy of the
+    problem is restored to its original sequence afterwards.
+    """
+    problem.seed_random_stream(seed)
+    original_sequence = problem.sequence
+    skipped_locations = []
+    try:
+        for i, location in enumerate(locations):
+            if problem._deadline_reached(deadline):
+                skipped_locations = locations[i:]
+                break
+            is_last = i == len(locations) - 1
+            problem.resolve_constraint_breach(
+                constraint,
+                location,
+                next_location=None if is_last else locations[i + 1],
+            )
+    except NoSolutionError:
+        return None
+    finally:
+        new_sequence = problem.sequence
+        problem.sequence = original_sequence
+    segments = [
+        (start, end, new_sequence[start:end])
+        for (start, end) in sequences_differences_segments(
+            original_sequence, new_sequence
+        )
+    ]
+    return segments, skipped_locations
+
+
+def _resolve_worker_breaches_group(task):
+    """Resolve a group of breaches on the process' copy of the problem."""
+    locations, seed, deadline = task
+    problem = _WORKER_DATA["problem"]
+    return _resolve_breaches_group(
+        problem, _WORKER_DATA["constraint"], locations, seed, deadline
+    )
+
+
+def _run_random_search_chain(problem, search, seed):
+    """Run one random search on the problem, and restore its sequence.
+
+    See ``ConstraintsSolverMixin._run_random_search_chains``.
+    """
+    problem.seed_random_stream(seed)
+    original_sequence = problem.sequence
+    try:
+        if search == "constraints":
+            problem.resolve_constraints_by_random_mutations()
+            return problem.sequence
+        problem.optimize_by_random_mutations()
+        return problem.objective_scores_sum(), problem.sequence
+    except NoSolutionError:
+        return None
+    finally:
+        problem.sequence = original_sequence
+
+
+def _run_worker_random_search_chain(search, seed):
+    """Run one random search on the process' copy of the problem."""
+    return _run_random_search_chain(_WORKER_DATA["problem"], search, seed)
@@ -1,3 +1,7 @@
+import itertools
+
+import numpy as np
+
 from ...Location import Location
 from ...Specification.SpecEvaluation import ProblemObjectivesEvaluations
 from ..NoSolutionError import NoSolutionError
@@ -20,11 +24,34 @@ class ObjectivesMaximizerMixin:
     def objective_scores_sum(self):
         return self.objectives_evaluations().scores_sum()
 
+    def objective_scores_sums_many(self, candidates):
+        """Return the objective scores sums of several candidate sequences.
+
+        Each objective scores all candidates at once (see
+        ``Specification.scores_many``).
+        """
+        scores_sums = np.zeros(len(candidates))
+        for objective in self.objectives:
+            scores = objective.scores_many(self, candidates)
+            scores_sums = scores_sums + objective.boost * scores
+        return scores_sums
+
     def objectives_text_summary(self):
         return self.objectives_evaluations().to_text()
 
     def optimize_by_exhaustive_search(self):
-        """
+        """Optimize the objectives by exploring the whole search space.
+
+        The space is explored depth-first. Variants starting with a prefix
+        which breaches a constraint are skipped (see
+        ``breached_prefixes_pruner``), and so are variants starting with a
+        prefix for which the objectives' ``prefix_score_bound`` shows that no
+        improvement over the current best score is possible. If the problem's
+        ``evaluation_batch_size`` is above 1, the variants are evaluated in
+        batches (see ``objective_scores_sums_many``).
+
+        If the problem's ``exhaustive_search_order`` is "gray_code", this
+        runs ``optimize_by_gray_code_search`` instead.
         """
         if not self.all_constraints_pass():
             summary = self.constraints_text_summary(failed_only=True)
@@ -44,10 +71,75 @@ class ObjectivesMaximizerMixin:
         else:
             best_possible_score = None
 
+        if self.exhaustive_search_order == "gray_code":
+            return self.optimize_by_gray_code_search(best_possible_score)
         current_best_score = self.objective_scores_sum()
         current_best_sequence = self.sequence
-        all_variants = self.mutation_space.all_variants(self.sequence)
+        partial_variant = self.partial_variants_problem()
+        breached_prefix = self.breached_prefixes_pruner(
+            self.constraints, problem=partial_variant
+        )
+        use_bounds = all(obj.boost >= 0 for obj in self.objectives)
+
+        def prune(mutations, prefix_end):
+            if breached_prefix is None:
+                partial_variant.apply_mutations(mutations)
+                partial_variant.commit_mutations()
+            elif breached_prefix(mutations, prefix_end):
+                return True
+            if not use_bounds:
+                return False
+            bounds = [
+                obj.prefix_score_bound(partial_variant, prefix_end)
+                for obj in self.objectives
+            ]
+            if any(bound is None for bound in bounds):
+                return False
+            bound = sum(
+                [obj.boost * b for obj, b in zip(self.objectives, bounds)]
+            )
+            # The tolerance protects against rounding errors.
+            tolerance = 1e-8 * (1 + abs(bound))
+            return bound + tolerance <= current_best_score
+
+        all_variants = self.mutation_space.depth_first_variants(
+            self.sequence, prune=prune
+        )
         space_size = int(self.mutation_space.space_size)
+        batch_size = self.evaluation_batch_size
+        if batch_size > 1:
+            batches = iter(
+                lambda: list(itertools.islice(all_variants, batch_size)), []
+            )
+            n_batches = int(np.ceil(space_size / batch_size))
+            self.logger(mutation__total=n_batches)
+            constraints = [
+                c
+                for c in self.constraints
+                if not c.enforced_by_nucleotide_restrictions
+            ]
+            for batch in self.logger.iter_bar(mutation=batches):
+                passing = self.candidates_passing_constraints(
+                    batch, constraints
+                )
+                scores = self.objective_scores_sums_many(
+                    [batch[i] for i in passing]
+                )
+                for i, score in zip(passing, scores):
+                    if score > current_best_score:
+                        current_best_score = score
+                        current_best_sequence = batch[i]
+                        if (best_possible_score is not None) and (
+                            current_best_score >= best_possible_score
+                        ):
+                            break
+                if (best_possible_score is not None) and (
+                    current_best_score >= best_possible_score
+                ):
+                    self.logger(mutation__index=n_batches)
+                    break
+            self.sequence = current_best_sequence
+            return
         self.logger(mutation__total=space_size)
         for variant in self.logger.iter_bar(mutation=all_variants):
             self.sequence = variant
@@ -63,8 +155,62 @@ class ObjectivesMaximizerMixin:
                         break
         self.sequence = current_best_sequence
 
-    def optimize_by_random_mutations(self):
+    def optimize_by_gray_code_search(self, best_possible_score=None):
+        """Optimize the objectives by exploring the search space in Gray order.
+
+        Consecutive variants differ by a single mutation choice (see
+        ``MutationSpace.gray_code_mutations``). Each change is applied in
+        place to the sequence buffer and to the specifications' incremental
+        evaluators, so scoring a variant is cheap. The search stops early if
+        the score reaches ``best_possible_score``.
         """
+        current_best_score = self.objective_scores_sum()
+        current_best_sequence = self.sequence
+        constraints_evaluators = self.specifications_evaluators(
+            [
+                c
+                for c in self.constraints
+                if not c.enforced_by_nucleotide_restrictions
+            ]
+        )
+        objectives_evaluators = self.specifications_evaluators(self.objectives)
+        evaluators = constraints_evaluators + objectives_evaluators
+        all_mutations = self.mutation_space.gray_code_mutations(self.sequence)
+        space_size = int(self.mutation_space.space_size)
+        self.logger(mutation__total=space_size)
+        for mutations in self.logger.iter_bar(mutation=all_mutations):
+            self.apply_mutations(mutations, evaluators)
+            self.commit_mutations(evaluators)
+            if not all(e.passes for e in constraints_evaluators):
+                continue
+            score = sum(
+                [
+                    e.specification.boost * e.score
+                    for e in objectives_evaluators
+                ]
+            )
+            if score > current_best_score:
+                current_best_score = score
+                current_best_sequence = self.sequence
+                if (best_possible_score is not None) and (
+                    current_best_score >= best_possible_score
+                ):
+                    self.logger(mutation__index=space_size)
+                    break
+        self.sequence = current_best_sequence
+
+    def optimize_by_random_mutations(self):
+        """Optimize the objectives by successive random mutations.
+
+        By default, this is a hill climbing: at each iteration, a number
+        ``mutations_per_iteration`` of random mutations are applied, and kept
+        only if all constraints pass and the objectives score increases. The
+        search stops after ``max_random_iters`` iterations, or after
+        ``optimization_stagnation_tolerance`` iterations without improvement.
+
+        The problem's ``local_search_strategy`` can select other strategies
+        (see ``optimize_by_simulated_annealing`` and
+        ``optimize_by_tabu_search``).
         """
         if not self.all_constraints_pass():
             summary = self.constraints_text_summary()
@@ -85,8 +231,37 @@ class ObjectivesMaximizerMixin:
             )
         else:
             best_possible_score = None
+        if self.random_search_chains > 1:
+            self.optimize_by_random_chains(score)
+            return
+        strategy = self.local_search_strategy
+        if callable(strategy):
+            strategy(self)
+            return
+        if strategy == "simulated_annealing":
+            self.optimize_by_simulated_annealing(score, best_possible_score)
+            return
+        if strategy == "tabu_search":
+            self.optimize_by_tabu_search(score, best_possible_score)
+            return
+        if strategy != "hill_climbing":
+            raise ValueError("Unknown local search strategy: %s" % strategy)
+        if self.evaluation_batch_size > 1:
+            self.optimize_by_random_batches(score, best_possible_score)
+            return
+        # Constraints enforced by the mutation space always pass.
+        constraints_evaluators = self.specifications_evaluators(
+            [
+                c
+                for c in self.constraints
+                if not c.enforced_by_nucleotide_restrictions
+            ]
+        )
+        objectives_evaluators = self.specifications_evaluators(self.objectives)
+        evaluators = constraints_evaluators + objectives_evaluators
         iters = self.max_random_iters
         stagnating_iterations = 0
+        accepted = 0
         for iteration in self.logger.iter_bar(mutation=range(iters)):
             if (best_possible_score is not None) and (
                 score >= best_possible_score
@@ -98,23 +273,235 @@ class ObjectivesMaximizerMixin:
             ):
                 break
 
-            previous_sequence = self.sequence
-            self.sequence = self.mutation_space.apply_random_mutations(
-                n_mutations=self.mutations_per_iteration,
-                sequence=self.sequence,
-            )
-            if self.all_constraints_pass():
-                new_score = self.objective_scores_sum()
+            self.apply_random_mutations(evaluators)
+            if all(e.passes for e in constraints_evaluators):
+                new_score = sum(
+                    [
+                        e.specification.boost * e.score
+                        for e in objectives_evaluators
+                    ]
+                )
                 if new_score > score:
                     score = new_score
                     stagnating_iterations = 0
+                    accepted += 1
+                    self.commit_mutations(evaluators)
                 else:
-                    self.sequence = previous_sequence
+                    self.rollback_mutations(evaluators)
+            else:
+                self.rollback_mutations(evaluators)
+            stagnating_iterations += 1
+            window = self.adaptive_search_window
+            if self.adaptive_search and ((iteration + 1) % window == 0):
+                self.adapt_mutations_per_iteration(accepted / window)
+                accepted = 0
+
+    def optimize_by_random_chains(self, score):
+        """Optimize the objectives with several independent random searches.
+
+        A number ``random_search_chains`` of differently seeded random
+        searches are run from the current sequence (see
+        ``_run_random_search_chains``), and the sequence with the best
+        objectives score is kept if it improves on the current score. Chains
+        which raised a NoSolutionError are ignored.
+        """
+        best_score, best_sequence = score, None
+        for result in self._run_random_search_chains("objectives"):
+            if result is None:
+                continue
+            chain_score, sequence = result
+            if chain_score > best_score:
+                best_score, best_sequence = chain_score, sequence
+        if best_sequence is not None:
+            self.sequence = best_sequence
+
+    def optimize_by_simulated_annealing(self, score, best_possible_score=None):
+        """Optimize the objectives by simulated annealing.
+
+        At each iteration, a number ``mutations_per_iteration`` of random
+        mutations are applied. If all constraints pass, mutations which do not
+        decrease the objectives score are kept, and mutations decreasing the
+        score by ``d`` are kept with probability ``exp(-d / T)``, where the
+        temperature ``T`` decreases over the ``max_random_iters`` iterations
+        (see ``annealing_temperatures``). The search can thus escape local
+        optima. The best sequence found is kept.
+        """
+        iters = self.max_random_iters
+        schedule = self.annealing_temperatures
+        if callable(schedule):
+
+            def temperature(iteration):
+                return schedule(iteration, iters)
+
+        else:
+            start, end = schedule
+
+            def temperature(iteration):
+                progress = iteration / max(1, iters - 1)
+                return start * (end / start) ** progress
+
+        evaluators = self._random_search_evaluators()
+        constraints_evaluators, objectives_evaluators = evaluators
+        evaluators = constraints_evaluators + objectives_evaluators
+        random = self.random_generator
+        if random is None:
+            random = np.random
+        best_score, best_sequence = score, self.sequence
+        for iteration in self.logger.iter_bar(mutation=range(iters)):
+            if (best_possible_score is not None) and (
+                best_score >= best_possible_score
+            ):
+                self.logger(mutation__index=iters)
+                break
+            self.apply_random_mutations(evaluators)
+            if not all(e.passes for e in constraints_evaluators):
+                self.rollback_mutations(evaluators)
+                continue
+            new_score = sum(
+                [
+                    e.specification.boost * e.score
+                    for e in objectives_evaluators
+                ]
+            )
+            delta = new_score - score
+            if (delta >= 0) or (
+                random.random() < np.exp(delta / temperature(iteration))
+            ):
+                score = new_score
+                self.commit_mutations(evaluators)
+                if score > best_score:
+                    best_score, best_sequence = score, self.sequence
             else:
-                self.sequence = previous_sequence
+                self.rollback_mutations(evaluators)
+        self.sequence = best_sequence
+
+    def optimize_by_tabu_search(self, score, best_possible_score=None):
+        """Optimize the objectives by a tabu search.
+
+        At each iteration, ``tabu_neighborhood_size`` random moves (of
+        ``mutations_per_iteration`` mutations each) are evaluated, and the
+        best move passing all constraints is applied, even if it decreases the
+        objectives score. The mutation choices changed by this move then
+        become "tabu" and are left unchanged for the next ``tabu_tenure``
+        iterations, which prevents the search from cycling back to a local
+        optimum. The search stops after ``max_random_iters`` iterations, or
+        after ``optimization_stagnation_tolerance`` iterations without
+        improvement of the best score. The best sequence found is kept.
+        """
+        evaluators = self._random_search_evaluators()
+        constraints_evaluators, objectives_evaluators = evaluators
+        evaluators = constraints_evaluators + objectives_evaluators
+        choices = self.mutation_space.multichoices
+        tabu_until = {}
+        best_score, best_sequence = score, self.sequence
+        iters = self.max_random_iters
+        stagnating_iterations = 0
+        for iteration in self.logger.iter_bar(mutation=range(iters)):
+            if (best_possible_score is not None) and (
+                best_score >= best_possible_score
+            ):
+                self.logger(mutation__index=iters)
+                break
+            if (self.optimization_stagnation_tolerance is not None) and (
+                stagnating_iterations > self.optimization_stagnation_tolerance
+            ):
+                break
             stagnating_iterations += 1
+            allowed_choices = [
+                choice
+                for choice in choices
+                if tabu_until.get(choice.segment, -1) < iteration
+            ]
+            if len(allowed_choices) == 0:
+                allowed_choices = choices
+            best_move, best_move_score = None, None
+            for i in range(self.tabu_neighborhood_size):
+                mutations = self.mutation_space.pick_random_mutations(
+                    n_mutations=self.mutations_per_iteration,
+                    sequence=self.sequence_buffer,
+                    choices=allowed_choices,
+                    rng=self.random_generator,
+                )
+                self.apply_mutations(mutations, evaluators)
+                if all(e.passes for e in constraints_evaluators):
+                    move_score = sum(
+                        [
+                            e.specification.boost * e.score
+                            for e in objectives_evaluators
+                        ]
+                    )
+                    if (best_move is None) or (move_score > best_move_score):
+                        best_move, best_move_score = mutations, move_score
+                self.rollback_mutations(evaluators)
+            if best_move is None:
+                continue
+            self.apply_mutations(best_move, evaluators)
+            self.commit_mutations(evaluators)
+            score = best_move_score
+            for segment, variant in best_move:
+                tabu_until[segment] = iteration + self.tabu_tenure
+            if score > best_score:
+                best_score, best_sequence = score, self.sequence
+                stagnating_iterations = 0
+        self.sequence = best_sequence
+
+    def _random_search_evaluators(self):
+        """Return the evaluators of the constraints and of the objectives.
 
-    def optimize_objective(self, objective):
+        Constraints enforced by the mutation space always pass and get no
+        evaluator.
+        """
+        constraints_evaluators = self.specifications_evaluators(
+            [
+                c
+                for c in self.constraints
+                if not c.enforced_by_nucleotide_restrictions
+            ]
+        )
+        objectives_evaluators = self.specifications_evaluators(self.objectives)
+        return constraints_evaluators, objectives_evaluators
+
+    def optimize_by_random_batches(self, score, best_possible_score=None):
+        """Optimize the objectives by evaluating batches of random variants.
+
+        At each iteration, ``evaluation_batch_size`` random variants of the
+        current sequence are drawn (see ``random_candidates``) and evaluated
+        together by each specification (see ``Specification.scores_many``).
+        The best variant passing all constraints becomes the new sequence if
+        its score is above the current ``score``.
+        """
+        constraints = [
+            c
+            for c in self.constraints
+            if not c.enforced_by_nucleotide_restrictions
+        ]
+        iters = self.max_random_iters
+        stagnating_iterations = 0
+        for iteration in self.logger.iter_bar(mutation=range(iters)):
+            if (best_possible_score is not None) and (
+                score >= best_possible_score
+            ):
+                self.logger(mutation__index=iters)
+                break
+            if (self.optimization_stagnation_tolerance is not None) and (
+                stagnating_iterations > self.optimization_stagnation_tolerance
+            ):
+                break
+            candidates = self.random_candidates(self.evaluation_batch_size)
+            passing = self.candidates_passing_constraints(
+                candidates, constraints
+            )
+            scores = self.objective_scores_sums_many(
+                [candidates[i] for i in passing]
+            )
+            if len(scores) and (max(scores) > score):
+                best = int(np.argmax(scores))
+                score = scores[best]
+                self.sequence = candidates[passing[best]]
+                stagnating_iterations = 0
+            stagnating_iterations += 1
+
+    def optimize_objective(self, objective, deadline=None):
         """Optimize the total objective score, focusing on a single objective.
 
         This method will attempt to increase the global objective score by
@@ -125,6 +512,12 @@ class ObjectivesMaximizerMixin:
         For each location, a local problem is created and the optimization uses
         either a custom optimization algorithm, an exhaustive search, or a
         random search, to optimize the local problem
+
+        If the ``deadline`` (in the ``time.monotonic()`` clock) is reached,
+        the remaining locations are recorded in ``skipped_locations`` and
+        left as they are. If a time limit left some constraint breaches
+        unresolved, the locations where the (localized) constraints do not
+        pass are also recorded in ``skipped_locations`` and left as they are.
         """
         # EVALUATE OBJECTIVE. RETURN IF THERE IS NOTHING TO BE DONE.
         evaluation = objective.evaluate(self)
@@ -134,11 +527,24 @@ class ObjectivesMaximizerMixin:
         ):
             return
 
+        unresolved_breaches = any(
+            role == "constraint" for (role, _, _) in self.skipped_locations
+        )
+
         # FOR EACH LOCATION, CREATE AND OPTIMIZE A LOCAL PROBLEM.
 
-        for location in self.logger.iter_bar(
-            location=locations, bar_message=lambda l: str(l)
+        for i, location in enumerate(
+            self.logger.iter_bar(
+                location=locations, bar_message=lambda loc: str(loc)
+            )
         ):
+            if self._deadline_reached(deadline):
+                self._skip_locations("objective", objective, locations[i:])
+                self.logger(
+                    location__index=len(locations),
+                    location__message="Time limit reached",
+                )
+                return
             # Localize the mutation space by freezing any nucleotide outside of
             # it
             mutation_space = self.mutation_space.localized(location)
@@ -151,25 +557,30 @@ class ObjectivesMaximizerMixin:
             location = Location(*mutation_space.choices_span)
             localized_constraints = [
                 cst.localized(location, problem=self)
-                for cst in self.constraints
+                for cst in self.constraints_index.overlapping(location)
             ]
             localized_constraints = [
                 cst for cst in localized_constraints if cst is not None
             ]
             localized_objectives = [
                 obj.localized(location, problem=self)
-                for obj in self.objectives
+                for obj in self.objectives_index.overlapping(location)
                 if obj.boost != 0
             ]
             localized_objectives = [
                 obj for obj in localized_objectives if obj is not None
             ]
-            local_problem = self.__class__(
-                sequence=self.sequence,
+            local_problem = self.local_problem(
                 constraints=localized_constraints,
                 mutation_space=mutation_space,
                 objectives=localized_objectives,
             )
+            if unresolved_breaches and (
+                not local_problem.all_constraints_pass()
+            ):
+                # Some breaches here were left by a time limit.
+                self._skip_locations("objective", objective, [location])
+                continue
             self.logger.store(
                 problem=self, local_problem=local_problem, location=location
             )
@@ -183,6 +594,25 @@ class ObjectivesMaximizerMixin:
             local_problem.mutations_per_iteration = (
                 self.mutations_per_iteration
             )
+            local_problem.incremental_evaluation = (
+                self.incremental_evaluation
+            )
+            local_problem.exhaustive_search_order = (
+                self.exhaustive_search_order
+            )
+            local_problem.evaluation_batch_size = self.evaluation_batch_size
+            local_problem.local_search_strategy = self.local_search_strategy
+            local_problem.annealing_temperatures = (
+                self.annealing_temperatures
+            )
+            local_problem.tabu_tenure = self.tabu_tenure
+            local_problem.tabu_neighborhood_size = (
+                self.tabu_neighborhood_size
+            )
+            local_problem.random_search_chains = self.random_search_chains
+            local_problem.parallel_workers = self.parallel_workers
+            local_problem.adaptive_search = self.adaptive_search
+            local_problem.adaptive_search_window = self.adaptive_search_window
 
             # OPTIMIZE THE LOCAL PROBLEM
 
@@ -192,8 +622,9 @@ class ObjectivesMaximizerMixin:
             else:
                 # Run an exhaustive or random search depending on the size
                 # of the mutation space.
-                space_size = local_problem.mutation_space.space_size
-                exhaustive_search = space_size < self.randomization_threshold
+                exhaustive_search = local_problem.use_exhaustive_search(
+                    local_problem.constraints + local_problem.objectives
+                )
                 if exhaustive_search:
                     local_problem.optimize_by_exhaustive_search()
                 else:
@@ -204,7 +635,12 @@ class ObjectivesMaximizerMixin:
             self.sequence = local_problem.sequence
 
     def optimize(self):
-        """Maximize the total score by optimizing each objective in turn."""
+        """Maximize the total score by optimizing each objective in turn.
+
+        If the problem's ``time_limit`` or ``specification_time_limit`` are
+        reached, the remaining locations to optimize are recorded in
+        ``skipped_locations`` and the best sequence found so far is kept.
+        """
 
         objectives = [
             obj
@@ -213,7 +649,13 @@ class ObjectivesMaximizerMixin:
         ]
         if len(objectives) == 0:
             return
+        deadline = self._deadline_after(self.time_limit)
         for objective in self.logger.iter_bar(
             objective=objectives, bar_message=lambda o: str(o)
         ):
-            self.optimize_objective(objective=objective)
+            objective_deadline = self._deadline_after(
+                self.specification_time_limit, deadline
+            )
+            self.optimize_objective(
+                objective=objective, deadline=objective_deadline
+            )
@@ -0,0 +1,266 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from ...Location import Location
+from ..NoSolutionError import NoSolutionError
+
+
+class ProblemDecompositionMixin:
+    def independent_zones(self):
+        """Return the zones of the sequence which can be solved independently.
+
+        Two specifications are linked if the segments of the sequence they
+        read (see ``Specification.evaluation_location``) overlap, or overlap
+        the same multi-nucleotide mutation choice (e.g. a codon). The zones
+        returned are the spans of the connected components of this graph,
+        as a sorted list of Locations.
+
+        Returns None if some specification reads a segment of unknown extent,
+        in which case the problem cannot be decomposed.
+        """
+        specs_intervals = []
+        for spec in self.constraints + self.objectives:
+            location = spec.evaluation_location()
+            if location is None:
+                return None
+            specs_intervals.append((location.start, location.end))
+        choices_intervals = [
+            choice.segment
+            for choice in self.mutation_space.choices_list
+            if choice.end - choice.start > 1
+        ]
+        zones = []
+        for start, end in sorted(specs_intervals + choices_intervals):
+            if (zones != []) and (start < zones[-1][1]):
+                zones[-1][1] = max(zones[-1][1], end)
+            else:
+                zones.append([start, end])
+        # Zones made only of mutation choices have nothing to solve.
+        return [
+            Location(start, end)
+            for start, end in zones
+            if any(
+                (spec_start < end) and (start < spec_end)
+                for spec_start, spec_end in specs_intervals
+            )
+        ]
+
+    def zone_specifications(self, zone):
+        """Return the constraints and objectives reading inside the zone."""
+
+        def overlaps(spec):
+            location = spec.evaluation_location()
+            return (location.start < zone.end) and (zone.start < location.end)
+
+        constraints = [cst for cst in self.constraints if overlaps(cst)]
+        objectives = [obj for obj in self.objectives if overlaps(obj)]
+        return constraints, objectives
+
+    def subproblem(self, zone):
+        """Return a problem with the specifications overlapping the zone.
+
+        The subproblem has the full sequence of the problem, but its mutation
+        space is restricted to the zone. Its constraints and objectives are
+        (initialized on the subproblem) in the order of
+        ``zone_specifications``.
+        """
+        constraints, objectives = self.zone_specifications(zone)
+        subproblem = self.__class__(
+            sequence=self.sequence,
+            constraints=constraints,
+            objectives=objectives,
+            mutation_space=self.mutation_space.localized(zone),
+            logger=None,
+        )
+        for attribute in [
+            "randomization_threshold",
+            "max_random_iters",
+            "mutations_per_iteration",
+            "optimization_stagnation_tolerance",
+            "local_extensions",
+            "incremental_evaluation",
+            "exhaustive_search_order",
+            "evaluation_batch_size",
+            "local_search_strategy",
+            "annealing_temperatures",
+            "tabu_tenure",
+            "tabu_neighborhood_size",
+            "random_search_chains",
+            "breach_mutations_boost",
+            "local_solutions_cache",
+            "adaptive_search",
+            "adaptive_search_window",
+            "specification_time_limit",
+        ]:
+            setattr(subproblem, attribute, getattr(self, attribute))
+        return subproblem
+
+    def resolve_and_optimize_by_parts(self, optimize=True, final_check=True):
+        """Solve the constraints and optimize, one independent zone at a time.
+
+        The problem is decomposed into independent subproblems (see
+        ``independent_zones``), which are solved separately (on a pool of
+        ``parallel_workers`` processes if it is above 1) and whose solutions
+        are then written into the problem's sequence. Each subproblem gets its
+        own random seed (see ``spawn_random_seeds``), so results don't depend
+        on the number of workers. The subproblems share the problem's
+        ``time_limit``: their resolutions and optimizations stop when it is
+        reached (counting from the start of this method), and their skipped
+        locations are added to the problem's ``skipped_locations``.
+
+        If the problem cannot be decomposed (for instance because some global
+        specification links the whole sequence), this simply runs
+        ``resolve_constraints()``, then ``optimize()``.
+
+        Parameters
+        ----------
+
+        optimize
+          If False, only the constraints are resolved.
+
+        final_check
+          If True, check that all constraints pass at the end (see
+          ``resolve_constraints``), unless some breaches were skipped because
+          of the time limit.
+        """
+        zones = self.independent_zones()
+        if (zones is None) or (len(zones) < 2):
+            self.resolve_constraints(final_check=final_check)
+            if optimize:
+                self.optimize()
+            return
+        # The deadline is in the time.time() clock, shared by all processes.
+        deadline = None
+        if self.time_limit is not None:
+            deadline = time.time() + self.time_limit
+        seeds = self.spawn_random_seeds(len(zones))
+        # The subproblems are created one at a time, when they are solved, so
+        # that only one full-length sequence per worker is kept in memory.
+        tasks = [
+            (zone, seed, optimize, deadline)
+            for zone, seed in zip(zones, seeds)
+        ]
+        # The random state is restored after the subproblems, as in the
+        # parallel case, where the subproblems don't affect this process.
+        random_state = np.random.get_state()
+        try:
+            if (self.parallel_workers or 1) > 1:
+                # The workers receive the problem (without logger) only once,
+                # and create the subproblems of their zones from it.
+                full_zone = Location(0, len(self.sequence))
+                pool = ProcessPoolExecutor(
+                    max_workers=self.parallel_workers,
+                    initializer=_set_worker_problem,
+                    initargs=(self.subproblem(full_zone),),
+                )
+                with pool:
+                    results = list(pool.map(_solve_worker_zone, tasks))
+            else:
+                results = [
+                    _solve_subproblem((self.subproblem(task[0]),) + task)
+                    for task in tasks
+                ]
+            sequence = bytearray(self.sequence.encode())
+            for zone, result in zip(zones, results):
+                if result is not None:
+                    subsequence, skipped_locations = result
+                    sequence[zone.start : zone.end] = subsequence.encode()
+                    self._skip_zone_locations(zone, skipped_locations)
+            self.sequence = sequence.decode()
+
+            # Subproblems which failed are solved again in this process, so
+            # that the NoSolutionError is raised with the failing subproblem
+            # attached.
+            for zone, seed, result in zip(zones, seeds, results):
+                if result is None:
+                    subproblem = self.subproblem(zone)
+                    task = (subproblem, zone, seed, optimize, deadline)
+                    subsequence, skipped_locations = _solve_subproblem(
+                        task, catch_errors=False
+                    )
+                    self.sequence = (
+                        self.sequence[: zone.start]
+                        + subsequence
+                        + self.sequence[zone.end :]
+                    )
+                    self._skip_zone_locations(zone, skipped_locations)
+        finally:
+            np.random.set_state(random_state)
+        skipped_constraints = [
+            location
+            for (role, spec, location) in self.skipped_locations
+            if role == "constraint"
+        ]
+        if final_check and (len(skipped_constraints) == 0):
+            self.perform_final_constraints_check()
+
+    def _skip_zone_locations(self, zone, skipped_locations):
+        """Record the locations skipped by the subproblem of a zone.
+
+        ``skipped_locations`` is a list ``[(role, index, location)]`` where
+        index refers to the zone's constraints or objectives (see
+        ``zone_specifications``).
+        """
+        constraints, objectives = self.zone_specifications(zone)
+        specifications = dict(constraint=constraints, objective=objectives)
+        for role, index, location in skipped_locations:
+            specification = specifications[role][index]
+            self._skip_locations(role, specification, [location])
+
+
+_worker_problem = None
+
+
+def _set_worker_problem(problem):
+    """Store the problem whose zones a worker process will solve."""
+    global _worker_problem
+    _worker_problem = problem
+
+
+def _solve_worker_zone(task):
+    """Solve the subproblem of a zone of the worker's problem.
+
+    ``task`` is of the form ``(zone, seed, optimize, deadline)``, see
+    ``_solve_subproblem``.
+    """
+    zone = task[0]
+    return _solve_subproblem((_worker_problem.subproblem(zone),) + task)
+
+
+def _solve_subproblem(task, catch_errors=True):
+    """Solve a subproblem and return its new sequence on the zone.
+
+    This is run by ``ProblemDecompositionMixin.resolve_and_optimize_by_parts``
+    (through ``_solve_worker_zone`` in worker processes). Returns
+    ``(subsequence, skipped_locations)`` (see ``_skip_zone_locations``), or
+    None if the subproblem's constraints could not be resolved (or raises the
+    NoSolutionError if ``catch_errors`` is False). The subproblem's time
+    limits end at the ``deadline`` (in the ``time.time()`` clock).
+    """
+    subproblem, zone, seed, optimize, deadline = task
+    subproblem.seed_random_stream(seed)
+
+    def set_time_limit():
+        if deadline is not None:
+            subproblem.time_limit = max(0, deadline - time.time())
+
+    set_time_limit()
+    try:
+        subproblem.resolve_constraints(final_check=False)
+    except NoSolutionError as error:
+        if catch_errors:
+            return None
+        raise error
+    if optimize:
+        set_time_limit()
+        subproblem.optimize()
+    specifications = dict(
+        constraint=subproblem.constraints, objective=subproblem.objectives
+    )
+    skipped_locations = [
+        (role, specifications[role].index(specification), location)
+        for role, specification, location in subproblem.skipped_locations
+    ]
+    return subproblem.sequence[zone.start : zone.end], skipped_locations
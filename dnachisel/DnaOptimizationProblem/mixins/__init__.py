@@ -1,9 +1,11 @@
 from .ConstraintsSolverMixin import ConstraintsSolverMixin
 from .ObjectivesMaximizerMixin import ObjectivesMaximizerMixin
+from .ProblemDecompositionMixin import ProblemDecompositionMixin
 from .RecordRepresentationMixin import RecordRepresentationMixin
 
 __all__ = [
     'ConstraintsSolverMixin',
     'ObjectivesMaximizerMixin',
+    'ProblemDecompositionMixin',
     'RecordRepresentationMixin'
 ]
@@ -0,0 +1,459 @@
+"""Define CompactMutationSpace"""
+
+import numpy as np
+
+from ..biotools import random_integers
+from .MutationChoice import (
+    MutationChoice,
+    other_variants,
+    other_variant,
+    random_indices,
+)
+from .MutationSpace import MutationSpace
+from .codons_masks import (
+    constraints_restrictions,
+    has_codons_masks,
+    split_codons_restrictions,
+    codons_pieces,
+    pieces_variants_pool,
+)
+
+# Values of ``choices_ids`` in ``from_optimization_problem`` for positions
+# where any nucleotide is allowed, and positions without mutation choice.
+_ANY_NUCLEOTIDE = -1
+_NO_CHOICE = -2
+
+
+class CompactMutationSpace(MutationSpace):
+    """Mutation space stored in numpy arrays, for very long sequences.
+
+    A MutationSpace has one MutationChoice object per nucleotide (or group of
+    nucleotides) of the sequence. For sequences of several megabases, this
+    represents tens of millions of Python objects. The CompactMutationSpace
+    stores the same information in a few arrays, and only creates
+    MutationChoice objects on demand (for instance when the ``multichoices``
+    of a small localized space are explored by the solver). It has the same
+    API as MutationSpace.
+
+    A localized CompactMutationSpace is a view on the arrays of the full
+    space, restricted to a range of choices.
+
+    Examples
+    --------
+
+    >>> problem = DnaOptimizationProblem(
+    >>>     sequence, constraints=constraints, compact_mutation_space=True
+    >>> )
+    >>> problem.resolve_constraints()
+
+    Parameters
+    ----------
+
+    segments_starts, segments_ends
+      Arrays of the starts and ends of the mutation choices' segments, sorted
+      by start.
+
+    variants_offsets
+      Array such that the variants of the i-th choice are
+      ``variants_pool[variants_offsets[i]:variants_offsets[i + 1]]``.
+
+    variants_pool
+      uint8 array of all the variants of all choices, concatenated. The
+      variants of each choice are in alphabetical order.
+
+    choices_indices
+      int32 array giving, for each position of the sequence, the index of the
+      choice governing the mutations at this position (-1 for none).
+
+    any_nucleotide
+      Boolean array indicating which choices allow any nucleotide (see
+      ``MutationChoice.is_any_nucleotide``).
+    """
+
+    def __init__(
+        self,
+        segments_starts,
+        segments_ends,
+        variants_offsets,
+        variants_pool,
+        choices_indices,
+        any_nucleotide=None,
+    ):
+        """Initialize."""
+        self.segments_starts = segments_starts
+        self.segments_ends = segments_ends
+        self.variants_offsets = variants_offsets
+        self.variants_pool = variants_pool
+        self.choices_indices = choices_indices
+        if any_nucleotide is None:
+            any_nucleotide = np.zeros(len(segments_starts), dtype=bool)
+        self.any_nucleotide = any_nucleotide
+        sizes = np.diff(variants_offsets)
+        lengths = np.maximum(1, segments_ends - segments_starts)
+        self.variants_counts = sizes // lengths
+        self.first, self.last = 0, len(segments_starts)
+        self.start, self.end = 0, len(choices_indices)
+        self._indexed = False
+        self._multichoices = None
+        # MutationChoice objects created on demand, shared with localizations.
+        self._choices = {}
+
+    def _choices_arrays(self):
+        """Return the arrays ``(counts, positions_choices)`` from which the
+        indices of the space are computed (see ``_index_choices``)."""
+        return self.variants_counts, self.choices_indices
+
+    def choice(self, index):
+        """Return the MutationChoice object of the choice with that index."""
+        if index not in self._choices:
+            start = int(self.segments_starts[index])
+            end = int(self.segments_ends[index])
+            self._choices[index] = MutationChoice(
+                (start, end),
+                variants=set(self.choice_variants(index)),
+                is_any_nucleotide=bool(self.any_nucleotide[index]),
+            )
+        return self._choices[index]
+
+    def choice_variants(self, index):
+        """Return the sorted list of variants of the choice with that index."""
+        length = self.segments_ends[index] - self.segments_starts[index]
+        pool_start = self.variants_offsets[index]
+        pool_end = self.variants_offsets[index + 1]
+        variants = self.variants_pool[pool_start:pool_end].tobytes().decode()
+        return [
+            variants[i : i + length] for i in range(0, len(variants), length)
+        ]
+
+    @property
+    def choices_list(self):
+        return [self.choice(i) for i in range(self.first, self.last)]
+
+    @property
+    def unsolvable_segments(self):
+        return [
+            (int(self.segments_starts[i]), int(self.segments_ends[i]))
+            for i in self._indices_in_space("unsolvable")
+        ]
+
+    @property
+    def determined_segments(self):
+        return [
+            (
+                (int(self.segments_starts[i]), int(self.segments_ends[i])),
+                self.choice_variants(i)[0],
+            )
+            for i in self._indices_in_space("determined")
+        ]
+
+    @property
+    def choices_index(self):
+        return self.start * [None] + [
+            None if index < 0 else self.choice(index)
+            for index in self.choices_indices[self.start : self.end]
+        ]
+
+    @property
+    def choices_span(self):
+        """Return (start, end), segment where multiple choices are possible."""
+        indices = self.multichoices_indices()
+        if len(indices) == 0:
+            return None
+        start = int(self.segments_starts[indices[0]])
+        return start, int(self.segments_ends[indices[-1]])
+
+    def multichoices_bounds(self):
+        """Return the arrays of the starts and ends of the multichoices."""
+        indices = self.multichoices_indices()
+        return self.segments_starts[indices], self.segments_ends[indices]
+
+    def detached(self):
+        """Return a standalone copy of a localized space, without the data
+        of the full space."""
+        first, last = self.first, self.last
+        offsets = self.variants_offsets[first : last + 1]
+        choices_indices = np.full(self.end, -1, dtype="int32")
+        indices = self.choices_indices[self.start : self.end]
+        choices_indices[self.start :] = np.where(
+            indices >= 0, indices - first, -1
+        )
+        return CompactMutationSpace(
+            segments_starts=self.segments_starts[first:last],
+            segments_ends=self.segments_ends[first:last],
+            variants_offsets=offsets - offsets[0],
+            variants_pool=self.variants_pool[offsets[0] : offsets[-1]],
+            choices_indices=choices_indices,
+            any_nucleotide=self.any_nucleotide[first:last],
+        )
+
+    def constrain_sequence(self, sequence, rng=None):
+        """Return a version of the sequence compatible with the mutation space.
+
+        All nucleotides of the sequence that are incompatible with the
+        mutation space are replaced by nucleotides compatible with the space,
+        drawn with the ``numpy.random.Generator`` ``rng`` if provided, else
+        with numpy's global random state (the random draws are the same as in
+        ``MutationSpace.constrain_sequence``).
+        """
+        unsolvable = self._indices_in_space("unsolvable")
+        if len(unsolvable):
+            raise ValueError(
+                "Cannot constrain a sequence when some "
+                "positions are unsolvable, in location "
+                "(%d-%d)"
+                % (
+                    self.segments_starts[unsolvable[0]],
+                    self.segments_ends[unsolvable[0]],
+                )
+            )
+        new_sequence = np.frombuffer(sequence.encode(), dtype="uint8").copy()
+        indices = np.arange(self.first, self.last)
+        compatible = self._sequence_is_a_variant(new_sequence, indices)
+        for index in indices[~compatible]:
+            variants = self.choice_variants(index)
+            if len(variants) > 1:
+                variants = [variants[random_integers(len(variants), rng=rng)]]
+            start, end = self.segments_starts[index], self.segments_ends[index]
+            new_sequence[start:end] = np.frombuffer(
+                variants[0].encode(), dtype="uint8"
+            )
+        return new_sequence.tobytes().decode()
+
+    def _sequence_is_a_variant(self, sequence_array, indices):
+        """Return whether the subsequence at each choice is one of its
+        variants (as an array of booleans, one per choice index)."""
+        result = np.zeros(len(indices), dtype=bool)
+        starts = self.segments_starts[indices]
+        lengths = self.segments_ends[indices] - starts
+        counts = self.variants_counts[indices]
+        offsets = self.variants_offsets[indices]
+        for length in np.unique(lengths):
+            selected = np.flatnonzero(lengths == length)
+            span = np.arange(length)
+            subsequences = sequence_array[starts[selected, None] + span]
+            for rank in range(counts[selected].max()):
+                has_rank = counts[selected] > rank
+                rows = selected[has_rank]
+                variants_starts = offsets[rows] + rank * length
+                variants = self.variants_pool[variants_starts[:, None] + span]
+                matches = (subsequences[has_rank] == variants).all(axis=1)
+                result[rows] |= matches
+        return result
+
+    def pick_random_mutations(
+        self, n_mutations, sequence, choices=None, rng=None, weights=None
+    ):
+        """Draw N random mutations.
+
+        See ``MutationSpace.pick_random_mutations``. When no ``choices`` are
+        provided, the mutations are drawn from the arrays of the space (with
+        the same random draws as ``MutationSpace.pick_random_mutations``),
+        without creating MutationChoice objects.
+        """
+        if choices is not None:
+            return MutationSpace.pick_random_mutations(
+                self, n_mutations, sequence, choices=choices, rng=rng,
+                weights=weights,
+            )
+        multichoices = self.multichoices_indices()
+        indices = self.random_choices_indices(
+            len(multichoices), n_mutations, rng=rng, weights=weights
+        )
+        segments, tables = [], []
+        for index in multichoices[indices]:
+            start = int(self.segments_starts[index])
+            end = int(self.segments_ends[index])
+            variants = self.choice_variants(index)
+            segments.append((start, end))
+            tables.append(other_variants(variants, sequence[start:end]))
+        draws = random_indices([count for _, _, count in tables], rng=rng)
+        return [
+            (segment, other_variant(variants, rank, draw))
+            for segment, (variants, rank, _), draw in zip(
+                segments, tables, draws
+            )
+        ]
+
+    @staticmethod
+    def from_mutation_space(mutation_space):
+        """Return the CompactMutationSpace equivalent to a MutationSpace."""
+        choices_ids, choices = _choices_ids(mutation_space.choices_index)
+        return CompactMutationSpace._from_choices_ids(choices_ids, choices)
+
+    @staticmethod
+    def from_optimization_problem(problem, new_constraints=None):
+        """Create a mutation space from a DNA optimization problem.
+
+        This gives the same mutation space as
+        ``MutationSpace.from_optimization_problem``, without creating one
+        MutationChoice per nucleotide: only the choices restricted by the
+        constraints are created, and the space is then stored in arrays.
+        """
+        sequence = problem.sequence
+        max_variants = getattr(problem, "max_merged_variants", None)
+
+        if new_constraints is None:
+            choices_ids = np.full(len(sequence), _ANY_NUCLEOTIDE, "int32")
+            choices = []
+            constraints = problem.constraints
+        else:
+            choices_ids, choices = _choices_ids(
+                problem.mutation_space.choices_index
+            )
+            constraints = new_constraints
+        restrictions = constraints_restrictions(constraints, sequence)
+        if has_codons_masks(restrictions):
+            restricted_positions = choices_ids != _ANY_NUCLEOTIDE
+            split = split_codons_restrictions(
+                restrictions, sequence, restricted_positions
+            )
+            restrictions, codons_starts, codons_masks = split
+        else:
+            # No codons masks: all restrictions are merged one by one.
+            restrictions = [c for choices in restrictions for c in choices]
+            codons_starts = np.zeros(0, dtype=int)
+            codons_masks = np.zeros(0, dtype="u8")
+        # The codons pieces get IDs after all other choices (see below).
+        pieces = codons_pieces(codons_starts, codons_masks)
+        pieces_starts, _, pieces_lengths, _ = pieces
+        pieces_ids = np.repeat(np.arange(len(pieces_starts)), pieces_lengths)
+        pieces_positions = _concatenated_ranges(pieces_starts, pieces_lengths)
+        mutation_choices = sorted(
+            restrictions,
+            key=lambda choice: (choice.end - choice.start, choice.start),
+        )
+        for choice in mutation_choices:
+            underlying_ids = choices_ids[choice.start : choice.end]
+            if (underlying_ids == _ANY_NUCLEOTIDE).all():
+                new_choice = choice
+            else:
+                underlying_choices = set(
+                    choices[choice_id]
+                    if choice_id != _ANY_NUCLEOTIDE
+                    else MutationChoice(
+                        (i, i + 1), variants="ACGT", is_any_nucleotide=True
+                    )
+                    for i, choice_id in enumerate(
+                        underlying_ids, choice.start
+                    )
+                )
+                new_choice = choice.merge_with(
+                    underlying_choices, max_variants=max_variants
+                )
+            for choice in new_choice.extract_varying_region():
+                if choice.end > len(choices_ids):
+                    missing = choice.end - len(choices_ids)
+                    choices_ids = np.concatenate(
+                        [choices_ids, np.full(missing, _NO_CHOICE, "int32")]
+                    )
+                choices_ids[choice.start : choice.end] = len(choices)
+                choices.append(choice)
+        choices_ids[pieces_positions] = len(choices) + pieces_ids
+        return CompactMutationSpace._from_choices_ids(
+            choices_ids, choices, pieces=pieces
+        )
+
+    @staticmethod
+    def _from_choices_ids(choices_ids, choices, pieces=None):
+        """Build the space from the choice ID of each position.
+
+        The IDs are indices in the ``choices`` list, or ``_ANY_NUCLEOTIDE``,
+        or ``_NO_CHOICE``. Like in MutationSpace, each run of positions with
+        the same choice gives one choice of the space.
+
+        ``pieces`` are optional codons pieces, as returned by
+        ``codons_pieces``, with IDs ``len(choices) + i``.
+        """
+        n_positions = len(choices_ids)
+        # Each any-nucleotide position is a run of its own.
+        runs_keys = np.where(
+            choices_ids == _ANY_NUCLEOTIDE,
+            -3 - np.arange(n_positions),
+            choices_ids,
+        )
+        is_run_start = np.ones(n_positions, dtype=bool)
+        is_run_start[1:] = runs_keys[1:] != runs_keys[:-1]
+        runs_starts = np.flatnonzero(is_run_start)
+        runs_ids = choices_ids[runs_starts]
+        has_choice = runs_ids != _NO_CHOICE
+        runs_indices = np.full(len(runs_starts), -1, dtype="int32")
+        runs_indices[has_choice] = np.arange(np.count_nonzero(has_choice))
+        choices_indices = runs_indices[np.cumsum(is_run_start) - 1]
+
+        ids = runs_ids[has_choice]
+        any_nucleotide = ids == _ANY_NUCLEOTIDE
+        starts = runs_starts[has_choice]
+        ends = starts + 1
+        sizes = np.full(len(ids), 4)
+        is_piece = ids >= len(choices)
+        if pieces is not None:
+            _, pieces_offsets, pieces_lengths, pieces_masks = pieces
+            pieces_variants_offsets, pieces_pool = pieces_variants_pool(
+                pieces_offsets, pieces_lengths, pieces_masks
+            )
+            pieces_indices = ids[is_piece] - len(choices)
+            ends[is_piece] = starts[is_piece] + pieces_lengths[pieces_indices]
+            sizes[is_piece] = np.diff(pieces_variants_offsets)[pieces_indices]
+        restricted_variants = {}
+        for index in np.flatnonzero(~any_nucleotide & ~is_piece):
+            choice = choices[ids[index]]
+            starts[index], ends[index] = choice.segment
+            variants = "".join(sorted(choice.variants)).encode()
+            restricted_variants[index] = variants
+            sizes[index] = len(variants)
+        offsets = np.zeros(len(ids) + 1, dtype="int64")
+        offsets[1:] = np.cumsum(sizes)
+        pool = np.zeros(offsets[-1], dtype="uint8")
+        any_offsets = offsets[:-1][any_nucleotide]
+        pool[any_offsets[:, None] + np.arange(4)] = np.frombuffer(
+            b"ACGT", dtype="uint8"
+        )
+        for index, variants in restricted_variants.items():
+            pool[offsets[index] : offsets[index + 1]] = np.frombuffer(
+                variants, dtype="uint8"
+            )
+        if pieces is not None:
+            pieces_sizes = sizes[is_piece]
+            pool[
+                _concatenated_ranges(offsets[:-1][is_piece], pieces_sizes)
+            ] = pieces_pool[
+                _concatenated_ranges(
+                    pieces_variants_offsets[pieces_indices], pieces_sizes
+                )
+            ]
+        return CompactMutationSpace(
+            segments_starts=starts,
+            segments_ends=ends,
+            variants_offsets=offsets,
+            variants_pool=pool,
+            choices_indices=choices_indices,
+            any_nucleotide=any_nucleotide,
+        )
+
+
+def _choices_ids(choices_index):
+    """Return an array of choice IDs and the list of choices they refer to,
+    from a MutationSpace's ``choices_index`` (see
+    ``CompactMutationSpace._from_choices_ids``)."""
+    choices_ids = np.full(len(choices_index), _NO_CHOICE, dtype="int32")
+    choices = []
+    ids = {}
+    for i, choice in enumerate(choices_index):
+        if choice is None:
+            continue
+        if choice.is_any_nucleotide and (choice.end - choice.start == 1):
+            choices_ids[i] = _ANY_NUCLEOTIDE
+            continue
+        if id(choice) not in ids:
+            ids[id(choice)] = len(choices)
+            choices.append(choice)
+        choices_ids[i] = ids[id(choice)]
+    return choices_ids, choices
+
+
+def _concatenated_ranges(starts, lengths):
+    """Return the concatenation of the ranges [start, start + length]."""
+    lengths = np.asarray(lengths)
+    shifts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    positions = np.arange(shifts.size) - shifts
+    return np.repeat(starts, lengths).astype("int64") + positions
@@ -1,7 +1,9 @@
-from ..biotools import windows_overlap
-import itertools
+from bisect import bisect_left
+
 import numpy as np
 
+from ..biotools import random_integers
+
 
 class MutationChoice:
     """Represent a segment of a sequence with several possible variants.
@@ -24,7 +26,14 @@ class MutationChoice:
 
     """
 
-    __slots__ = ["segment", "start", "end", "variants", "is_any_nucleotide"]
+    __slots__ = [
+        "segment",
+        "start",
+        "end",
+        "variants",
+        "is_any_nucleotide",
+        "_sorted_variants",
+    ]
 
     def __init__(self, segment, variants, is_any_nucleotide=False):
         if isinstance(segment, int):
@@ -33,21 +42,54 @@ class MutationChoice:
         self.start, self.end = segment
         self.variants = variants
         self.is_any_nucleotide = is_any_nucleotide
+        self._sorted_variants = None
         # self.possible_subsequences = set(m.subsequence for m in mutations)
 
-    def random_variant(self, sequence):
-        """Return one of the variants, randomly."""
-        subsequence = sequence[self.start : self.end]
-        variants = [v for v in self.variants if v != subsequence]
-        # the sorting of variants seems essential to ensure reproducibility
-        # between sessions.
-        # it does not slow down the global algorithm (or less than 3%)
-        variants = sorted(variants)
-        return variants[np.random.randint(len(variants))]
-
-    def merge_with(self, others):
+    @property
+    def sorted_variants(self):
+        """Tuple of the variants in alphabetical order (computed once).
+
+        The variants are sorted to ensure the reproducibility of the random
+        draws between sessions. The variants of a choice should not be
+        modified after this is first computed.
+        """
+        if self._sorted_variants is None:
+            self._sorted_variants = tuple(sorted(self.variants))
+        return self._sorted_variants
+
+    def random_variant(self, sequence, rng=None):
+        """Return one of the variants, randomly.
+
+        The variant is drawn with the ``numpy.random.Generator`` ``rng`` if
+        provided, else with numpy's global random state.
+        """
+        return MutationChoice.random_variants([self], sequence, rng=rng)[0]
+
+    @staticmethod
+    def random_variants(choices, sequence, rng=None):
+        """Return a random variant of each choice, different from the
+        sequence.
+
+        This gives the same variants as calling ``random_variant`` on each
+        choice in turn, with the indices of many variants drawn at once (see
+        ``random_indices``).
+        """
+        tables = []
+        for choice in choices:
+            subsequence = sequence[choice.start : choice.end]
+            tables.append(other_variants(choice.sorted_variants, subsequence))
+        draws = random_indices([count for _, _, count in tables], rng=rng)
+        return [
+            other_variant(variants, rank, draw)
+            for (variants, rank, _), draw in zip(tables, draws)
+        ]
+
+    def merge_with(self, others, max_variants=None):
         """Merge this mutation choice with others to form a single choice
 
+        The ``others`` choices must be contiguous and cover this choice's
+        segment (like the choices of a mutation space under this choice).
+
         Examples:
         ---------
 
@@ -65,31 +107,84 @@ class MutationChoice:
         at least one choice in each of the MutationChoices
         >>> (0, 7), {'GTATACC', 'GTATATG'}
 
+        The merged variants are built from left to right: a partial variant
+        is only extended with variants of the next choice that keep it
+        compatible with the prefixes of this choice's variants (i.e. the
+        nodes of their prefix trie), so incompatible combinations are never
+        built.
+
+        Parameters
+        ----------
+
+        others
+          The MutationChoices to merge with this choice.
+
+        max_variants
+          If provided, a ValueError is raised when the merged choice would
+          have more variants than this, before they are built.
         """
         others = sorted(others, key=lambda o: o.start)
-        others_start = others[0].start
-        final_segment = others_start, others[-1].end
-        final_variants = set()
-        for candidate in self.variants:
-            slots = []
-            for other in others:
-                istart, iend = windows_overlap(other.segment, self.segment)
-                slot = []
-                for variant in other.variants:
-                    subseq = variant[istart - other.start : iend - other.start]
-                    subcandidate = candidate[
-                        istart - self.start : iend - self.start
-                    ]
-                    if subseq == subcandidate:
-                        slot.append(variant)
-                slots.append(slot)
-            for subseqs in itertools.product(*slots):
-                seq = "".join(subseqs)
-                matching_seq = seq[
-                    self.start - others_start : self.end - others_start
+        final_segment = others[0].start, others[-1].end
+        trie_nodes = set(
+            variant[:i]
+            for variant in self.variants
+            for i in range(len(variant) + 1)
+        )
+        # Each step maps the trie nodes reached after the choice (i.e. the
+        # parts of this choice's variants covered so far) to the list of the
+        # (previous_node, variant) transitions leading to them.
+        steps = []
+        counts = {"": 1}
+        for other in others:
+            istart = max(self.start, other.start)
+            iend = min(self.end, other.end)
+            step = {}
+            for variant in other.variants:
+                subseq = variant[istart - other.start : iend - other.start]
+                for node in counts:
+                    new_node = node + subseq
+                    if new_node in trie_nodes:
+                        step.setdefault(new_node, []).append((node, variant))
+            counts = {
+                node: sum(counts[previous] for previous, _ in transitions)
+                for node, transitions in step.items()
+            }
+            steps.append(step)
+        final_nodes = [node for node in counts if node in self.variants]
+        n_variants = sum(counts[node] for node in final_nodes)
+        if (max_variants is not None) and (n_variants > max_variants):
+            raise ValueError(
+                "Merging the mutation choice at %d-%d with %d other choices "
+                "gives %d variants (max_variants=%d)."
+                % (self.start, self.end, len(others), n_variants, max_variants)
+            )
+        # Keep only the transitions leading to complete variants, then build
+        # the merged variants from left to right.
+        useful_nodes = set(final_nodes)
+        for i in range(len(steps) - 1, -1, -1):
+            steps[i] = {
+                node: transitions
+                for node, transitions in steps[i].items()
+                if node in useful_nodes
+            }
+            useful_nodes = set(
+                previous
+                for transitions in steps[i].values()
+                for previous, _ in transitions
+            )
+        sequences = {"": [""]}
+        for step in steps:
+            sequences = {
+                node: [
+                    sequence + variant
+                    for previous, variant in transitions
+                    for sequence in sequences[previous]
                 ]
-                if matching_seq == candidate:
-                    final_variants.add(seq)
+                for node, transitions in step.items()
+            }
+        final_variants = set(
+            sequence for node in final_nodes for sequence in sequences[node]
+        )
         return MutationChoice(segment=final_segment, variants=final_variants)
 
     def extract_varying_region(self):
@@ -159,3 +254,40 @@ class MutationChoice:
         """Represent."""
         subsequences = "-".join(self.variants)
         return "MutChoice(%d-%d %s)" % (self.start, self.end, subsequences)
+
+
+# Below this number of draws, one call to the random generator per draw is
+# faster than a vectorized call.
+VECTORIZED_DRAWS_THRESHOLD = 16
+
+
+def random_indices(counts, rng=None):
+    """Return a list of random integers in ``[0, count[`` for each count.
+
+    Many integers are drawn with a single vectorized call, which consumes the
+    random generator (``rng`` or numpy's global random state) exactly like
+    one call per count, so the results are the same.
+    """
+    if len(counts) < VECTORIZED_DRAWS_THRESHOLD:
+        return [random_integers(count, rng=rng) for count in counts]
+    return random_integers(np.array(counts), rng=rng).tolist()
+
+
+def other_variants(sorted_variants, subsequence):
+    """Return ``(sorted_variants, rank, count)`` where ``rank`` is the index
+    of the subsequence in the sorted variants (None if it isn't a variant)
+    and ``count`` is the number of variants different from the
+    subsequence."""
+    count = len(sorted_variants)
+    rank = bisect_left(sorted_variants, subsequence)
+    if (rank == count) or (sorted_variants[rank] != subsequence):
+        return sorted_variants, None, count
+    return sorted_variants, rank, count - 1
+
+
+def other_variant(sorted_variants, rank, index):
+    """Return the index-th of the sorted variants, skipping the variant with
+    the given rank (if not None)."""
+    if (rank is not None) and (index >= rank):
+        index += 1
+    return sorted_variants[index]
@@ -3,7 +3,15 @@
 import itertools
 import numpy as np
 
+from ..biotools import random_integers
 from .MutationChoice import MutationChoice
+from .codons_masks import (
+    constraints_restrictions,
+    has_codons_masks,
+    split_codons_restrictions,
+    codons_pieces,
+    pieces_choices,
+)
 
 
 class MutationSpace:
@@ -28,6 +36,16 @@ class MutationSpace:
             MutationChoice((2, 5), {'TTC', 'TTA', 'TTT'}), #
             MutationChoice((2, 5), {'TTC', 'TTA', 'TTT'}),
         ])
+
+    Notes
+    -----
+
+    Localized mutation spaces (see ``localized``) are views on the data of
+    the full space, restricted to a range of positions and choices. Indices
+    and prefix sums computed once for the full space give the choices, the
+    ``space_size`` and the ``choices_span`` of a view in (nearly) constant
+    time. These indices are only computed when first needed, as many spaces
+    (e.g. the spaces of local problems) are never localized.
     """
 
     def __init__(self, choices_index, left_padding=0):
@@ -37,36 +55,136 @@ class MutationSpace:
                          MutationChoice(3-5), MutationChoice(3-5),
                          MutationChoice(3-5), ... ]
         """
-        self.choices_index = left_padding * [None] + choices_index
-        self.choices_list = []
-        self.unsolvable_segments = []
-        self.determined_segments = []
-        self.multichoices = []
+        self._choices_index = left_padding * [None] + choices_index
+        self._choices_list = []
         for c in choices_index:
             if c is None:
                 continue
-            if len(self.choices_list) == 0 or (c != self.choices_list[-1]):
-                self.choices_list.append(c)
-                nvariants = len(c.variants)
-                if nvariants == 0:
-                    self.unsolvable_segments.append(c.segment)
-                elif nvariants == 1:
-                    self.determined_segments.append((c.segment, list(c.variants)[0]))
-                else:
-                    self.multichoices.append(c)
+            if len(self._choices_list) == 0 or (c != self._choices_list[-1]):
+                self._choices_list.append(c)
+        # The space covers choices [first, last) and positions [start, end).
+        self.first, self.last = 0, len(self._choices_list)
+        self.start, self.end = 0, len(self._choices_index)
+        self._indexed = False
+        self._multichoices = None
+
+    def _choices_arrays(self):
+        """Return the arrays ``(counts, positions_choices)`` from which the
+        indices of the space are computed (see ``_index_choices``)."""
+        positions_choices = len(self._choices_index) * [-1]
+        choice_index = -1
+        for i, c in enumerate(self._choices_index):
+            if c is None:
+                continue
+            if (choice_index < 0) or (c != self._choices_list[choice_index]):
+                choice_index += 1
+            positions_choices[i] = choice_index
+        counts = [len(c.variants) for c in self._choices_list]
+        return (
+            np.array(counts, dtype=int),
+            np.array(positions_choices, dtype="int32"),
+        )
+
+    def _index(self):
+        """Compute the indices used by the views of the space, if needed."""
+        if not self._indexed:
+            self._index_choices(*self._choices_arrays())
+
+    def _index_choices(self, counts, positions_choices):
+        """Precompute the indices used by the views of the mutation space.
+
+        ``counts`` is the array of the number of variants of each choice, and
+        ``positions_choices`` gives the index of the choice at each position
+        (-1 for none). The choice indices must increase with the positions.
+        """
+        self._multichoices_indices = np.flatnonzero(counts > 1)
+        self._determined_indices = np.flatnonzero(counts == 1)
+        self._unsolvable_indices = np.flatnonzero(counts == 0)
+        log_sizes = np.log(np.maximum(1, counts))
+        self._log_sizes_cumsum = np.concatenate([[0], np.cumsum(log_sizes)])
+        # Last choice at or before each position, and first choice at or
+        # after each position, used to localize the space.
+        self._previous_choice = np.maximum.accumulate(positions_choices)
+        next_choice = np.where(
+            positions_choices >= 0, positions_choices, len(counts)
+        )
+        self._next_choice = np.minimum.accumulate(next_choice[::-1])[::-1]
+        self._indexed = True
+
+    def choice(self, index):
+        """Return the MutationChoice with that index in the full space."""
+        return self._choices_list[index]
+
+    def _indices_in_space(self, kind):
+        """Return the indices of the choices of a kind in the space.
+
+        The kind is "multichoices", "determined" or "unsolvable".
+        """
+        self._index()
+        indices = getattr(self, "_%s_indices" % kind)
+        bounds = np.searchsorted(indices, [self.first, self.last])
+        return indices[bounds[0] : bounds[1]]
+
+    def multichoices_indices(self):
+        """Return the indices of the choices with several variants."""
+        return self._indices_in_space("multichoices")
+
+    @property
+    def choices_index(self):
+        """List giving the MutationChoice at each position (None if none)."""
+        if (self.start, self.end) == (0, len(self._choices_index)):
+            return self._choices_index
+        return self.start * [None] + self._choices_index[self.start : self.end]
+
+    @property
+    def choices_list(self):
+        """List of the MutationChoices of the space, in order."""
+        return self._choices_list[self.first : self.last]
+
+    @property
+    def multichoices(self):
+        """List of the MutationChoices with several variants.
+
+        The list is computed once per space (spaces and their views are never
+        modified) and must not be modified.
+        """
+        if self._multichoices is None:
+            self._multichoices = [
+                self.choice(i) for i in self.multichoices_indices()
+            ]
+        return self._multichoices
+
+    @property
+    def unsolvable_segments(self):
+        """List of the segments of the choices with no variant."""
+        return [
+            self.choice(i).segment
+            for i in self._indices_in_space("unsolvable")
+        ]
+
+    @property
+    def determined_segments(self):
+        """List of ``(segment, variant)`` for choices with one variant."""
+        return [
+            (self.choice(i).segment, list(self.choice(i).variants)[0])
+            for i in self._indices_in_space("determined")
+        ]
 
     @property
     def choices_span(self):
         """Return (start, end), segment where multiple choices are possible."""
-        if self.multichoices == []:
+        indices = self.multichoices_indices()
+        if len(indices) == 0:
             return None
-        return self.multichoices[0].start, self.multichoices[-1].end
+        return self.choice(indices[0]).start, self.choice(indices[-1]).end
 
-    def constrain_sequence(self, sequence):
+    def constrain_sequence(self, sequence, rng=None):
         """Return a version of the sequence compatible with the mutation space.
 
         All nucleotides of the sequence that are incompatible with the
-        mutation space are replaced by nucleotides compatible with the space.
+        mutation space are replaced by nucleotides compatible with the space,
+        drawn with the ``numpy.random.Generator`` ``rng`` if provided, else
+        with numpy's global random state.
         """
         new_sequence = bytearray(sequence.encode())
         for choice in self.choices_list:
@@ -81,79 +199,169 @@ class MutationSpace:
                 variant = variants[0]
                 new_sequence[choice.start : choice.end] = variant.encode()
             elif sequence[choice.start : choice.end] not in variants:
-                variant = sorted(variants)[np.random.randint(0, len(variants))]
+                index = random_integers(len(variants), rng=rng)
+                variant = choice.sorted_variants[index]
                 new_sequence[choice.start : choice.end] = variant.encode()
         return new_sequence.decode()
 
     def localized(self, location):
-        """Return a new version with only mutations overlapping the location."""
+        """Return a view with only mutations overlapping the location.
+
+        The view shares the data of this space, and is created in constant
+        time (once the indices of the space are computed).
+        """
+        self._index()
         if hasattr(location, "start"):
             start, end = location.start, location.end
         else:
             start, end = location
-        return MutationSpace(self.choices_index[start:end], left_padding=start)
+        start, end = max(start, self.start), min(end, self.end)
+        space = self.__class__.__new__(self.__class__)
+        space.__dict__.update(self.__dict__)
+        space.start, space.end = start, max(start, end)
+        space._multichoices = None
+        space.first = space.last = self.first
+        if start < end:
+            first = int(self._next_choice[start])
+            last = int(self._previous_choice[end - 1]) + 1
+            if first < last:
+                space.first, space.last = first, last
+        return space
+
+    def detached(self):
+        """Return a standalone copy of a localized space, without the data
+        of the full space."""
+        return MutationSpace(
+            self._choices_index[self.start : self.end], left_padding=self.start
+        )
+
+    def __getstate__(self):
+        """Pickle localized spaces without the data of the full space."""
+        if not self._indexed:
+            # Only full spaces can be unindexed (views are never).
+            return self.__dict__
+        if (self.first, self.last) == (0, len(self._log_sizes_cumsum) - 1):
+            return self.__dict__
+        return self.detached().__dict__
 
     @property
     def space_size(self):
         """Return the number of possible mutations."""
-        if len(self.multichoices) == 0:
+        if len(self.multichoices_indices()) == 0:
             return 0
-        choices = [len(choice.variants) for choice in self.multichoices]
+        log_sizes = self._log_sizes_cumsum
+        log_size = log_sizes[self.last] - log_sizes[self.first]
         # np.prod(choices) can create overflows and warnings, so instead we use
         # the mechanism below with log/exp and a min.
-        return np.exp(min(100, np.log(choices).sum()))
-
-    def pick_random_mutations(self, n_mutations, sequence):
-        """Draw N random mutations."""
-        n_mutations = min(len(self.multichoices), n_mutations)
-        if n_mutations == 1:
-            index = np.random.randint(len(self.multichoices))
-            choice = self.multichoices[index]
-            return [(choice.segment, choice.random_variant(sequence=sequence))]
-
+        return np.exp(min(100, log_size))
+
+    def multichoices_bounds(self):
+        """Return the arrays of the starts and ends of the multichoices."""
+        multichoices = self.multichoices
+        starts = np.array([choice.start for choice in multichoices])
+        ends = np.array([choice.end for choice in multichoices])
+        return starts, ends
+
+    def choices_weights(self, locations, boost):
+        """Return proposal weights favoring the choices overlapping locations.
+
+        The multichoices overlapping one of the locations (typically, the
+        breach locations of a constraint) get a weight ``boost`` times higher
+        than the others. Returns an array of probabilities (one per
+        multichoice) which can be used as ``weights`` in
+        ``pick_random_mutations``, or None if no choice overlaps a location.
+        """
+        starts, ends = self.multichoices_bounds()
+        overlapping = np.zeros(len(starts), dtype=bool)
+        for location in locations:
+            overlapping |= (starts < location.end) & (location.start < ends)
+        if not overlapping.any():
+            return None
+        weights = np.where(overlapping, float(boost), 1.0)
+        return weights / weights.sum()
+
+    def pick_random_mutations(
+        self, n_mutations, sequence, choices=None, rng=None, weights=None
+    ):
+        """Draw N random mutations.
+
+        The mutations are drawn from the given list of MutationChoices
+        (by default, all the multichoices of the mutation space), with the
+        ``numpy.random.Generator`` ``rng`` if provided, else with numpy's
+        global random state. The choices can be drawn with different
+        probabilities, by providing ``weights`` (one probability per choice,
+        see ``choices_weights``).
+        """
+        if choices is None:
+            choices = self.multichoices
+        indices = self.random_choices_indices(
+            len(choices), n_mutations, rng=rng, weights=weights
+        )
+        selected = [choices[i] for i in indices]
+        variants = MutationChoice.random_variants(selected, sequence, rng=rng)
         return [
-            (choice_.segment, choice_.random_variant(sequence=sequence))
-            for choice_ in [
-                self.multichoices[i]
-                for i in np.random.choice(
-                    len(self.multichoices), n_mutations, replace=False
-                )
-            ]
+            (choice.segment, variant)
+            for choice, variant in zip(selected, variants)
         ]
 
-    def apply_random_mutations(self, n_mutations, sequence):
+    @staticmethod
+    def random_choices_indices(n_choices, n_mutations, rng=None, weights=None):
+        """Draw the indices of the choices to mutate, without replacement.
+
+        See ``pick_random_mutations`` for the parameters.
+        """
+        n_mutations = min(n_choices, n_mutations)
+        random = np.random if rng is None else rng
+        if weights is not None:
+            # Choices with a null weight can't be drawn.
+            n_mutations = min(np.count_nonzero(weights), n_mutations)
+            return random.choice(
+                n_choices, n_mutations, replace=False, p=weights
+            )
+        if n_mutations == 1:
+            return [random_integers(n_choices, rng=rng)]
+        return random.choice(n_choices, n_mutations, replace=False)
+
+    def apply_random_mutations(
+        self, n_mutations, sequence, rng=None, weights=None
+    ):
         """Return a sequence with n random mutations applied."""
         new_sequence = bytearray(sequence.encode())
-        for segment, seq in self.pick_random_mutations(n_mutations, sequence):
+        mutations = self.pick_random_mutations(
+            n_mutations, sequence, rng=rng, weights=weights
+        )
+        for segment, seq in mutations:
             start, end = segment
             new_sequence[start:end] = seq.encode()
         return new_sequence.decode()
 
+    @staticmethod
+    def least_change_variants(choice, sequence):
+        """Return the variants of a choice in a 'least-change' order.
+
+        The variants are not iterated in alphabetical order (which would bias
+        AC over GT) but rather in a kind of 'least-change' order, which
+        biases towards solutions close to the current sequence.
+
+        Impact on overall algorithm speed is < 0.5%."""
+        current = sequence[choice.segment[0] : choice.segment[1]]
+        alphasort = {v: i for i, v in enumerate(choice.sorted_variants)}
+
+        def sort_key(v):
+            return (abs(alphasort[v] - alphasort[current]), v)
+
+        return sorted(choice.variants, key=sort_key)
+
     def all_variants(self, sequence):
         """Iterate through all sequence variants in this mutation space."""
         new_sequence = bytearray(sequence.encode())
         choice_start, choice_end = self.choices_span
         encoded_segment = sequence[choice_start:choice_end].encode()
 
-        def sort_variants_by_distance_to_current(choice):
-            """This function iterates through the variants of a given choice
-            using not the alphabetical (which would bias AC over GT) but rather
-            a kind of 'least-change' order, which biases towards solutions
-            close to the current sequence.
-
-            Impact on overall algorithm speed is < 0.5%."""
-            current = sequence[choice.segment[0] : choice.segment[1]]
-            alphasort = {v: i for i, v in enumerate(sorted(choice.variants))}
-
-            def sort_key(v):
-                return (abs(alphasort[v] - alphasort[current]), v)
-
-            return sorted(choice.variants, key=sort_key)
-
         variants_slots = [
             [
                 (choice_.segment, v.encode())
-                for v in sort_variants_by_distance_to_current(choice_)
+                for v in self.least_change_variants(choice_, sequence)
             ]
             for choice_ in self.multichoices
         ]
@@ -163,31 +371,157 @@ class MutationSpace:
                 new_sequence[start:end] = variant
             yield new_sequence.decode()
 
+    def depth_first_variants(self, sequence, prune=None):
+        """Iterate through the sequence variants, with subtrees pruning.
+
+        The variants are yielded in the same order as in ``all_variants``,
+        but they are built by a depth-first search which assigns the choices
+        one after the other, from left to right. After each assignment (but
+        the last), ``prune(mutations, prefix_end)`` is called, where
+        ``mutations`` is a list ``[((start, end), "ATG"), ...]`` of the
+        assignments made since the previous call (applying them to the
+        sequence gives the current partial variant), and the nucleotides of
+        the partial variant before index ``prefix_end`` are final (the
+        following choices have temporary values). If it returns True, all
+        variants starting with this prefix are skipped.
+
+        Parameters
+        ----------
+
+        sequence
+          The current sequence (an ATGC string).
+
+        prune
+          Either None (no pruning) or a function
+          ``(mutations, prefix_end) => True/False``.
+        """
+        new_sequence = bytearray(sequence.encode())
+        choices = self.multichoices
+        variants_slots = [
+            [
+                (variant, variant.encode())
+                for variant in self.least_change_variants(choice, sequence)
+            ]
+            for choice in choices
+        ]
+        last_depth = len(choices) - 1
+        # Assignments since the last call to prune, by segment.
+        mutations = {}
+
+        def explore(depth):
+            segment = choices[depth].segment
+            start, end = segment
+            for variant, encoded_variant in variants_slots[depth]:
+                new_sequence[start:end] = encoded_variant
+                if prune is not None:
+                    mutations[segment] = variant
+                if depth == last_depth:
+                    yield new_sequence.decode()
+                    continue
+                if prune is not None:
+                    prefix_end = choices[depth + 1].start
+                    pruned = prune(list(mutations.items()), prefix_end)
+                    mutations.clear()
+                    if pruned:
+                        continue
+                yield from explore(depth + 1)
+
+        if len(choices) > 0:
+            yield from explore(0)
+
+    def gray_code_mutations(self, sequence):
+        """Iterate through all variants, one mutation choice change at a time.
+
+        The variants are enumerated in a reflected, mixed-radix Gray code
+        order, where two consecutive variants differ by exactly one mutation
+        choice. Rather than variants, this yields lists of mutations of the
+        form ``[((start, end), "ATG"), ...]`` to apply to the sequence to get
+        from one variant to the next (as expected by
+        ``SequenceBuffer.apply_mutations``).
+
+        The first list brings the sequence to the first variant (one mutation
+        per choice whose subsequence differs), and all following lists contain
+        exactly one mutation. The variants of each choice are visited in the
+        ``least_change_variants`` order, the last choices changing the most
+        often.
+        """
+        choices = self.multichoices
+        variants_slots = [
+            self.least_change_variants(choice, sequence) for choice in choices
+        ]
+        yield [
+            (choice.segment, variants[0])
+            for choice, variants in zip(choices, variants_slots)
+            if sequence[choice.start : choice.end] != variants[0]
+        ]
+        digits = [0 for choice in choices]
+        directions = [1 for choice in choices]
+        while True:
+            # Find the last choice which can move in its current direction.
+            # Choices on the right which can't move reverse their direction.
+            index = len(choices) - 1
+            while index >= 0:
+                new_digit = digits[index] + directions[index]
+                if 0 <= new_digit < len(variants_slots[index]):
+                    break
+                directions[index] = -directions[index]
+                index -= 1
+            if index < 0:
+                return
+            digits[index] = new_digit
+            variant = variants_slots[index][new_digit]
+            yield [(choices[index].segment, variant)]
+
     @staticmethod
     def from_optimization_problem(problem, new_constraints=None):
         """Create a mutation space from a DNA optimization problem.
 
         This can be used to initialize mutation spaces for new problems.
+
+        The codons restricted by specifications with a ``codons_masks``
+        method (e.g. EnforceTranslation) are intersected as bitmasks, in bulk.
+        Only the restrictions overlapping other restrictions are merged one
+        by one (all restrictions are, if no specification provides masks).
+        A ValueError is raised if a merged choice would have more variants
+        than the problem's ``max_merged_variants``.
         """
 
         sequence = problem.sequence
+        max_variants = getattr(problem, "max_merged_variants", None)
 
         if new_constraints is None:
             variants = {"A": "ATGC", "T": "TACG", "G": "GCAT", "C": "CGTA"}
             choices_index = [
-                MutationChoice((i, i + 1), variants=variants[c], is_any_nucleotide=True)
+                MutationChoice(
+                    (i, i + 1), variants=variants[c], is_any_nucleotide=True
+                )
                 for i, c in enumerate(sequence)
             ]
             constraints = problem.constraints
         else:
             choices_index = [c for c in problem.mutation_space.choices_index]
             constraints = new_constraints
+        restrictions = constraints_restrictions(constraints, sequence)
+        if has_codons_masks(restrictions):
+            restricted_positions = np.array(
+                [
+                    (c is None) or not c.is_any_nucleotide
+                    for c in choices_index
+                ],
+                dtype=bool,
+            )
+            choices, codons_starts, codons_masks = split_codons_restrictions(
+                restrictions, sequence, restricted_positions
+            )
+            pieces = codons_pieces(codons_starts, codons_masks)
+            for choice in pieces_choices(*pieces):
+                for i in range(choice.start, choice.end):
+                    choices_index[i] = choice
+        else:
+            # No codons masks: all restrictions are merged one by one.
+            choices = [c for choices in restrictions for c in choices]
         mutation_choices = sorted(
-            [
-                MutationChoice(segment=choice[0], variants=set(choice[1]))
-                for cst in constraints
-                for choice in cst.restrict_nucleotides(sequence)
-            ],
+            choices,
             key=lambda choice: (choice.end - choice.start, choice.start),
         )
         for choice in mutation_choices:
@@ -197,7 +531,9 @@ class MutationSpace:
             elif all(c.is_any_nucleotide for c in underlying_choices):
                 new_choice = choice
             else:
-                new_choice = choice.merge_with(set(underlying_choices))
+                new_choice = choice.merge_with(
+                    set(underlying_choices), max_variants=max_variants
+                )
             for choice in new_choice.extract_varying_region():
                 if choice.end > len(choices_index):
                     choices_index += (choice.end - len(choices_index)) * [None]
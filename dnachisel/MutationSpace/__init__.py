@@ -1,4 +1,5 @@
 from .MutationSpace import MutationSpace
 from .MutationChoice import MutationChoice
+from .CompactMutationSpace import CompactMutationSpace
 
-__all__ = ['MutationSpace', 'MutationChoice']
+__all__ = ['MutationSpace', 'MutationChoice', 'CompactMutationSpace']
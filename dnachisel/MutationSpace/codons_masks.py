@@ -0,0 +1,265 @@
+"""Codon-level restrictions of the mutation space, as bitmasks.
+
+The codons allowed at a position of the sequence are represented by a 64-bit
+mask where bit ``i`` is set if ``CODONS[i]`` is allowed (the codons being in
+alphabetical order, "AAA", "AAC", ... "TTT"). Specifications restricting
+whole codons (e.g. EnforceTranslation, AvoidRareCodons) can provide such masks
+with a ``codons_masks(sequence)`` method, so that the mutation spaces of long
+sequences with many codon restrictions are computed with numpy, rather than
+by merging MutationChoices one at a time.
+"""
+
+import itertools
+
+import numpy as np
+
+from ..biotools import reverse_complement
+from .MutationChoice import MutationChoice
+
+CODONS = ["".join(codon) for codon in itertools.product("ACGT", repeat=3)]
+CODONS_INDICES = {codon: i for i, codon in enumerate(CODONS)}
+CODONS_ARRAY = np.frombuffer("".join(CODONS).encode(), dtype="uint8").reshape(
+    64, 3
+)
+# NUCLEOTIDES_MASKS[:, 3 * p + k] indicates the codons with the k-th
+# nucleotide of "ACGT" at position p.
+NUCLEOTIDES_MASKS = np.array(
+    [
+        [codon[position] == nucleotide for codon in CODONS]
+        for position in range(3)
+        for nucleotide in "ACGT"
+    ]
+).T.astype(int)
+
+
+def codons_mask(codons, reverse=False):
+    """Return the mask of a list of codons (or None if a codon isn't ATGC).
+
+    If ``reverse`` is True, the mask is the mask of the reverse-complements
+    of the codons.
+    """
+    mask = 0
+    for codon in codons:
+        if reverse:
+            codon = reverse_complement(codon)
+        if codon not in CODONS_INDICES:
+            return None
+        mask |= 1 << CODONS_INDICES[codon]
+    return mask
+
+
+def masks_to_bits(masks):
+    """Return a (N, 64) boolean array of the bits of N masks."""
+    masks_bytes = np.asarray(masks, dtype="<u8").view("uint8")
+    bits = np.unpackbits(masks_bytes.reshape(-1, 8), axis=1, bitorder="little")
+    return bits.astype(bool)
+
+
+def mask_variants(mask, offset=0, length=3):
+    """Return the sorted subsequences [offset:offset+length] of the codons of
+    the mask."""
+    return [
+        codon[offset : offset + length]
+        for i, codon in enumerate(CODONS)
+        if (mask >> i) & 1
+    ]
+
+
+def constraints_restrictions(constraints, sequence):
+    """Return the restrictions of the constraints on the mutation space.
+
+    The restriction of each constraint is either a list of MutationChoices
+    (from ``restrict_nucleotides``), or a pair of arrays ``(starts, masks)``
+    if the constraint has a ``codons_masks`` method which returns masks.
+    """
+    restrictions = []
+    for constraint in constraints:
+        masks = None
+        if hasattr(constraint, "codons_masks"):
+            masks = constraint.codons_masks(sequence)
+        if masks is None:
+            choices = [
+                MutationChoice(segment=choice[0], variants=set(choice[1]))
+                for choice in constraint.restrict_nucleotides(sequence)
+            ]
+            restrictions.append(choices)
+        else:
+            starts, masks = masks
+            restrictions.append((np.asarray(starts), np.asarray(masks, "u8")))
+    return restrictions
+
+
+def has_codons_masks(restrictions):
+    """Return whether some restrictions (from ``constraints_restrictions``)
+    are codons masks. If not, ``split_codons_restrictions`` can be skipped.
+    """
+    return any(isinstance(r, tuple) for r in restrictions)
+
+
+def split_codons_restrictions(restrictions, sequence, restricted_positions):
+    """Separate the codon restrictions which can be computed with masks.
+
+    Parameters
+    ----------
+
+    restrictions
+      The restrictions of the constraints on the mutation space, as returned
+      by ``constraints_restrictions``.
+
+    sequence
+      The problem's sequence.
+
+    restricted_positions
+      Boolean array indicating the positions of the sequence which are
+      already restricted (i.e. not any-nucleotide) in the mutation space.
+
+    Returns
+    -------
+
+    choices, codons_starts, codons_masks
+      ``choices`` is the list of the MutationChoices of the restrictions to
+      apply one by one (with merges), in the order of the constraints, as in
+      ``MutationSpace.from_optimization_problem``. The other restrictions
+      are codons which don't overlap any other restriction: the masks of
+      the codons starting at each position in ``codons_starts`` are
+      intersected into ``codons_masks``.
+    """
+    empty = np.zeros(0, dtype=int)
+    bulk = [r for r in restrictions if isinstance(r, tuple)]
+    starts = np.concatenate([empty] + [starts for starts, _ in bulk])
+    masks = np.concatenate([empty.astype("u8")] + [m for _, m in bulk])
+
+    # A codon is irregular if it overlaps an already restricted position,
+    # another restriction, or a codon with a different start
+    # (codons extending out of the sequence are irregular too).
+    size = len(sequence) + 3
+    coverage = np.zeros(size + 1, dtype=int)
+    for choices in restrictions:
+        if isinstance(choices, list):
+            for choice in choices:
+                coverage[np.clip(choice.start, 0, size)] += 1
+                coverage[np.clip(choice.end, 0, size)] -= 1
+    covered = np.cumsum(coverage)[:size] > 0
+    covered[: len(restricted_positions)] |= restricted_positions
+    covered[len(sequence) :] = True
+    unique_starts = np.unique(starts)
+    codons_coverage = np.zeros(size + 1, dtype=int)
+    np.add.at(codons_coverage, np.clip(unique_starts, 0, size), 1)
+    np.add.at(codons_coverage, np.clip(unique_starts + 3, 0, size), -1)
+    overlaps = np.cumsum(codons_coverage)[:size] > 1
+    irregular_positions = covered | overlaps
+    codons_positions = np.clip(starts, 0, size - 3)[:, None] + np.arange(3)
+    irregular = irregular_positions[codons_positions].any(axis=1)
+    irregular |= starts < 0
+
+    choices = []
+    index = 0
+    for restriction in restrictions:
+        if isinstance(restriction, list):
+            choices += restriction
+            continue
+        n_codons = len(restriction[0])
+        codons_irregular = irregular[index : index + n_codons]
+        for start, mask in zip(
+            restriction[0][codons_irregular], restriction[1][codons_irregular]
+        ):
+            choices.append(
+                MutationChoice(
+                    (int(start), int(start) + 3),
+                    variants=set(mask_variants(int(mask))),
+                )
+            )
+        index += n_codons
+
+    # Intersect the masks of the regular codons with the same start.
+    starts, masks = starts[~irregular], masks[~irregular]
+    order = np.argsort(starts, kind="stable")
+    starts, masks = starts[order], masks[order]
+    codons_starts, first_indices = np.unique(starts, return_index=True)
+    if len(codons_starts):
+        masks = np.bitwise_and.reduceat(masks, first_indices)
+    return choices, codons_starts, masks
+
+
+def codons_pieces(codons_starts, codons_masks):
+    """Return the choices of codons with the given starts and masks.
+
+    As in ``MutationChoice.extract_varying_region``, each codon with several
+    variants is split into a choice on its varying region and choices on the
+    constant flanks. The choices are returned as 4 arrays sorted by position:
+    ``(starts, offsets, lengths, masks)``. A choice covers
+    ``[start, start + length]`` and its variants are the
+    ``codon[offset : offset + length]`` for the codons of its mask, where
+    ``start`` is the codon's start plus ``offset``.
+    """
+    bits = masks_to_bits(codons_masks)
+    counts = bits.sum(axis=1)
+    present = (bits.astype(int) @ NUCLEOTIDES_MASKS) > 0
+    varying = present.reshape(-1, 3, 4).sum(axis=2) > 1
+    several = counts > 1
+    begins = np.where(several, np.argmax(varying, axis=1), 0)
+    ends = np.where(several, 3 - np.argmax(varying[:, ::-1], axis=1), 3)
+    single_masks = codons_masks & (~codons_masks + np.uint64(1))
+    all_codons = np.ones(len(counts), dtype=bool)
+    pieces = [
+        # Constant left flanks
+        (begins > 0, 0, begins, single_masks),
+        # Varying regions (or whole codons with 0 or 1 variant)
+        (all_codons, begins, ends - begins, codons_masks),
+        # Constant right flanks
+        (ends < 3, ends, 3 - ends, single_masks),
+    ]
+    starts, offsets, lengths, masks = [], [], [], []
+    for selected, piece_offsets, piece_lengths, piece_masks in pieces:
+        piece_offsets = np.broadcast_to(piece_offsets, counts.shape)
+        piece_lengths = np.broadcast_to(piece_lengths, counts.shape)
+        starts.append(codons_starts[selected] + piece_offsets[selected])
+        offsets.append(piece_offsets[selected])
+        lengths.append(piece_lengths[selected])
+        masks.append(piece_masks[selected])
+    starts, offsets, lengths, masks = [
+        np.concatenate(arrays) for arrays in (starts, offsets, lengths, masks)
+    ]
+    order = np.argsort(starts, kind="stable")
+    return starts[order], offsets[order], lengths[order], masks[order]
+
+
+def pieces_variants_pool(offsets, lengths, masks):
+    """Return the variants of choices from ``codons_pieces``, packed.
+
+    Returns ``(variants_offsets, variants_pool)`` where the variants of the
+    i-th choice (in alphabetical order) are the bytes
+    ``variants_pool[variants_offsets[i]:variants_offsets[i + 1]]``.
+    """
+    bits = masks_to_bits(masks)
+    counts = bits.sum(axis=1)
+    variants_offsets = np.zeros(len(masks) + 1, dtype="int64")
+    variants_offsets[1:] = np.cumsum(counts * lengths)
+    pool = np.zeros(variants_offsets[-1], dtype="uint8")
+    rows, codons = np.nonzero(bits)
+    ranks = np.arange(len(rows)) - np.repeat(
+        np.cumsum(counts) - counts, counts
+    )
+    for offset, length in set(zip(offsets.tolist(), lengths.tolist())):
+        selected = (offsets[rows] == offset) & (lengths[rows] == length)
+        span = np.arange(length)
+        positions = variants_offsets[rows[selected]] + ranks[selected] * length
+        pool[positions[:, None] + span] = CODONS_ARRAY[codons[selected]][
+            :, offset + span
+        ]
+    return variants_offsets, pool
+
+
+def pieces_choices(starts, offsets, lengths, masks):
+    """Return the MutationChoices of choices from ``codons_pieces``."""
+    variants_cache = {}
+    choices = []
+    for start, offset, length, mask in zip(
+        starts.tolist(), offsets.tolist(), lengths.tolist(), masks.tolist()
+    ):
+        key = (mask, offset, length)
+        if key not in variants_cache:
+            variants_cache[key] = mask_variants(mask, offset, length)
+        variants = set(variants_cache[key])
+        choices.append(MutationChoice((start, start + length), variants))
+    return choices
@@ -1,6 +1,10 @@
 
 import itertools
+
+import numpy as np
+
 from ..biotools import (
+    complement,
     reverse_complement,
     NUCLEOTIDE_TO_REGEXPR,
     IUPAC_NOTATION,
@@ -14,6 +18,8 @@ class DnaNotationPattern(SequencePattern):
     both strands of sequences.
     """
 
+    has_fixed_size = True
+
     def __init__(self, sequence, name=None):
         """Initialize"""
         SequencePattern.__init__(
@@ -32,6 +38,44 @@ class DnaNotationPattern(SequencePattern):
         regexpr = "".join([NUCLEOTIDE_TO_REGEXPR[n] for n in sequence])
         return regexpr
 
+    def find_matches_in_array(self, sequences_array, reverse=False):
+        """Return where the pattern matches in several sequences.
+
+        Parameters
+        ----------
+
+        sequences_array
+          A 2-D uint8 array with one ATGC sequence per row (see
+          ``sequences_to_array``).
+
+        reverse
+          If True, the reverse-complement of the pattern is looked for, i.e.
+          the pattern is looked for on the (-) strand.
+
+        Returns
+        -------
+
+        matches
+          A boolean array whose element (i, j) is True if the pattern matches
+          the i-th sequence at the segment starting at j. All segments of
+          length ``size`` are considered, including overlapping segments.
+        """
+        sequence = self.sequence
+        if reverse:
+            sequence = sequence[::-1]
+        n_sequences, length = sequences_array.shape
+        n_starts = max(0, length - self.size + 1)
+        matches = np.ones((n_sequences, n_starts), dtype=bool)
+        for i, symbol in enumerate(sequence):
+            allowed_characters = np.zeros(256, dtype=bool)
+            # Same characters as in the regular expression of the symbol.
+            for nucleotide in NUCLEOTIDE_TO_REGEXPR[symbol].strip("[]"):
+                if reverse:
+                    nucleotide = complement(nucleotide)
+                allowed_characters[ord(nucleotide)] = True
+            matches &= allowed_characters[sequences_array[:, i : i + n_starts]]
+        return matches
+
     def all_variants(self):
         """Return all ATGC sequence variants of a sequence"""
         return [
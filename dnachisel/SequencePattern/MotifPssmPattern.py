@@ -29,6 +29,8 @@ class MotifPssmPattern(SequencePattern):
       sequence(s) with the absolute highest possible score".
     """
 
+    has_fixed_size = True
+
     def __init__(
         self, pssm, threshold=None, relative_threshold=None,
     ):
@@ -70,6 +72,9 @@ class MotifPssmPattern(SequencePattern):
         )
         return [(i, i + self.size, 1) for i in indices]
 
+    def has_match_in_string(self, sequence):
+        return len(self.find_matches_in_string(sequence)) > 0
+
     @classmethod
     def from_sequences(
         cls,
@@ -13,6 +13,8 @@ class RepeatedKmerPattern(SequencePattern):
 
     """
 
+    has_fixed_size = True
+
     def __init__(self, n_repeats, kmer_size):
         self.n_repeats = n_repeats
         self.kmer_size = kmer_size
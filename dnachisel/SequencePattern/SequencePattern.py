@@ -48,9 +48,18 @@ class SequencePattern:
     name
       Name of the pattern (will be displayed e.g. when the pattern is printed)
 
+    Attributes
+    ----------
+
+    has_fixed_size
+      True for pattern classes whose matches always have length ``size``.
+      This enables specifications such as AvoidPattern to look for new
+      matches only around mutated segments.
+
     """
 
     registered_string_pattern_classes = []
+    has_fixed_size = False
 
     def __init__(
         self,
@@ -139,6 +148,26 @@ class SequencePattern:
         matches = self.find_matches_in_string(sequence)
         return [Location(start, end, strand) for start, end, strand in matches]
 
+    def has_match(self, sequence, location=None):
+        """Return whether the sequence has at least one match.
+
+        This gives the same answer as ``len(self.find_matches(...)) > 0`` but
+        stops at the first match found.
+        """
+        if location is None:
+            return self.has_match_in_string(sequence)
+        subsequence = sequence[location.start : location.end]
+        if (location.strand != -1) or self.is_palyndromic:
+            if self.has_match_in_string(subsequence):
+                return True
+        if (location.strand != 1) and not self.is_palyndromic:
+            subsequence = reverse_complement(subsequence)
+            return self.has_match_in_string(subsequence)
+        return False
+
+    def has_match_in_string(self, sequence):
+        return re.search(self.compiled_expression, sequence) is not None
+
     def find_matches_in_string(self, sequence):
         if self.lookahead == "loop":
             matches = []
@@ -0,0 +1,111 @@
+"""Implements the IncrementalEvaluator classes.
+
+Incremental evaluators keep track of the score of a specification on a problem
+while the problem's sequence gets mutated in place by the random searches.
+After each set of mutations, only the mutated segments are re-examined, and
+rejected mutations can be rolled back at no cost.
+
+Specifications opt in by returning an IncrementalEvaluator subclass in their
+``incremental_evaluator()`` method. For other specifications, the solver uses
+a ``FallbackEvaluator`` which simply re-evaluates the specification.
+"""
+
+
+class IncrementalEvaluator:
+    """Base class for incremental evaluators.
+
+    Subclasses must implement:
+
+    - ``initialize()``, which computes the evaluator's state (and ``score``)
+      from the full problem sequence.
+    - ``update(segments)``, which updates the state (and ``score``) after the
+      problem's sequence has been mutated on the given segments, and returns
+      some data enabling to restore the previous state.
+    - ``restore(data)``, which restores the state from that data.
+
+    The scores computed by subclasses must be identical to the scores returned
+    by the specification's ``evaluate`` method, so that the results of the
+    solver do not depend on whether incremental evaluation is used.
+
+    Parameters
+    ----------
+
+    specification
+      The Specification being evaluated.
+
+    problem
+      The DnaOptimizationProblem whose ``sequence_buffer`` will be mutated.
+    """
+
+    def __init__(self, specification, problem):
+        """Initialize."""
+        self.specification = specification
+        self.problem = problem
+        self.undo_log = []
+        self.initialize()
+
+    @property
+    def passes(self):
+        """Return whether the current score is positive or null."""
+        return self.score >= 0
+
+    def apply_mutations(self, segments):
+        """Update the score after the sequence was mutated on these segments.
+
+        ``segments`` is a list ``[(start, end), ...]``.
+        """
+        self.undo_log.append(self.update(segments))
+
+    def rollback(self):
+        """Restore the state prior to all non-committed mutations."""
+        while len(self.undo_log):
+            self.restore(self.undo_log.pop())
+
+    def commit(self):
+        """Accept all mutations applied so far."""
+        self.undo_log = []
+
+    def evaluation(self):
+        """Return a full SpecEvaluation of the specification on the problem."""
+        return self.specification.evaluate(self.problem)
+
+    def initialize(self):
+        raise NotImplementedError()
+
+    def update(self, segments):
+        raise NotImplementedError()
+
+    def restore(self, data):
+        raise NotImplementedError()
+
+
+class FallbackEvaluator(IncrementalEvaluator):
+    """Evaluator for specifications with no incremental evaluation support.
+
+    The specification is fully re-evaluated after each set of mutations, the
+    first time the score is asked for.
+    """
+
+    def initialize(self):
+        self._evaluation = None
+
+    def evaluation(self):
+        if self._evaluation is None:
+            self._evaluation = self.specification.evaluate(self.problem)
+        return self._evaluation
+
+    @property
+    def score(self):
+        return self.evaluation().score
+
+    @property
+    def passes(self):
+        return self.evaluation().passes
+
+    def update(self, segments):
+        previous_evaluation = self._evaluation
+        self._evaluation = None
+        return previous_evaluation
+
+    def restore(self, previous_evaluation):
+        self._evaluation = previous_evaluation
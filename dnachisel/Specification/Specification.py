@@ -6,6 +6,9 @@ Notable features implemented here:
 - Feature import/export from/to Genbank features.
 """
 import copy
+
+import numpy as np
+
 from ..Location import Location
 from .FeatureRepresentationMixin import FeatureRepresentationMixin
 
@@ -47,6 +50,13 @@ class Specification(FeatureRepresentationMixin):
       ensures that the constraint will always be valid. The constraint does
       not need to be evaluated again, which speeds up the resolution algorithm.
 
+    local_breaches (boolean)
+      Indicates that each breach location returned by ``evaluate`` only
+      depends on the subsequence at this location (for instance, a pattern
+      match), so the breach remains as long as this subsequence is unchanged.
+      This enables exhaustive searches to discard all variants starting with
+      a prefix which contains a breach.
+
     priority
       Value used to sort the specifications and solve/optimize them in order,
       with highest priority first.
@@ -60,6 +70,7 @@ class Specification(FeatureRepresentationMixin):
     best_possible_score = None
     optimize_passively = False
     enforced_by_nucleotide_restrictions = False
+    local_breaches = False
     priority = 0
     shorthand_name = None
     is_focus = False
@@ -221,6 +232,94 @@ class Specification(FeatureRepresentationMixin):
         """
         return []
 
+    def evaluate_many(self, problem, candidate_sequences):
+        """Return a list of the evaluations of several candidate sequences.
+
+        The candidates are full sequences (of the same length as the
+        problem's sequence). This is used by the searches of the solver when
+        ``problem.evaluation_batch_size`` is above 1. By default this method
+        evaluates the candidates one by one (by setting the problem's
+        sequence), but specifications which can score many sequences at once
+        (for instance with a single call to an external program, such as
+        AvoidMatches and AvoidBlastMatches) have custom methods.
+        """
+        sequence = problem.sequence
+        evaluations = []
+        for candidate in candidate_sequences:
+            problem.sequence = candidate
+            evaluations.append(self.evaluate(problem))
+        problem.sequence = sequence
+        return evaluations
+
+    def passes(self, problem):
+        """Return whether the problem's sequence passes the specification.
+
+        This is what the solver uses when only a pass/fail answer is needed.
+        By default this is ``self.evaluate(problem).passes``, but
+        specifications can stop at the first breach found (AvoidPattern,
+        EnforceGCContent, UniquifyAllKmers...), without computing all breach
+        locations and the evaluation message.
+        """
+        return self.evaluate(problem).passes
+
+    def scores_many(self, problem, candidate_sequences):
+        """Return an array of the scores of several candidate sequences.
+
+        This is what the searches of the solver use to compare candidates
+        when ``problem.evaluation_batch_size`` is above 1 (a candidate passes
+        if its score is positive or zero). By default the scores are those
+        of ``evaluate_many``, but specifications with vectorized evaluations
+        (EnforceGCContent, MaximizeCAI, AvoidPattern...) compute them in one
+        numpy pass, without computing breach locations.
+        """
+        evaluations = self.evaluate_many(problem, candidate_sequences)
+        return np.array([evaluation.score for evaluation in evaluations])
+
+    def evaluation_location(self):
+        """Return the location of the sequence segment read by ``evaluate``.
+
+        The solver uses this location to decide whether a constraint which
+        passed earlier needs to be re-evaluated after edits of the sequence.
+        By default this method returns None, meaning that the evaluation may
+        depend on the whole sequence (and the specification will always be
+        re-evaluated). Subclasses whose evaluation only depends on the
+        sequence inside their location have custom methods.
+        """
+        return None
+
+    def localization_location(self):
+        """Return a location outside of which the spec has no localization.
+
+        If this method returns a location, then ``self.localized(location)``
+        must return None for any location which doesn't overlap it. This is
+        used by DnaOptimizationProblem to only localize the specifications
+        which can overlap a given location. By default this method returns
+        None, meaning that the specification is always localized.
+        """
+        return None
+
+    def prefix_score_bound(self, problem, prefix_end):
+        """Return an upper bound of the score on variants sharing a prefix.
+
+        The bound must hold for every variant of the problem's sequence which
+        is identical to the current sequence before index ``prefix_end``. It
+        is used by exhaustive searches to skip all the variants with a given
+        prefix when they cannot improve the current best score. By default,
+        this method returns ``best_possible_score``.
+        """
+        return self.best_possible_score
+
+    def incremental_evaluator(self, problem):
+        """Return an IncrementalEvaluator of this specification, or None.
+
+        Incremental evaluators update the specification's score from the
+        mutated segments only, during the random searches of the solver.
+        By default this method returns None, meaning that the specification is
+        fully re-evaluated after each mutation. Subclasses such as
+        EnforceGCContent, AvoidPattern, MaximizeCAI, etc. have custom methods.
+        """
+        return None
+
     def as_passive_objective(self):
         """Return a copy with optimize_passively set to true.
 
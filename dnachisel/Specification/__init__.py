@@ -1,3 +1,12 @@
 from .Specification import Specification
 from .SpecificationSet import SpecificationSet
-from .SpecEvaluation import SpecEvaluation
\ No newline at end of file
+from .SpecEvaluation import SpecEvaluation
+from .IncrementalEvaluator import IncrementalEvaluator, FallbackEvaluator
+
+__all__ = [
+    "Specification",
+    "SpecificationSet",
+    "SpecEvaluation",
+    "IncrementalEvaluator",
+    "FallbackEvaluator",
+]
@@ -2,6 +2,7 @@ from .DnaOptimizationProblem import (
     DnaOptimizationProblem,
     CircularDnaOptimizationProblem,
     NoSolutionError,
+    LocalSolutionsCache,
 )
 
 from .Location import Location
@@ -79,6 +80,7 @@ __all__ = [
     "DnaOptimizationProblem",
     "NoSolutionError",
     "CircularDnaOptimizationProblem",
+    "LocalSolutionsCache",
     "Location",
     "AllowPrimer",
     "AvoidBlastMatches",
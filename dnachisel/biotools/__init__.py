@@ -1,7 +1,10 @@
 """Biologically-related useful methods."""
 
 from .blast_sequence import blast_sequence
-from .bowtie import find_all_bowtie_matches
+from .bowtie import (
+    find_all_bowtie_matches,
+    find_all_bowtie_matches_in_sequences,
+)
 from .genbank_operations import (
     change_biopython_record_sequence,
     find_specification_label_in_feature,
@@ -18,12 +21,13 @@ from .sequences_operations import (
     reverse_complement,
     reverse_translate,
     dna_pattern_to_regexpr,
+    sequences_to_array,
     translate,
 )
 
 from .enzymes_operations import list_common_enzymes
 
-from .gc_content import gc_content
+from .gc_content import gc_content, gc_content_many
 
 from .indices_operations import (
     group_nearby_indices,
@@ -43,7 +47,11 @@ from .formatting_operations import (
     score_to_formatted_string
 )
 
-from .random_sequences import random_dna_sequence, random_protein_sequence
+from .random_sequences import (
+    random_dna_sequence,
+    random_protein_sequence,
+    random_integers,
+)
 
 
 from .biotables import (
@@ -58,6 +66,7 @@ from .biotables import (
 __all__ = [
     'blast_sequence',
     'find_all_bowtie_matches',
+    'find_all_bowtie_matches_in_sequences',
     'change_biopython_record_sequence',
     'find_specification_label_in_feature',
     'load_record',
@@ -70,9 +79,11 @@ __all__ = [
     'reverse_complement',
     'reverse_translate',
     'dna_pattern_to_regexpr',
+    'sequences_to_array',
     'translate',
     'list_common_enzymes',
     'gc_content',
+    'gc_content_many',
     'get_backtranslation_table',
     'group_nearby_indices',
     'group_nearby_segments',
@@ -86,6 +97,7 @@ __all__ = [
     'score_to_formatted_string',
     'random_dna_sequence',
     'random_protein_sequence',
+    'random_integers',
     'IUPAC_NOTATION',
     'NUCLEOTIDE_TO_REGEXPR',
     'OTHER_BASES',
@@ -27,7 +27,10 @@ def blast_sequence(
     ----------
 
     sequence
-      An ATGC sequence
+      An ATGC sequence, or a list of ATGC sequences, in which case they are
+      all BLASTed in a single run and the list of all records is returned
+      (one per sequence, or one per sequence and subject sequence when
+      ``subject_sequences`` are given). The query of sequence i is "seq_i".
 
     Examples
     --------
@@ -41,7 +44,13 @@ def blast_sequence(
     xml_file, xml_name = tempfile.mkstemp(".xml")
     fasta_file, fasta_name = tempfile.mkstemp(".fa")
     with open(fasta_name, "w+") as f:
-        f.write(">seq\n" + sequence)
+        if isinstance(sequence, str):
+            f.write(">seq\n" + sequence)
+        else:
+            records = [
+                ">seq_%d\n%s" % (i, seq) for i, seq in enumerate(sequence)
+            ]
+            f.write("\n".join(records))
 
     close_subject = False
     remove_subject = False
@@ -106,7 +115,7 @@ def blast_sequence(
         open(subject, "w").close()
         if remove_subject:
             os.remove(subject)
-    if len(result) == 1:
+    if isinstance(sequence, str) and (len(result) == 1):
         return result[0]
     else:
         return result
@@ -37,6 +37,55 @@ def find_all_bowtie_matches(
     
     
     """
+    k = match_length
+    kmers = [sequence[i : i + k] for i in range(len(sequence) - k + 1)]
+    return [
+        ((index, index + k), mismatches)
+        for index, mismatches in align_kmers_with_bowtie(
+            kmers, bowtie_index_path, max_mismatches=max_mismatches
+        )
+    ]
+
+
+def find_all_bowtie_matches_in_sequences(
+    sequences, bowtie_index_path, match_length, max_mismatches=0
+):
+    """Return the (short) matches of several sequences with a Bowtie index.
+
+    The distinct k-mers of all sequences are aligned in a single Bowtie run.
+    The result is a list giving, for each sequence, its matches in the form
+    returned by ``find_all_bowtie_matches``.
+    """
+    k = match_length
+    kmers_indices = {}
+    for sequence in sequences:
+        for i in range(len(sequence) - k + 1):
+            kmers_indices.setdefault(sequence[i : i + k], len(kmers_indices))
+    mismatches = dict(
+        align_kmers_with_bowtie(
+            list(kmers_indices), bowtie_index_path, max_mismatches
+        )
+    )
+    results = []
+    for sequence in sequences:
+        matches = []
+        for i in range(len(sequence) - k + 1):
+            kmer_index = kmers_indices[sequence[i : i + k]]
+            if kmer_index in mismatches:
+                matches.append(((i, i + k), mismatches[kmer_index]))
+        results.append(matches)
+    return results
+
+
+def align_kmers_with_bowtie(kmers, bowtie_index_path, max_mismatches=0):
+    """Return the k-mers which have a match in a Bowtie index.
+
+    The result is of the form [(kmer_index, n_mismatches), ...] where
+    n_mismatches is the number of mismatches with the closest homology in the
+    index.
+    """
+    if len(kmers) == 0:
+        return []
 
     # CREATE THE PARAMETERS
 
@@ -45,8 +94,7 @@ def find_all_bowtie_matches(
     parameters += ["-v", str(max_mismatches)]  # only allow that N mismatches
     parameters += [bowtie_index_path]
     parameters += ["--quiet", "--suppress", "2,3,4,5,6,7"]  # small output
-    k = match_length
-    kmers = [sequence[i : i + k] for i in range(len(sequence) - k + 1)]
+    k = len(kmers[0])
     if k * len(kmers) < 10000:
         # Input the sequences directly
         tmp_fasta_path = None
@@ -72,6 +120,5 @@ def find_all_bowtie_matches(
         line.split("\t") for line in output.decode().split("\n") if len(line)
     ]
     return [
-        ((int(index), int(index) + k), edits.count(":"))
-        for index, edits in output_records
-    ]
\ No newline at end of file
+        (int(index), edits.count(":")) for index, edits in output_records
+    ]
@@ -36,3 +36,36 @@ def gc_content(sequence, window_size=None):
         a = cs[window_size - 1 :]
         b = np.hstack([[0], cs[:-window_size]])
         return 1.0 * (a - b) / window_size
+
+
+def gc_content_many(sequences_array, window_size=None):
+    """Compute the global or local GC content of several sequences at once.
+
+    Parameters
+    ----------
+
+    sequences_array
+      A 2-D uint8 array of ATGC characters (upper case!) with one sequence per
+      row, as returned by ``sequences_to_array``.
+
+    window_size
+      If provided, the local GC content for the different sliding windows of
+      this size is returned, else the global GC content is returned.
+
+    Returns
+    --------
+
+      An array with the GC content of each sequence or, if window_size is
+      provided, a 2-D array whose i-th row gives the local GC contents of the
+      i-th sequence (as returned by ``gc_content``).
+    """
+    arr_GCs = (sequences_array == 71) | (sequences_array == 67)  # G, C
+    if window_size is None:
+        return 1.0 * arr_GCs.sum(axis=1) / sequences_array.shape[1]
+    else:
+        cs = np.cumsum(arr_GCs, axis=1)
+        a = cs[:, window_size - 1 :]
+        b = np.hstack(
+            [np.zeros((len(cs), 1), dtype=cs.dtype), cs[:, :-window_size]]
+        )
+        return 1.0 * (a - b) / window_size
@@ -7,6 +7,28 @@ user-provided constraints.
 import numpy as np
 
 
+def random_integers(high, size=None, rng=None):
+    """Return random integers between 0 (included) and ``high`` (excluded).
+
+    Parameters
+    ----------
+
+    high
+      Upper bound (excluded) of the integers.
+
+    size
+      Number of integers to return (as an array). If None, a single integer
+      is returned.
+
+    rng
+      A ``numpy.random.Generator``. If None, numpy's global random state is
+      used (and the result is determined by ``np.random.seed``).
+    """
+    if rng is None:
+        return np.random.randint(high, size=size)
+    return rng.integers(high, size=size)
+
+
 def random_dna_sequence(length, gc_share=None, probas=None, seed=None):
     """Return a random DNA sequence ("ATGGCGT...") with the specified length.
 
@@ -24,20 +46,20 @@ def random_dna_sequence(length, gc_share=None, probas=None, seed=None):
     seed
       The seed to feed to the random number generator. When a seed is provided
       the random results depend deterministically on the seed, thus enabling
-      reproducibility
+      reproducibility. Can also be a ``numpy.random.Generator``, which is then
+      used instead of numpy's global random state.
 
     """
-    if seed is not None:
-        np.random.seed(seed)
+    random = _random_source(seed)
     if gc_share is not None:
         g_or_c = gc_share / 2.0
         not_g_or_c = (1 - gc_share) / 2.0
         probas = {"G": g_or_c, "C": g_or_c, "A": not_g_or_c, "T": not_g_or_c}
     if probas is None:
-        sequence = np.random.choice(list("ATCG"), length)
+        sequence = random.choice(list("ATCG"), length)
     else:
         bases, probas = zip(*probas.items())
-        sequence = np.random.choice(bases, length, p=probas)
+        sequence = random.choice(bases, length, p=probas)
     return "".join(sequence)
 
 
@@ -55,12 +77,21 @@ def random_protein_sequence(length, seed=None):
     seed
       The seed to feed to the random number generator. When a seed is provided
       the random results depend deterministically on the seed, thus enabling
-      reproducibility
+      reproducibility. Can also be a ``numpy.random.Generator``, which is then
+      used instead of numpy's global random state.
 
     """
-    if seed is not None:
-        np.random.seed(seed)
-
+    random = _random_source(seed)
     aa_list = list("ACEDGFIHKLNQPSRTWVY")
-    aa_choices = np.random.choice(aa_list, length - 2)
+    aa_choices = random.choice(aa_list, length - 2)
     return "M" + "".join(aa_choices) + "*"
+
+
+def _random_source(seed):
+    """Return the generator to use, or numpy's global random state (seeded).
+    """
+    if isinstance(seed, np.random.Generator):
+        return seed
+    if seed is not None:
+        np.random.seed(seed)
+    return np.random
@@ -37,6 +37,6 @@ def sequences_differences_segments(seq1, seq2):
       ATGC sequences to be compared
     """
     arr = 1 * sequences_differences_array(seq1, seq2)
-    diffs = np.diff([0] + list(arr) + [0]).nonzero()[0]
+    diffs = np.diff(np.concatenate([[0], arr, [0]])).nonzero()[0]
     half = int(len(diffs) / 2)
     return [(diffs[2 * i], diffs[2 * i + 1]) for i in range(half)]
@@ -35,6 +35,18 @@ def reverse_complement(sequence):
     return complement(sequence)[::-1]
 
 
+def sequences_to_array(sequences):
+    """Return a 2-D uint8 array of the (ASCII) characters of the sequences.
+
+    The sequences must all have the same length. The i-th row of the result
+    holds the i-th sequence. This is used by the specifications which can
+    evaluate many candidate sequences at once with numpy operations.
+    """
+    length = len(sequences[0]) if len(sequences) else 0
+    arr = np.frombuffer("".join(sequences).encode(), dtype="uint8")
+    return arr.reshape((len(sequences), length))
+
+
 def reverse_translate(protein_sequence, randomize_codons=False, table="Standard"):
     """Return a DNA sequence which translates to the provided protein sequence.
 
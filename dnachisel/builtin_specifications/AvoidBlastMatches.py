@@ -79,7 +79,39 @@ class AvoidBlastMatches(Specification):
             location = Location(0, len(problem.sequence))
         sequence = location.extract_sequence(problem.sequence)
 
-        blast_record = blast_sequence(
+        blast_record = self._blast(sequence)
+        return self._evaluation_from_blast_record(
+            problem, blast_record, location
+        )
+
+    def evaluate_many(self, problem, candidate_sequences):
+        """Evaluate all candidates with a single BLAST run."""
+        location = self.location
+        if location is None:
+            location = Location(0, len(problem.sequence))
+        sequences = [
+            location.extract_sequence(candidate)
+            for candidate in candidate_sequences
+        ]
+        unique_sequences = list(dict.fromkeys(sequences))
+        # With several subject sequences, BLAST returns one record per
+        # (query, subject) pair, so the records are grouped by query id.
+        records = {"seq_%d" % i: [] for i in range(len(unique_sequences))}
+        for record in self._blast(unique_sequences):
+            records[record.query.split()[0]].append(record)
+        records = {
+            sequence: records["seq_%d" % i]
+            for i, sequence in enumerate(unique_sequences)
+        }
+        return [
+            self._evaluation_from_blast_record(
+                problem, records[sequence], location
+            )
+            for sequence in sequences
+        ]
+
+    def _blast(self, sequence):
+        return blast_sequence(
             sequence,
             blast_db=self.blast_db,
             subject_sequences=self.sequences,
@@ -93,6 +125,7 @@ class AvoidBlastMatches(Specification):
             task="megablast"
         )
 
+    def _evaluation_from_blast_record(self, problem, blast_record, location):
         if isinstance(blast_record, list):
             alignments = [
                 alignment
@@ -137,6 +170,10 @@ class AvoidBlastMatches(Specification):
             message="Failed - %s matches at %s" % (len(locations), locations),
         )
 
+    def localization_location(self):
+        """Return the location that localizations must overlap."""
+        return self.location
+
     def localized(self, location, problem=None, with_righthand=True):
         """Localize the evaluation."""
         new_location = self.location.overlap_region(location)
@@ -126,6 +126,17 @@ class AvoidChanges(Specification):
         score = self.max_edits - len(differing_indices)
         return SpecEvaluation(self, problem, score=score, locations=locations)
 
+    def evaluation_location(self):
+        """Return the location of the sequence segment read by ``evaluate``.
+        """
+        return None if self.indices is not None else self.location
+
+    def localization_location(self):
+        """Return the location that localizations must overlap."""
+        if (self.max_edits != 0) or (self.indices is not None):
+            return None
+        return self.location
+
     def localized(self, location, problem=None, with_righthand=False):
         """Localize the spec to the overlap of its location and the new.
         """
@@ -56,6 +56,15 @@ class AvoidHairpins(Specification):
 
         return SpecEvaluation(self, problem, score, locations=locations)
 
+    def evaluation_location(self):
+        """Return the location of the sequence segment read by ``evaluate``.
+        """
+        return self.location
+
+    def localization_location(self):
+        """Return the location that localizations must overlap."""
+        return self.location
+
     def localized(self, location, problem=None, with_righthand=True):
         """Localize the spec, make sure no neighbouring hairpin is created."""
         new_location = self.location.overlap_region(location)
@@ -77,6 +77,21 @@ class AvoidHeterodimerization(Specification):
             message="Largest Tm = %.1f " % largest_tm,
         )
 
+    def evaluate_many(self, problem, candidate_sequences):
+        """Evaluate the candidates, computing each distinct subsequence once.
+        """
+        sequence = problem.sequence
+        evaluations = {}
+        result = []
+        for candidate in candidate_sequences:
+            subsequence = self.location.extract_sequence(candidate)
+            if subsequence not in evaluations:
+                problem.sequence = candidate
+                evaluations[subsequence] = self.evaluate(problem)
+            result.append(evaluations[subsequence])
+        problem.sequence = sequence
+        return result
+
     def label_parameters(self):
         return [
             ("primers", len(self.other_primers_sequences)),
@@ -3,6 +3,7 @@
 from ..Specification import Specification, SpecEvaluation
 from ..biotools.bowtie import (
     find_all_bowtie_matches,
+    find_all_bowtie_matches_in_sequences,
     create_bowtie_index_from_sequences,
 )
 from ..Location import Location
@@ -96,17 +97,42 @@ class AvoidMatches(Specification):
         if location is None:
             location = Location(0, len(problem.sequence))
         sequence = location.extract_sequence(problem.sequence)
-        bowtie_index = self.bowtie_index
-        if self.bowtie_indexes_paths is not None:
-            if self.bowtie_index in self.bowtie_indexes_dict:
-                bowtie_index = self.bowtie_indexes_paths[self.bowtie_index]
         # matches will be of the form [ ((start, end), n_mismatches), (...)]
         matches = find_all_bowtie_matches(
             sequence=sequence,
-            bowtie_index_path=bowtie_index,
+            bowtie_index_path=self._get_bowtie_index(),
+            match_length=self.match_length,
+            max_mismatches=self.mismatches,
+        )
+        return self._evaluation_from_matches(problem, matches)
+
+    def evaluate_many(self, problem, candidate_sequences):
+        """Find the matches of all candidates with a single Bowtie run."""
+        location = self.location
+        if location is None:
+            location = Location(0, len(problem.sequence))
+        all_matches = find_all_bowtie_matches_in_sequences(
+            sequences=[
+                location.extract_sequence(candidate)
+                for candidate in candidate_sequences
+            ],
+            bowtie_index_path=self._get_bowtie_index(),
             match_length=self.match_length,
             max_mismatches=self.mismatches,
         )
+        return [
+            self._evaluation_from_matches(problem, matches)
+            for matches in all_matches
+        ]
+
+    def _get_bowtie_index(self):
+        bowtie_index = self.bowtie_index
+        if self.bowtie_indexes_paths is not None:
+            if self.bowtie_index in self.bowtie_indexes_dict:
+                bowtie_index = self.bowtie_indexes_paths[self.bowtie_index]
+        return bowtie_index
+
+    def _evaluation_from_matches(self, problem, matches):
         # the score is designed to be -1 per exact match, and improve when
         # there are mismatches more mismatches,
         score = -sum([1.0 / (1 + mis) for _, mis in matches])
@@ -120,6 +146,10 @@ class AvoidMatches(Specification):
             message="Failed - %s matches at %s" % (len(locations), locations),
         )
 
+    def localization_location(self):
+        """Return the location that localizations must overlap."""
+        return self.location
+
     def localized(self, location, problem=None, with_righthand=True):
         """Localize the evaluation."""
         new_location = self.location.overlap_region(location)
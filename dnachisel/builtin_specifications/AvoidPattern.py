@@ -1,9 +1,13 @@
 """Implement AvoidPattern"""
 
-from ..SequencePattern import SequencePattern
+import numpy as np
+
+from ..SequencePattern import SequencePattern, DnaNotationPattern
+from ..biotools import sequences_to_array
 from ..Location import Location
 from ..Specification.Specification import Specification
 from ..Specification.SpecEvaluation import SpecEvaluation
+from ..Specification.IncrementalEvaluator import IncrementalEvaluator
 
 
 class AvoidPattern(Specification):
@@ -36,6 +40,7 @@ class AvoidPattern(Specification):
 
     best_possible_score = 0
     priority = 1
+    local_breaches = True
     shorthand_name = "no"  # will appear as, for instance, @no(BsmBI_site)
 
     def __init__(
@@ -67,6 +72,106 @@ class AvoidPattern(Specification):
             self, problem, score, locations=locations, message=message
         )
 
+    def passes(self, problem):
+        """Return whether the pattern is absent (stops at the first match)."""
+        return not self.pattern.has_match(problem.sequence, self.location)
+
+    def evaluate_many(self, problem, candidate_sequences):
+        """Evaluate all candidates at once, for DnaNotationPattern patterns.
+
+        The matches are found with vectorized comparisons (see
+        ``DnaNotationPattern.find_matches_in_array``). Other patterns are
+        looked for in each candidate separately.
+        """
+        if not self._has_vectorized_evaluation():
+            return Specification.evaluate_many(
+                self, problem, candidate_sequences
+            )
+        start = self.location.start
+        size = self.pattern.size
+        forward, reverse = self._matches_many(candidate_sequences)
+        evaluations = []
+        for i in range(len(candidate_sequences)):
+            locations = []
+            if forward is not None:
+                locations += [
+                    Location(start + j, start + j + size, 1)
+                    for j in np.nonzero(forward[i])[0].tolist()
+                ]
+            if reverse is not None:
+                # Matches on the (-) strand are listed from right to left, as
+                # in ``SequencePattern.find_matches``.
+                locations += [
+                    Location(start + j, start + j + size, -1)
+                    for j in np.nonzero(reverse[i])[0][::-1].tolist()
+                ]
+            score = -len(locations)
+            if score == 0:
+                message = "Passed. Pattern not found !"
+            else:
+                message = "Failed. Pattern found at positions %s" % locations
+            evaluations.append(
+                SpecEvaluation(
+                    self, problem, score, locations=locations, message=message
+                )
+            )
+        return evaluations
+
+    def scores_many(self, problem, candidate_sequences):
+        """Score all candidates at once, for DnaNotationPattern patterns."""
+        if not self._has_vectorized_evaluation():
+            return Specification.scores_many(
+                self, problem, candidate_sequences
+            )
+        scores = np.zeros(len(candidate_sequences), dtype=int)
+        for matches in self._matches_many(candidate_sequences):
+            if matches is not None:
+                scores -= matches.sum(axis=1)
+        return scores
+
+    def _has_vectorized_evaluation(self):
+        return isinstance(self.pattern, DnaNotationPattern) and (
+            self.location.strand in [-1, 0, 1]
+        )
+
+    def _matches_many(self, candidate_sequences):
+        """Return arrays of the pattern's matches in the candidates, on the
+        (+) and (-) strands (or None for strands which are not searched)."""
+        strand = self.location.strand
+        sequences_array = sequences_to_array(candidate_sequences)
+        sequences_array = sequences_array[
+            :, self.location.start : self.location.end
+        ]
+        palyndromic = self.pattern.is_palyndromic
+        forward = reverse = None
+        if (strand in [0, 1]) or palyndromic:
+            forward = self.pattern.find_matches_in_array(sequences_array)
+        if (not palyndromic) and strand in [-1, 0]:
+            reverse = self.pattern.find_matches_in_array(
+                sequences_array, reverse=True
+            )
+        return forward, reverse
+
+    def evaluation_location(self):
+        """Return the location of the sequence segment read by ``evaluate``.
+        """
+        return self.location
+
+    def localization_location(self):
+        """Return the location that localizations must overlap."""
+        return self.location
+
+    def incremental_evaluator(self, problem):
+        """Return an evaluator re-scanning only around mutated segments.
+
+        Only available for patterns with a fixed size.
+        """
+        if not self.pattern.has_fixed_size:
+            return None
+        if self.location.strand not in [-1, 0, 1]:
+            return None
+        return PatternMatchesEvaluator(self, problem)
+
     def short_label(self):
         if self.pattern.name is not None:
             return "No %s" % self.pattern.name
@@ -97,3 +202,66 @@ class AvoidPattern(Specification):
 
     def label_parameters(self):
         return [("pattern", str(self.pattern))]
+
+
+class PatternMatchesEvaluator(IncrementalEvaluator):
+    """Incremental evaluator for AvoidPattern (with fixed-size patterns).
+
+    Keeps the set of pattern matches. After a mutation of segment [s, e], the
+    matches entirely included in [s - size + 1, e + size - 1] are replaced by
+    the matches found in that zone.
+    """
+
+    def initialize(self):
+        spec = self.specification
+        self.matches = set(
+            match.to_tuple()
+            for match in spec.pattern.find_matches(
+                self.problem.sequence, spec.location
+            )
+        )
+        self.score = -len(self.matches)
+
+    def update(self, segments):
+        location = self.specification.location
+        pattern = self.specification.pattern
+        removed, added = set(), set()
+        for start, end in segments:
+            zone_start = max(location.start, start - pattern.size + 1)
+            zone_end = min(location.end, end + pattern.size - 1)
+            if zone_end <= zone_start:
+                continue
+            old_matches = set(
+                match
+                for match in self.matches
+                if (match[0] >= zone_start) and (match[1] <= zone_end)
+            )
+            zone = Location(zone_start, zone_end, location.strand)
+            new_matches = set(
+                match.to_tuple()
+                for match in pattern.find_matches(
+                    self.problem.sequence_buffer, zone
+                )
+            )
+            self.matches.difference_update(old_matches)
+            self.matches.update(new_matches)
+            # Keep track of the original matches removed, and of the matches
+            # added which were not original matches.
+            for match in old_matches:
+                if match in added:
+                    added.remove(match)
+                else:
+                    removed.add(match)
+            for match in new_matches:
+                if match in removed:
+                    removed.remove(match)
+                else:
+                    added.add(match)
+        previous_score = self.score
+        self.score = -len(self.matches)
+        return removed, added, previous_score
+
+    def restore(self, data):
+        removed, added, self.score = data
+        self.matches.difference_update(added)
+        self.matches.update(removed)
@@ -13,6 +13,8 @@ class AvoidStopCodons(CodonSpecification):
     when editing it with quasi-synonymous mutations.
     """
 
+    local_breaches = True
+
     def __init__(self, genetic_table="Standard", location=None, boost=1.0):
         self.genetic_table = genetic_table
         self.boost = boost
@@ -26,6 +26,27 @@ class CodonSpecification(Specification):
                 strand=-1,
             )
 
+    def codons_masks(self, sequence):
+        """Return the codons restrictions of the specification, as bitmasks.
+
+        Codon specifications whose ``restrict_nucleotides`` restricts whole
+        codons can return a pair ``(starts, masks)`` of arrays giving the
+        start of each codon (on the + strand) and the mask of the codons
+        allowed there (see ``dnachisel.MutationSpace.codons_masks``).
+        The mutation space is then computed in bulk, with numpy. Returns None
+        by default, in which case ``restrict_nucleotides`` is used.
+        """
+        return None
+
+    def evaluation_location(self):
+        """Return the location of the sequence segment read by ``evaluate``.
+        """
+        return self.location
+
+    def localization_location(self):
+        """Return the location that localizations must overlap."""
+        return self.location
+
     def localized(self, location, problem=None, with_righthand=True):
         """Generic localization method for codon specifications.
 
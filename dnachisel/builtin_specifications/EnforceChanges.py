@@ -227,6 +227,12 @@ class EnforceChanges(Specification):
         )
         return SpecEvaluation(self, problem, score=score, locations=locations)
 
+    def localization_location(self):
+        """Return the location that localizations must overlap."""
+        if (self.amount_percent != 100) or (self.indices is not None):
+            return None
+        return self.location
+
     def localized(self, location, problem=None, with_righthand=True):
         """Localize the spec to the overlap of its location and the new.
         """
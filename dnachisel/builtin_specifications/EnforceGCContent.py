@@ -3,10 +3,18 @@
 import numpy as np
 import re
 
-from ..biotools import gc_content, group_nearby_segments
+from ..biotools import (
+    gc_content,
+    gc_content_many,
+    group_nearby_segments,
+    sequences_to_array,
+)
 from ..Location import Location
-from ..Specification import Specification, SpecEvaluation
-
+from ..Specification import (
+    Specification,
+    SpecEvaluation,
+    IncrementalEvaluator,
+)
 
 
 class EnforceGCContent(Specification):
@@ -48,6 +56,7 @@ class EnforceGCContent(Specification):
     """
 
     best_possible_score = 0
+    local_breaches = True
     locations_span = 50  # The resolution will use locations size
     shorthand_name = "gc"
 
@@ -97,12 +106,54 @@ class EnforceGCContent(Specification):
 
     def evaluate(self, problem):
         """Return the sum of breaches extent for all windowed breaches."""
-        wstart, wend = self.location.start, self.location.end
         sequence = self.location.extract_sequence(problem.sequence)
         gc = gc_content(sequence, window_size=self.window)
         breaches = np.maximum(0, self.mini - gc) + np.maximum(
             0, gc - self.maxi
         )
+        return self._evaluation_from_breaches(problem, breaches)
+
+    def passes(self, problem):
+        """Return whether all windows have a GC content within bounds."""
+        sequence = self.location.extract_sequence(problem.sequence)
+        gc = gc_content(sequence, window_size=self.window)
+        return not np.any((gc < self.mini) | (gc > self.maxi))
+
+    def evaluate_many(self, problem, candidate_sequences):
+        """Evaluate all candidates with vectorized GC content computations.
+        """
+        if self.location.strand == -1:
+            return Specification.evaluate_many(
+                self, problem, candidate_sequences
+            )
+        return [
+            self._evaluation_from_breaches(problem, candidate_breaches)
+            for candidate_breaches in self._breaches_many(candidate_sequences)
+        ]
+
+    def scores_many(self, problem, candidate_sequences):
+        """Score all candidates with vectorized GC content computations."""
+        if self.location.strand == -1:
+            return Specification.scores_many(
+                self, problem, candidate_sequences
+            )
+        breaches = self._breaches_many(candidate_sequences)
+        if self.window is None:
+            return -breaches
+        return -breaches.sum(axis=1)
+
+    def _breaches_many(self, candidate_sequences):
+        """Return the GC breaches of each candidate (one row per candidate).
+        """
+        sequences_array = sequences_to_array(candidate_sequences)
+        sequences_array = sequences_array[
+            :, self.location.start : self.location.end
+        ]
+        gc = gc_content_many(sequences_array, window_size=self.window)
+        return np.maximum(0, self.mini - gc) + np.maximum(0, gc - self.maxi)
+
+    def _evaluation_from_breaches(self, problem, breaches):
+        wstart, wend = self.location.start, self.location.end
         score = -breaches.sum()
         breaches_starts = wstart + (breaches > 0).nonzero()[0]
 
@@ -134,6 +185,20 @@ class EnforceGCContent(Specification):
             self, problem, score, locations=breaches_locations, message=message
         )
 
+    def evaluation_location(self):
+        """Return the location of the sequence segment read by ``evaluate``.
+        """
+        return self.location
+
+    def incremental_evaluator(self, problem):
+        """Return an evaluator tracking G/C counts in the mutated windows."""
+        return GCContentEvaluator(self, problem)
+
+    def localization_location(self):
+        """Return the location that localizations must overlap."""
+        # Non-windowed GC content specs are never localized (see below).
+        return None if self.window is None else self.location
+
     def localized(self, location, problem=None, with_righthand=True):
         """Localize the GC content evaluation.
 
@@ -198,3 +263,85 @@ class EnforceGCContent(Specification):
         if self.window is not None:
             result += "/%dbp" % self.window
         return result
+
+
+class GCContentEvaluator(IncrementalEvaluator):
+    """Incremental evaluator for EnforceGCContent.
+
+    Keeps the G/C indicator of each nucleotide and the G/C count of each
+    window, and only recomputes the windows overlapping the span of the
+    mutated segments. The per-window breaches are kept in an array whose
+    (vectorized) sum gives the same score as ``EnforceGCContent.evaluate``.
+    """
+
+    def initialize(self):
+        spec = self.specification
+        self.start, self.end = spec.location.start, spec.location.end
+        arr = self.problem.sequence_buffer.as_array()[self.start : self.end]
+        self.gc = ((arr == 71) | (arr == 67)).astype("int64")  # G, C
+        if spec.window is None:
+            self.gc_count = self.gc.sum()
+        else:
+            self.window_counts = self._window_counts(self.gc)
+            self.breaches = self._breaches(self.window_counts)
+        self._compute_score()
+
+    def _window_counts(self, gc):
+        """Return the G/C counts of the windows fully inside ``gc``."""
+        window = self.specification.window
+        cs = np.cumsum(gc)
+        counts = cs[window - 1 :].copy()
+        counts[1:] -= cs[:-window]
+        return counts
+
+    def _breaches(self, counts):
+        spec = self.specification
+        window = len(self.gc) if spec.window is None else spec.window
+        gc = 1.0 * counts / window
+        return np.maximum(0, spec.mini - gc) + np.maximum(0, gc - spec.maxi)
+
+    def _compute_score(self):
+        if self.specification.window is None:
+            self.score = -self._breaches(self.gc_count).sum()
+        else:
+            self.score = -self.breaches.sum()
+
+    def update(self, segments):
+        window = self.specification.window
+        previous_score = self.score
+        # All segments are updated at once, on the span they cover.
+        start = max(min(start for start, end in segments), self.start)
+        end = min(max(end for start, end in segments), self.end)
+        if start >= end:
+            return None, previous_score
+        arr = self.problem.sequence_buffer.as_array()[start:end]
+        start, end = start - self.start, end - self.start
+        old_gc = self.gc[start:end].copy()
+        self.gc[start:end] = (arr == 71) | (arr == 67)
+        if window is None:
+            self.gc_count += self.gc[start:end].sum() - old_gc.sum()
+            self._compute_score()
+            return (start, end, old_gc, None, None, None), previous_score
+        w_start = max(0, start - window + 1)
+        w_end = min(end, len(self.window_counts))
+        old_counts = self.window_counts[w_start:w_end].copy()
+        old_breaches = self.breaches[w_start:w_end].copy()
+        counts = self._window_counts(self.gc[w_start : w_end + window - 1])
+        self.window_counts[w_start:w_end] = counts
+        self.breaches[w_start:w_end] = self._breaches(counts)
+        self._compute_score()
+        undo_data = (start, end, old_gc, w_start, old_counts, old_breaches)
+        return undo_data, previous_score
+
+    def restore(self, data):
+        undo_data, self.score = data
+        if undo_data is None:
+            return
+        start, end, old_gc, w_start, old_counts, old_breaches = undo_data
+        if self.specification.window is None:
+            self.gc_count += old_gc.sum() - self.gc[start:end].sum()
+        else:
+            w_end = w_start + len(old_counts)
+            self.window_counts[w_start:w_end] = old_counts
+            self.breaches[w_start:w_end] = old_breaches
+        self.gc[start:end] = old_gc
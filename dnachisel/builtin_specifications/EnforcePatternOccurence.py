@@ -103,6 +103,15 @@ class EnforcePatternOccurence(Specification):
             data=dict(matches=matches),
         )
 
+    def evaluation_location(self):
+        """Return the location of the sequence segment read by ``evaluate``.
+        """
+        return self.location
+
+    def localization_location(self):
+        """Return the location that localizations must overlap."""
+        return self.location
+
     def localized(self, location, problem=None):
         """Localize the evaluation."""
         new_location = self.location.overlap_region(location)
@@ -136,7 +145,9 @@ class EnforcePatternOccurence(Specification):
             )
             if len(new_space.unsolvable_segments) > 0:
                 continue
-            new_sequence = new_space.constrain_sequence(problem.sequence)
+            new_sequence = new_space.constrain_sequence(
+                problem.sequence, rng=problem.random_generator
+            )
             new_constraints = problem.constraints + [new_constraint]
             new_problem = DnaOptimizationProblem(
                 sequence=new_sequence,
@@ -144,7 +155,9 @@ class EnforcePatternOccurence(Specification):
                 mutation_space=new_space,
                 logger=None,
             )
-            if self.evaluate(new_problem).passes:
+            new_problem.random_generator = problem.random_generator
+            new_problem.random_seed_sequence = problem.random_seed_sequence
+            if self.passes(new_problem):
                 try:
                     new_problem.resolve_constraints()
                     problem.sequence = new_problem.sequence
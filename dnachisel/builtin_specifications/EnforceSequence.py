@@ -49,6 +49,11 @@ class EnforceSequence(Specification):
         # else:
         #     return self
 
+    def evaluation_location(self):
+        """Return the location of the sequence segment read by ``evaluate``.
+        """
+        return self.location
+
     def evaluate(self, problem):
         """Return a score equal to -number_of modifications.
 
@@ -77,6 +82,10 @@ class EnforceSequence(Specification):
         return SpecEvaluation(self, problem, score=-len(discrepancies),
                               locations=locations)
 
+    def localization_location(self):
+        """Return the location that localizations must overlap."""
+        return self.location
+
     def localized(self, location, problem=None):
         """Localize the spec to the overlap of its location and the new."""
         start, end = location.start, location.end
@@ -1,5 +1,6 @@
 "Implement EnforceTranslation."
 
+import numpy as np
 
 from ..Specification import SpecEvaluation
 from ..biotools import (
@@ -8,6 +9,7 @@ from ..biotools import (
     get_backtranslation_table,
 )
 from ..Location import Location
+from ..MutationSpace.codons_masks import codons_mask
 from .CodonSpecification import CodonSpecification
 
 
@@ -58,6 +60,7 @@ class EnforceTranslation(CodonSpecification):
 
     best_possible_score = 0
     enforced_by_nucleotide_restrictions = True
+    local_breaches = True
     shorthand_name = "cds"
     default_genetic_table = "Standard"
 
@@ -183,23 +186,25 @@ class EnforceTranslation(CodonSpecification):
             # has_start_codon=self.has_start_codon and location_is_at_start,
         )
 
+    def _first_codon_choices(self, sequence):
+        """Return the codons allowed for the first codon of the location."""
+        if self.start_codon is None:
+            return self.backtranslation_table[self.translation[0]]
+        elif isinstance(self.start_codon, (list, tuple)):
+            return list(self.start_codon)
+        elif self.start_codon == "keep":
+            first_codon_location = self.codon_index_to_location(0)
+            return [first_codon_location.extract_sequence(sequence)]
+        else:
+            return [self.start_codon]  # "ATG"
+
     def restrict_nucleotides(self, sequence, location=None):
         if self.backtranslation_table is None:
             return []
 
-        def get_first_codon_choices(first_codon):
-            if self.start_codon is None:
-                return self.backtranslation_table[self.translation[0]]
-            elif isinstance(self.start_codon, (list, tuple)):
-                return list(self.start_codon)
-            elif self.start_codon == "keep":
-                return [first_codon]
-            else:
-                return [self.start_codon]  # "ATG"
         first_codon_location = self.codon_index_to_location(0)
-        first_codon = first_codon_location.extract_sequence(sequence)
         choices = [
-            (first_codon_location, get_first_codon_choices(first_codon))
+            (first_codon_location, self._first_codon_choices(sequence))
         ] + [
             (self.codon_index_to_location(i), self.backtranslation_table[aa])
             for i, aa in list(enumerate(self.translation))[1:]
@@ -213,6 +218,29 @@ class EnforceTranslation(CodonSpecification):
 
         return sorted([standardize_choice(choice) for choice in choices])
 
+    def codons_masks(self, sequence):
+        if self.backtranslation_table is None:
+            return None
+        reverse = self.location.strand == -1
+        aa_masks = {
+            aa: codons_mask(self.backtranslation_table[aa], reverse=reverse)
+            for aa in set(self.translation[1:])
+        }
+        first_codon_mask = codons_mask(
+            self._first_codon_choices(sequence), reverse=reverse
+        )
+        if (first_codon_mask is None) or (None in aa_masks.values()):
+            return None
+        masks = [first_codon_mask] + [
+            aa_masks[aa] for aa in self.translation[1:]
+        ]
+        indices = np.arange(len(self.translation))
+        if reverse:
+            starts = self.location.end - 3 * (indices + 1)
+        else:
+            starts = self.location.start + 3 * indices
+        return starts, np.array(masks, dtype="uint64")
+
     def __repr__(self):
         return "EnforceTranslation(%s)" % str(self.location)
 
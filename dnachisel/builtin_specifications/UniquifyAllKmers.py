@@ -6,6 +6,7 @@ from ..Specification import Specification
 
 # from .VoidSpecification import VoidSpecification
 from ..Specification.SpecEvaluation import SpecEvaluation
+from ..Specification.IncrementalEvaluator import IncrementalEvaluator
 from ..biotools import reverse_complement
 from ..Location import Location
 
@@ -158,6 +159,29 @@ class UniquifyAllKmers(Specification):
         else:
             return self.global_evaluation(problem)
 
+    def passes(self, problem):
+        """Return whether there is no non-unique kmer.
+
+        Without localization, this stops at the first non-unique kmer found.
+        """
+        if self.localization_data is not None:
+            return self.local_evaluation(problem).passes
+        extract_kmer = self.get_kmer_extractor(problem.sequence)
+        # For each kmer seen, whether one occurence is inside the location.
+        kmers_in_location = {}
+        start, end = self.reference.start, self.reference.end
+        for i in range(start, end - self.k):
+            kmer_sequence = extract_kmer(i)
+            in_location = (
+                self.location.start <= i < i + self.k < self.location.end
+            )
+            if kmer_sequence in kmers_in_location:
+                if in_location or kmers_in_location[kmer_sequence]:
+                    return False
+            else:
+                kmers_in_location[kmer_sequence] = in_location
+        return True
+
     def local_evaluation(self, problem):
         extract_kmer = self.get_kmer_extractor(problem.sequence)
         variable_kmers = {}
@@ -260,6 +284,10 @@ class UniquifyAllKmers(Specification):
             "of non-unique segments %s" % locations,
         )
 
+    def localization_location(self):
+        """Return the location that localizations must overlap."""
+        return self.reference
+
     def localized(self, location, problem=None, with_righthand=True):
         """Localize the evaluation."""
 
@@ -292,6 +320,10 @@ class UniquifyAllKmers(Specification):
             localization_data=localization_data, location=changing_kmers_zone
         )
 
+    def incremental_evaluator(self, problem):
+        """Return an evaluator updating k-mer counts around mutations."""
+        return KmersEvaluator(self, problem)
+
     def shifted(self, shift):
         """Shift the location of the specification.
         This will also shift the reference.
@@ -310,3 +342,111 @@ class UniquifyAllKmers(Specification):
     
     def breach_label(self):
         return "%dbp homologies" % self.k
+
+
+class KmersEvaluator(IncrementalEvaluator):
+    """Incremental evaluator for UniquifyAllKmers.
+
+    Keeps the k-mer at each evaluated position and the number of occurences
+    of each k-mer, and only re-reads the k-mers overlapping mutated segments.
+    The score is the sum of the contributions of each k-mer (its number of
+    non-unique occurences), updated for the k-mers which changed.
+
+    For localized specifications, the positions evaluated are the "changing
+    indices" of the localization data, and the contributions mirror
+    ``UniquifyAllKmers.local_evaluation``.
+    """
+
+    def initialize(self):
+        spec = self.specification
+        self.kmers = {}  # index => k-mer at this index
+        self.roles = {}  # index => "location" or "extended"
+        self.counts = {
+            "location": defaultdict(int),
+            "extended": defaultdict(int),
+        }
+        if spec.localization_data is None:
+            start, end = spec.reference.start, spec.reference.end
+            location = spec.location
+            for i in range(start, end - spec.k):
+                inside = location.start <= i < i + spec.k < location.end
+                self.roles[i] = "location" if inside else "extended"
+        else:
+            for role in ("location", "extended"):
+                data = spec.localization_data[role]
+                for i in data["changing_indices"]:
+                    self.roles[i] = role
+            self.fixed_location_kmers = spec.localization_data["location"][
+                "fixed_kmers"
+            ]
+            self.fixed_extended_kmers = spec.localization_data["extended"][
+                "fixed_kmers"
+            ]
+        for i, role in self.roles.items():
+            kmer = self.read_kmer(i)
+            self.kmers[i] = kmer
+            self.counts[role][kmer] += 1
+        self.score = -sum(
+            [
+                self.kmer_contribution(kmer)
+                for kmer in set(self.kmers.values())
+            ]
+        )
+
+    def read_kmer(self, index):
+        """Return the standardized k-mer at the given index."""
+        k = self.specification.k
+        kmer = self.problem.sequence_buffer[index : index + k]
+        if self.specification.include_reverse_complement:
+            return min(kmer, reverse_complement(kmer))
+        return kmer
+
+    def kmer_contribution(self, kmer):
+        """Return the number of non-unique locations due to this k-mer."""
+        n_location = self.counts["location"].get(kmer, 0)
+        n_extended = self.counts["extended"].get(kmer, 0)
+        if self.specification.localization_data is None:
+            return n_location if (n_location + n_extended > 1) else 0
+        in_fixed_location = kmer in self.fixed_location_kmers
+        in_fixed_extended = kmer in self.fixed_extended_kmers
+        return (
+            (n_location if n_location > 1 else 0)
+            + n_location
+            * ((n_extended > 0) + in_fixed_location + in_fixed_extended)
+            + n_extended * ((n_location > 0) + in_fixed_location)
+        )
+
+    def change_kmers(self, changes):
+        """Apply changes [(index, new_kmer)...], return the reverse changes."""
+        touched_kmers = set(
+            [self.kmers[i] for i, kmer in changes]
+            + [kmer for i, kmer in changes]
+        )
+        self.score += sum([self.kmer_contribution(k) for k in touched_kmers])
+        reverse_changes = []
+        for i, kmer in changes:
+            role = self.roles[i]
+            reverse_changes.append((i, self.kmers[i]))
+            self.counts[role][self.kmers[i]] -= 1
+            self.counts[role][kmer] += 1
+            self.kmers[i] = kmer
+        self.score -= sum([self.kmer_contribution(k) for k in touched_kmers])
+        return reverse_changes[::-1]
+
+    def update(self, segments):
+        k = self.specification.k
+        indices = set(
+            i
+            for start, end in segments
+            for i in range(start - k + 1, end)
+            if i in self.roles
+        )
+        changes = []
+        for i in sorted(indices):
+            kmer = self.read_kmer(i)
+            if kmer != self.kmers[i]:
+                changes.append((i, kmer))
+        return self.change_kmers(changes)
+
+    def restore(self, reverse_changes):
+        self.change_kmers(reverse_changes)
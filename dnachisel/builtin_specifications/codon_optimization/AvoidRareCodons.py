@@ -1,7 +1,10 @@
 "Implement AvoidRareCodons."
 
+import numpy as np
+
 from ...Specification import SpecEvaluation
 from ...biotools import reverse_complement
+from ...MutationSpace.codons_masks import codons_mask
 from .BaseCodonOptimizationClass import BaseCodonOptimizationClass
 
 
@@ -126,6 +129,13 @@ class AvoidRareCodons(BaseCodonOptimizationClass):
             for i in range(self.location.start, self.location.end, 3)
         ]
 
+    def codons_masks(self, sequence):
+        mask = codons_mask(self.nonrare_codons, self.location.strand == -1)
+        if mask is None:
+            return None
+        starts = np.arange(self.location.start, self.location.end, 3)
+        return starts, np.full(len(starts), mask, dtype="uint64")
+
     def _params_string(self):
         """Parameters representation used in __repr__, __str__, etc."""
         return "%d%%, %s" % (100 * self.min_frequency, str(self.species))
@@ -1,8 +1,18 @@
+import itertools
+
 from ..CodonSpecification import CodonSpecification
+from ...Specification.IncrementalEvaluator import IncrementalEvaluator
 from python_codon_tables import get_codons_table
 import numpy as np
 from ...Location import Location
-from ...biotools import group_nearby_indices
+from ...biotools import group_nearby_indices, reverse_complement
+
+# Codes of the nucleotides A, C, G, T (other characters have code -1). The
+# index of a codon XYZ is 16 * code(X) + 4 * code(Y) + code(Z).
+NUCLEOTIDES_CODES = np.full(256, -1, dtype="int64")
+for _code, _nucleotide in enumerate("ACGT"):
+    NUCLEOTIDES_CODES[ord(_nucleotide)] = _code
+ALL_CODONS = ["".join(codon) for codon in itertools.product("ACGT", repeat=3)]
 
 
 class BaseCodonOptimizationClass(CodonSpecification):
@@ -32,6 +42,24 @@ class BaseCodonOptimizationClass(CodonSpecification):
             for i in range(int(len(subsequence) / 3))
         ]
 
+    def get_codons_indices_array(self, sequences_array):
+        """Return the indices of the codons of several sequences.
+
+        The sequences are the rows of a 2-D uint8 array (see
+        ``sequences_to_array``). The element (i, j) of the result is the index
+        in ``ALL_CODONS`` of the j-th codon of the location in the i-th
+        sequence, or -1 if this codon has non-ATGC characters.
+        """
+        location = self.location
+        sequences_array = sequences_array[:, location.start : location.end]
+        codes = NUCLEOTIDES_CODES[sequences_array]
+        if location.strand == -1:
+            codes = np.where(codes >= 0, 3 - codes, -1)[:, ::-1]
+        codes = codes.reshape((codes.shape[0], codes.shape[1] // 3, 3))
+        indices = 16 * codes[:, :, 0] + 4 * codes[:, :, 1] + codes[:, :, 2]
+        indices[(codes < 0).any(axis=2)] = -1
+        return indices
+
     @staticmethod
     def get_codons_table(species, codon_usage_table):
         if codon_usage_table is None:
@@ -90,3 +118,70 @@ class BaseCodonOptimizationClass(CodonSpecification):
         # The "new_location" already has exactly the right span and strand
         # thanks to superclass CodonSpecification
         return self.copy_with_changes(location=new_location)
+
+
+class CodonsEvaluator(IncrementalEvaluator):
+    """Base incremental evaluator for codon optimization specifications.
+
+    Keeps the list of codons of the specification's location up to date,
+    re-reading only the codons overlapping mutated segments. Subclasses
+    implement ``initialize_codons()``, ``update_codons(changes)`` (where
+    changes is a list ``[(codon_index, old_codon, new_codon), ...]``) which
+    returns some undo data, and ``restore_codons(data)``.
+    """
+
+    def initialize(self):
+        self.codons = self.specification.get_codons(self.problem)
+        self.initialize_codons()
+
+    def changed_codons_indices(self, segments):
+        """Return the sorted indices of codons overlapping the segments."""
+        location = self.specification.location
+        indices = set()
+        for start, end in segments:
+            start, end = max(start, location.start), min(end, location.end)
+            if start >= end:
+                continue
+            if location.strand == -1:
+                first = (location.end - end) // 3
+                last = (location.end - start - 1) // 3
+            else:
+                first = (start - location.start) // 3
+                last = (end - 1 - location.start) // 3
+            indices.update(range(first, min(last + 1, len(self.codons))))
+        return sorted(indices)
+
+    def read_codon(self, index):
+        """Read the index-th codon of the location in the current sequence."""
+        location = self.specification.location
+        if location.strand == -1:
+            end = location.end - 3 * index
+            codon = self.problem.sequence_buffer[end - 3 : end]
+            return reverse_complement(codon)
+        start = location.start + 3 * index
+        return self.problem.sequence_buffer[start : start + 3]
+
+    def update(self, segments):
+        changes = []
+        for index in self.changed_codons_indices(segments):
+            old_codon, new_codon = self.codons[index], self.read_codon(index)
+            if new_codon != old_codon:
+                changes.append((index, old_codon, new_codon))
+                self.codons[index] = new_codon
+        previous_score = self.score
+        return changes, self.update_codons(changes), previous_score
+
+    def restore(self, data):
+        changes, codons_data, self.score = data
+        for index, old_codon, new_codon in changes:
+            self.codons[index] = old_codon
+        self.restore_codons(codons_data)
+
+    def initialize_codons(self):
+        raise NotImplementedError()
+
+    def update_codons(self, changes):
+        raise NotImplementedError()
+
+    def restore_codons(self, data):
+        raise NotImplementedError()
@@ -115,6 +115,16 @@ class HarmonizeRCA(BaseCodonOptimizationClass):
         ]
         return new_spec
 
+    def localized_on_window(self, new_location, start_codon, end_codon):
+        """Relocate, keeping the original codons of the new window only."""
+        return self.copy_with_changes(
+            location=new_location,
+            original_codons=self.original_codons[start_codon:end_codon],
+            smallest_possible_discrepancies=(
+                self.smallest_possible_discrepancies[start_codon:end_codon]
+            ),
+        )
+
     def evaluate(self, problem):
         """Return the evaluation for mode==best_codon."""
         codons = self.get_codons(problem)
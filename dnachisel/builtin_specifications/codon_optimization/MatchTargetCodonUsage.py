@@ -2,7 +2,10 @@ import numpy as np
 from ...Specification.SpecEvaluation import SpecEvaluation
 from ...biotools import dict_to_pretty_string
 
-from .BaseCodonOptimizationClass import BaseCodonOptimizationClass
+from .BaseCodonOptimizationClass import (
+    BaseCodonOptimizationClass,
+    CodonsEvaluator,
+)
 
 
 class MatchTargetCodonUsage(BaseCodonOptimizationClass):
@@ -123,7 +126,10 @@ class MatchTargetCodonUsage(BaseCodonOptimizationClass):
         """Evaluate on a problem"""
         score, nonoptimal_indices = self.codon_usage_matching_stats(problem)
         locations = self.codons_indices_to_locations(nonoptimal_indices)
-        np.random.shuffle(locations)
+        random = problem.random_generator
+        if random is None:
+            random = np.random
+        random.shuffle(locations)
         return SpecEvaluation(
             self,
             problem,
@@ -133,6 +139,10 @@ class MatchTargetCodonUsage(BaseCodonOptimizationClass):
             % (self.location, score),
         )
 
+    def incremental_evaluator(self, problem):
+        """Return an evaluator updating codon counts from mutated codons."""
+        return CodonsUsageEvaluator(self, problem)
+
     def localized_on_window(self, new_location, start_codon, end_codon):
         """Relocate without changing much."""
         return self
@@ -212,4 +222,46 @@ class MatchTargetCodonUsage(BaseCodonOptimizationClass):
         result = "match-codon-usage"
         if self.species is not None:
             result += " (%s)" % self.species
-        return result
\ No newline at end of file
+        return result
+
+
+class CodonsUsageEvaluator(CodonsEvaluator):
+    """Incremental evaluator for MatchTargetCodonUsage.
+
+    Keeps the count of each codon in the sequence and recomputes the score
+    from these counts, the same way ``codon_usage_matching_stats`` does.
+    """
+
+    def initialize_codons(self):
+        self.counts = {
+            codon: 0 for codon in self.specification.codons_translations
+        }
+        for codon in self.codons:
+            self.counts[codon] += 1
+        self.score = self.score_from_counts()
+
+    def score_from_counts(self):
+        score = 0
+        for aa, aa_table in self.specification.codon_usage_table.items():
+            if len(aa) != 1:
+                continue
+            total = sum([self.counts[codon] for codon in aa_table])
+            if total == 0:
+                continue
+            for codon, table_frequency in aa_table.items():
+                frequency = 1.0 * self.counts[codon] / total
+                score -= total * abs(frequency - table_frequency)
+        return score
+
+    def update_codons(self, changes):
+        for index, old_codon, new_codon in changes:
+            self.counts[new_codon] += 1
+            self.counts[old_codon] -= 1
+        if len(changes):
+            self.score = self.score_from_counts()
+        return changes
+
+    def restore_codons(self, changes):
+        for index, old_codon, new_codon in changes:
+            self.counts[new_codon] -= 1
+            self.counts[old_codon] += 1
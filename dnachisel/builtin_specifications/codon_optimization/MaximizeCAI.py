@@ -1,7 +1,13 @@
 import numpy as np
 
-from .BaseCodonOptimizationClass import BaseCodonOptimizationClass
+from .BaseCodonOptimizationClass import (
+    BaseCodonOptimizationClass,
+    CodonsEvaluator,
+    ALL_CODONS,
+)
+from ...Specification.Specification import Specification
 from ...Specification.SpecEvaluation import SpecEvaluation
+from ...biotools import sequences_to_array
 
 
 class MaximizeCAI(BaseCodonOptimizationClass):
@@ -128,6 +134,117 @@ class MaximizeCAI(BaseCodonOptimizationClass):
             % (self.location, score),
         )
 
+    def evaluate_many(self, problem, candidate_sequences):
+        """Evaluate all candidates with vectorized codon lookups.
+
+        The non-optimality of each codon is read from a table indexed by the
+        codons indices (see ``get_codons_indices_array``).
+        """
+        if len(self.location) % 3:
+            return Specification.evaluate_many(
+                self, problem, candidate_sequences
+            )
+        non_optimalities = self._non_optimalities_many(candidate_sequences)
+        evaluations = []
+        for candidate, non_optimality in zip(
+            candidate_sequences, non_optimalities
+        ):
+            if np.isnan(non_optimality).any():
+                # Unknown codon: let evaluate() deal with it.
+                evaluations += Specification.evaluate_many(
+                    self, problem, [candidate]
+                )
+                continue
+            if len(non_optimality) == 1:
+                locations = [] if non_optimality[0] == 0 else [self.location]
+                score = 0 - non_optimality[0]  # as freq - optimal, not -0.0
+            else:
+                nonoptimal_indices = np.nonzero(non_optimality)[0]
+                locations = self.codons_indices_to_locations(
+                    nonoptimal_indices
+                )
+                score = -non_optimality.sum()
+            evaluations.append(
+                SpecEvaluation(
+                    self,
+                    problem,
+                    score=score,
+                    locations=locations,
+                    message="Codon opt. on window %s scored %.02E"
+                    % (self.location, score),
+                )
+            )
+        return evaluations
+
+    def scores_many(self, problem, candidate_sequences):
+        """Score all candidates with vectorized codon lookups."""
+        if len(self.location) % 3:
+            return Specification.scores_many(
+                self, problem, candidate_sequences
+            )
+        non_optimalities = self._non_optimalities_many(candidate_sequences)
+        if non_optimalities.shape[1] == 1:
+            scores = 0 - non_optimalities[:, 0]
+        else:
+            scores = -non_optimalities.sum(axis=1)
+        unknown = np.isnan(scores).nonzero()[0]
+        if len(unknown):
+            # Unknown codons: let evaluate() deal with them.
+            scores[unknown] = Specification.scores_many(
+                self, problem, [candidate_sequences[i] for i in unknown]
+            )
+        return scores
+
+    def _non_optimalities_many(self, candidate_sequences):
+        """Return the non-optimality of each codon (columns) of each candidate
+        (rows), with NaN for codons missing from the codon usage table."""
+        indices = self.get_codons_indices_array(
+            sequences_to_array(candidate_sequences)
+        )
+        return self.get_non_optimality_table()[indices]
+
+    def get_non_optimality_table(self):
+        """Return an array of the non-optimality of each codon.
+
+        The i-th value is log(fmax) - log(f) for the i-th codon in
+        ``ALL_CODONS``. The last value, for index -1, and the values of the
+        codons missing from the codon usage table, are NaN.
+        """
+        if "non_optimality_table" not in self.codon_usage_table:
+            ct = self.codons_translations
+            log_frequencies = self.codon_usage_table["log_codons_frequencies"]
+            log_best_frequencies = self.codon_usage_table[
+                "log_best_frequencies"
+            ]
+            table = np.full(len(ALL_CODONS) + 1, np.nan)
+            for i, codon in enumerate(ALL_CODONS):
+                if codon in ct:
+                    table[i] = (
+                        log_best_frequencies[ct[codon]]
+                        - log_frequencies[codon]
+                    )
+            self.codon_usage_table["non_optimality_table"] = table
+        return self.codon_usage_table["non_optimality_table"]
+
+    def prefix_score_bound(self, problem, prefix_end):
+        """Return minus the non-optimality of the codons before prefix_end.
+
+        The codons after prefix_end could all become optimal.
+        """
+        codons = self.get_codons(problem)
+        ct = self.codons_translations
+        log_frequencies = self.codon_usage_table["log_codons_frequencies"]
+        log_best_frequencies = self.codon_usage_table["log_best_frequencies"]
+        return -sum(
+            log_best_frequencies[ct[codon]] - log_frequencies[codon]
+            for i, codon in enumerate(codons)
+            if self.codon_index_to_location(i).end <= prefix_end
+        )
+
+    def incremental_evaluator(self, problem):
+        """Return an evaluator updating only the mutated codons' scores."""
+        return CodonsAdaptivenessEvaluator(self, problem)
+
     def label_parameters(self):
         return ["(custom table)" if self.species is None else self.species]
 
@@ -137,3 +254,40 @@ class MaximizeCAI(BaseCodonOptimizationClass):
             result += " (%s)" % self.species
         return result
 
+
+class CodonsAdaptivenessEvaluator(CodonsEvaluator):
+    """Incremental evaluator for MaximizeCAI.
+
+    Keeps an array of the non-optimality (log(fmax_i) - log(f_i)) of each
+    codon, whose sum is the (negative) score.
+    """
+
+    def codon_non_optimality(self, codon):
+        table = self.specification.codon_usage_table
+        aa = self.specification.codons_translations[codon]
+        return (
+            table["log_best_frequencies"][aa]
+            - table["log_codons_frequencies"][codon]
+        )
+
+    def initialize_codons(self):
+        table = self.specification.codon_usage_table
+        ct = self.specification.codons_translations
+        self.non_optimality = np.array(
+            [table["log_best_frequencies"][ct[c]] for c in self.codons]
+        ) - np.array(
+            [table["log_codons_frequencies"][c] for c in self.codons]
+        )
+        self.score = -self.non_optimality.sum()
+
+    def update_codons(self, changes):
+        previous_values = []
+        for index, old_codon, new_codon in changes:
+            previous_values.append((index, self.non_optimality[index]))
+            self.non_optimality[index] = self.codon_non_optimality(new_codon)
+        self.score = -self.non_optimality.sum()
+        return previous_values
+
+    def restore_codons(self, previous_values):
+        for index, value in reversed(previous_values):
+            self.non_optimality[index] = value
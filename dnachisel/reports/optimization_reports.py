@@ -269,6 +269,30 @@ def objectives_before_after_dataframe(problem, objectives_evaluations=None):
     return dataframe
 
 
+def skipped_locations_dataframe(problem):
+    """Return a dataframe of the locations skipped because of time limits.
+
+    See the ``time_limit`` attribute of DnaOptimizationProblem.
+    """
+    if not PANDAS_AVAILABLE:
+        raise ImportError("Install pandas to use this method.")
+    records = []
+    for role, specification, location in problem.skipped_locations:
+        label = specification.label(use_short_form=True, with_location=False)
+        start, end, _ = location.to_tuple()
+        records.append(
+            OrderedDict(
+                [
+                    ("role", role),
+                    ("specification", label),
+                    ("start", start),
+                    ("end", end),
+                ]
+            )
+        )
+    return pandas.DataFrame.from_records(records)
+
+
 def plot_optimization_changes(problem):
     if not GENEBLOCKS_AVAILABLE:
         raise ImportError("Install Geneblocks to use plot_differences()")
@@ -385,6 +409,13 @@ def write_optimization_report(
     filename = "objectives_before_and_after.csv"
     objectives_before_after.to_csv(root._file(filename).open("w"), index=False)
 
+    # LIST THE LOCATIONS SKIPPED BECAUSE OF TIME LIMITS
+
+    if len(problem.skipped_locations):
+        skipped_locations = skipped_locations_dataframe(problem)
+        filename = "skipped_locations.csv"
+        skipped_locations.to_csv(root._file(filename).open("w"), index=False)
+
     # CREATE PDF REPORT
     html = report_writer.pug_to_html(
         path=os.path.join(ASSETS_DIR, "optimization_report.pug"),
@@ -0,0 +1,75 @@
+import numpy as np
+from dnachisel import (
+    DnaOptimizationProblem,
+    AvoidPattern,
+    AvoidChanges,
+    EnforceGCContent,
+    EnforceTranslation,
+    CodonOptimize,
+    random_dna_sequence,
+    random_protein_sequence,
+    reverse_translate,
+)
+from dnachisel.MutationSpace import MutationSpace, CompactMutationSpace
+
+
+def create_problem(compact_mutation_space=False):
+    sequence = random_dna_sequence(2000, seed=123)
+    protein = reverse_translate(random_protein_sequence(200, seed=123))
+    sequence = sequence[:500] + protein + sequence[500 + len(protein) :]
+    return DnaOptimizationProblem(
+        sequence=sequence,
+        constraints=[
+            EnforceTranslation(location=(500, 1100)),
+            EnforceTranslation(location=(701, 1001, -1)),
+            AvoidPattern("BsmBI_site"),
+            AvoidChanges(location=(1500, 1600)),
+            EnforceGCContent(mini=0.3, maxi=0.7, window=50),
+        ],
+        objectives=[CodonOptimize(species="e_coli", location=(500, 1100))],
+        logger=None,
+        compact_mutation_space=compact_mutation_space,
+    )
+
+
+def describe(space):
+    return [(c.segment, sorted(c.variants)) for c in space.choices_list]
+
+
+def test_compact_mutation_space_is_equivalent():
+    problem = create_problem()
+    space = MutationSpace.from_optimization_problem(problem)
+    compact = CompactMutationSpace.from_optimization_problem(problem)
+    assert describe(compact) == describe(space)
+    assert describe(CompactMutationSpace.from_mutation_space(space)) == (
+        describe(space)
+    )
+    assert compact.unsolvable_segments == space.unsolvable_segments
+    assert compact.determined_segments == space.determined_segments
+    for location in [(0, 10), (495, 530), (690, 720), (1490, 1610), (5, 5)]:
+        local_space = space.localized(location)
+        local_compact = compact.localized(location)
+        assert describe(local_compact) == describe(local_space)
+        assert local_compact.space_size == local_space.space_size
+        assert local_compact.choices_span == local_space.choices_span
+
+    sequence = random_dna_sequence(len(problem.sequence), seed=1)
+    np.random.seed(123)
+    constrained = space.constrain_sequence(sequence)
+    mutations = space.pick_random_mutations(5, constrained)
+    np.random.seed(123)
+    assert compact.constrain_sequence(sequence) == constrained
+    assert compact.pick_random_mutations(5, constrained) == mutations
+
+
+def test_compact_mutation_space_in_problem():
+    sequences = []
+    for compact in [False, True]:
+        np.random.seed(123)
+        problem = create_problem(compact_mutation_space=compact)
+        problem.resolve_constraints()
+        problem.optimize()
+        assert problem.all_constraints_pass()
+        sequences.append(problem.sequence)
+    assert isinstance(problem.mutation_space, CompactMutationSpace)
+    assert sequences[0] == sequences[1]
@@ -1,4 +1,8 @@
+import numpy as np
+import pytest
+from dnachisel import Location
 from dnachisel.MutationSpace import MutationChoice, MutationSpace
+from dnachisel.DnaOptimizationProblem import SequenceBuffer
 
 
 def test_mutation_choice_extract_varying_region():
@@ -15,6 +19,20 @@ def test_mutation_choice_extract_varying_region():
     assert [c.segment for c in choices] == [(5, 6), (6, 12)]
 
 
+def test_mutation_choice_merge_with():
+    choice = MutationChoice((2, 5), {"ATT", "ATA"})
+    others = [
+        MutationChoice((0, 3), {"GTA", "GCT", "GTT"}),
+        MutationChoice((3, 4), {"A", "T", "G", "C"}),
+        MutationChoice((4, 7), {"ATG", "ACC", "CTG"}),
+    ]
+    merged = choice.merge_with(others)
+    assert merged.segment == (0, 7)
+    assert merged.variants == {"GTATACC", "GTATATG"}
+    with pytest.raises(ValueError):
+        choice.merge_with(others, max_variants=1)
+
+
 def test_mutation_choice_io():
     choice = MutationChoice((5, 12), ["ATGCGTG", "AAAAACC", "AAATGTG", "ATGAATG"])
     assert "ATGCGTG-AAAAACC-AAATGTG-ATGAATG" in str(choice)
@@ -31,3 +49,175 @@ def test_mutation_space():
     loc, seq = space.pick_random_mutations(n_mutations=1, sequence="ATTTC")[0]
     assert loc in [loc1, loc2]
     assert seq in (seqs1 + seqs2)
+
+
+def test_depth_first_variants():
+    loc1, seqs1 = (0, 2), ["AT", "TG"]
+    loc2, seqs2 = (2, 5), ["TTC", "TTA", "TTT"]
+    loc3, seqs3 = (5, 6), ["A", "C"]
+    c1 = MutationChoice(loc1, seqs1)
+    c2 = MutationChoice(loc2, seqs2)
+    c3 = MutationChoice(loc3, seqs3)
+    space = MutationSpace([c1, c1, c2, c2, c2, c3])
+    sequence = "TGTTAC"
+    variants = list(space.depth_first_variants(sequence))
+    assert variants == list(space.all_variants(sequence))
+
+    partial_variant = bytearray(sequence.encode())
+
+    def prune(mutations, prefix_end):
+        for (start, end), variant in mutations:
+            partial_variant[start:end] = variant.encode()
+        return partial_variant[:prefix_end].decode().startswith("TGTTA")
+
+    pruned_variants = list(space.depth_first_variants(sequence, prune=prune))
+    assert pruned_variants == [v for v in variants if v[:5] != "TGTTA"]
+
+
+def test_gray_code_mutations():
+    loc1, seqs1 = (0, 2), ["AT", "TG"]
+    loc2, seqs2 = (2, 5), ["TTC", "TTA", "TTT"]
+    loc3, seqs3 = (5, 6), ["A", "C"]
+    c1 = MutationChoice(loc1, seqs1)
+    c2 = MutationChoice(loc2, seqs2)
+    c3 = MutationChoice(loc3, seqs3)
+    space = MutationSpace([c1, c1, c2, c2, c2, c3])
+    sequence = "ATTTCC"
+    buffer = SequenceBuffer(sequence)
+    variants = []
+    for i, mutations in enumerate(space.gray_code_mutations(sequence)):
+        if i > 0:
+            assert len(mutations) == 1
+        buffer.apply_mutations(mutations)
+        variants.append(buffer.to_string())
+    assert sorted(variants) == sorted(space.all_variants(sequence))
+
+
+def test_breach_weighted_mutations():
+    space = MutationSpace(
+        [MutationChoice((i, i + 1), {"A", "T", "G", "C"}) for i in range(20)]
+    )
+    weights = space.choices_weights([Location(5, 8)], boost=10)
+    assert np.isclose(weights.sum(), 1)
+    assert np.isclose(weights[5], 10 * weights[0])
+    assert weights[5] == weights[7]
+    assert space.choices_weights([Location(30, 40)], boost=10) is None
+    np.random.seed(123)
+    sequence = 20 * "A"
+    mutated = [
+        segment[0]
+        for i in range(100)
+        for segment, variant in space.pick_random_mutations(
+            2, sequence, weights=weights
+        )
+    ]
+    assert sum(5 <= start < 8 for start in mutated) > 100
+
+
+def test_localized_mutation_space_views():
+    import pickle
+    from dnachisel import (
+        DnaOptimizationProblem,
+        EnforceTranslation,
+        random_dna_sequence,
+    )
+
+    problem = DnaOptimizationProblem(
+        sequence=random_dna_sequence(600, seed=123),
+        constraints=[EnforceTranslation(location=(99, 399))],
+        logger=None,
+    )
+    space = problem.mutation_space
+    for location in [(0, 50), (90, 130), (200, 210), (390, 700), (20, 20)]:
+        view = space.localized(location).localized((95, 400))
+        start, end = max(location[0], 95), min(location[1], 400)
+        expected = MutationSpace(
+            space.choices_index[start:end], left_padding=start
+        )
+
+        def describe(choices):
+            return [(c.segment, sorted(c.variants)) for c in choices]
+
+        for local_space in [view, pickle.loads(pickle.dumps(view))]:
+            assert describe(local_space.choices_list) == (
+                describe(expected.choices_list)
+            )
+            assert describe(local_space.multichoices) == (
+                describe(expected.multichoices)
+            )
+            assert local_space.choices_span == expected.choices_span
+            assert np.isclose(local_space.space_size, expected.space_size)
+            assert local_space.determined_segments == (
+                expected.determined_segments
+            )
+
+
+def test_mutation_space_lazy_index():
+    import pickle
+
+    choice = MutationChoice((2, 4), {"AT", "TG", "CC"})
+    space = MutationSpace([None, None, choice, choice, None])
+    assert not space._indexed
+    space = pickle.loads(pickle.dumps(space))
+    assert not space._indexed
+    view = space.localized((0, 3))
+    assert space._indexed and view._indexed
+    assert view.choices_span == (2, 4)
+    assert np.isclose(space.space_size, 3)
+
+
+def test_codons_masks_mutation_space():
+    from dnachisel import (
+        DnaOptimizationProblem,
+        EnforceTranslation,
+        AvoidRareCodons,
+        AvoidChanges,
+        random_dna_sequence,
+    )
+    from dnachisel.MutationSpace import CompactMutationSpace
+
+    class MergedEnforceTranslation(EnforceTranslation):
+        def codons_masks(self, sequence):
+            return None
+
+    def constraints(translation_class):
+        return [
+            translation_class(location=(0, 300)),
+            translation_class(location=(150, 450, -1)),
+            translation_class(location=(301, 307)),
+            AvoidRareCodons(0.2, "e_coli", location=(30, 150)),
+            AvoidChanges(location=(400, 404)),
+        ]
+
+    def describe(space):
+        return [(c.segment, sorted(c.variants)) for c in space.choices_list]
+
+    sequence = random_dna_sequence(500, seed=123)
+    problem = DnaOptimizationProblem(
+        sequence, constraints(MergedEnforceTranslation), logger=None
+    )
+    expected = describe(problem.mutation_space)
+    problem = DnaOptimizationProblem(
+        sequence, constraints(EnforceTranslation), logger=None
+    )
+    assert describe(problem.mutation_space) == expected
+    compact = CompactMutationSpace.from_optimization_problem(problem)
+    assert describe(compact) == expected
+
+
+def test_random_variants_same_as_random_variant():
+    choices = [
+        MutationChoice((3 * i, 3 * i + 3), {"ATG", "ATA", "GTC", "CCC"})
+        for i in range(40)
+    ]
+    sequence = 20 * "ATGCCA"
+    for rng_seed in [None, 123]:
+        np.random.seed(123)
+        rng = None if rng_seed is None else np.random.default_rng(rng_seed)
+        expected = [c.random_variant(sequence, rng=rng) for c in choices]
+        np.random.seed(123)
+        rng = None if rng_seed is None else np.random.default_rng(rng_seed)
+        variants = MutationChoice.random_variants(choices, sequence, rng=rng)
+        assert variants == expected
+        for choice, variant in zip(choices, variants):
+            assert variant != sequence[choice.start : choice.end]
@@ -0,0 +1,99 @@
+from dnachisel import DnaOptimizationProblem
+from dnachisel.DnaOptimizationProblem import SequenceBuffer
+
+
+def test_sequence_buffer_edits_and_rollback():
+    buffer = SequenceBuffer("ATGCATGCAT")
+    buffer.apply_mutations([((0, 3), "TTT")])
+    checkpoint = buffer.checkpoint()
+    buffer.apply_mutations([((5, 6), "A"), ((8, 10), "GG")])
+    assert buffer.to_string() == "TTTCAAGCGG"
+    assert buffer[5:8] == "AGC"
+    buffer.rollback(checkpoint)
+    assert buffer.to_string() == "TTTCATGCAT"
+    buffer.rollback()
+    assert buffer.to_string() == "ATGCATGCAT"
+    buffer.apply_mutations([((0, 1), "C")])
+    buffer.commit()
+    buffer.rollback()
+    assert buffer.to_string() == "CTGCATGCAT"
+    assert list(buffer.as_array()[:2]) == [67, 84]
+
+
+def test_problem_sequence_is_a_view_of_the_buffer():
+    problem = DnaOptimizationProblem("atgcatgc", logger=None)
+    assert problem.sequence == "ATGCATGC"
+    problem.sequence_buffer.apply_mutations([((0, 2), "CC")])
+    assert problem.sequence == "CCGCATGC"
+    problem.sequence = "TTTTTTTT"
+    assert problem.sequence_buffer.undo_log == []
+    assert problem.sequence_buffer.to_string() == "TTTTTTTT"
+
+
+def test_edits_journal():
+    class Marker:
+        pass
+
+    buffer = SequenceBuffer("ATGCATGCAT")
+    marker = Marker()
+    assert buffer.edited_since(marker, 0, 10)
+    buffer.mark(marker)
+    buffer.apply_mutations([((2, 4), "AA")])
+    assert buffer.edited_since(marker, 3, 6)
+    assert not buffer.edited_since(marker, 4, 10)
+    # Edits rolled back before any new mark cancel out.
+    buffer.rollback()
+    assert not buffer.edited_since(marker, 0, 10)
+    assert buffer.edits == []
+    buffer.replace("ATGCATGGGT")
+    assert buffer.edits == [(7, 9)]
+    buffer.mark(marker)
+    assert not buffer.edited_since(marker, 0, 10)
+
+
+def test_edits_journal_is_compacted():
+    class Marker:
+        pass
+
+    class SmallJournalBuffer(SequenceBuffer):
+        max_journal_length = 10
+
+    buffer = SmallJournalBuffer("ATGCATGCAT")
+    old_marker, new_marker = Marker(), Marker()
+    buffer.mark(old_marker)
+    for i in range(100):
+        buffer.apply_mutations([((i % 10, i % 10 + 1), "C")])
+        buffer.commit()
+        buffer.mark(new_marker)
+    assert len(buffer.edits) <= 10
+    assert buffer.edited_since(old_marker, 0, 1)
+    assert not buffer.edited_since(new_marker, 0, 10)
+    # Without marks, edits are not recorded.
+    buffer.unmark(new_marker)
+    buffer.apply_mutations([((0, 1), "A")])
+    assert buffer.edits == []
+
+
+def test_unedited_constraints_are_not_reevaluated():
+    from dnachisel import AvoidPattern
+
+    class CountingAvoidPattern(AvoidPattern):
+        evaluations = 0
+
+        def passes(self, problem):
+            CountingAvoidPattern.evaluations += 1
+            return AvoidPattern.passes(self, problem)
+
+    problem = DnaOptimizationProblem(
+        "ATGCATGCATGCATGCATGC",
+        constraints=[CountingAvoidPattern("GGG", location=(0, 10))],
+        logger=None,
+    )
+    assert problem.all_constraints_pass()
+    assert CountingAvoidPattern.evaluations == 1
+    problem.sequence = "ATGCATGCATGCATGGGTGC"
+    assert problem.all_constraints_pass()
+    assert CountingAvoidPattern.evaluations == 1
+    problem.sequence = "ATGGGTGCATGCATGGGTGC"
+    assert not problem.all_constraints_pass()
+    assert CountingAvoidPattern.evaluations == 2
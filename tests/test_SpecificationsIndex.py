@@ -0,0 +1,31 @@
+from dnachisel import (
+    DnaOptimizationProblem,
+    AvoidPattern,
+    EnforceGCContent,
+    Location,
+)
+from dnachisel.DnaOptimizationProblem import SpecificationsIndex
+
+
+def test_specifications_index_overlapping():
+    problem = DnaOptimizationProblem(
+        sequence=1000 * "A",
+        constraints=[
+            AvoidPattern("GGG", location=(i, i + 50))
+            for i in range(0, 900, 100)
+        ]
+        + [EnforceGCContent(mini=0, maxi=1)],
+        logger=None,
+    )
+    index = problem.constraints_index
+    assert isinstance(index, SpecificationsIndex)
+    location = Location(120, 310)
+    overlapping = index.overlapping(location)
+    expected = [
+        cst
+        for cst in problem.constraints
+        if cst.localized(location, problem=problem) is not None
+    ]
+    assert all(cst in overlapping for cst in expected)
+    assert len(overlapping) == 4  # 3 AvoidPattern + GC content (unindexed)
+    assert overlapping == [c for c in problem.constraints if c in overlapping]
@@ -89,5 +89,35 @@ def test_determinism_2():
             assert sequence == experiment_2(int(seed))
 
 
+def experiment_3(seed=123, parallel_workers=None):
+    """A short optimization using the problem's own random generator."""
+    sequence = dc.random_dna_sequence(150, seed=np.random.default_rng(seed))
+    problem = dc.DnaOptimizationProblem(
+        sequence=sequence,
+        constraints=[
+            dc.AvoidPattern("4xA"),
+            dc.EnforceGCContent(mini=0.4, maxi=0.6, window=30),
+        ],
+        objectives=[dc.EnforceGCContent(target=0.5, window=30)],
+        logger=None,
+        random_seed=seed,
+    )
+    problem.parallel_workers = parallel_workers
+    problem.random_search_chains = 2
+    problem.max_random_iters = 50
+    problem.resolve_and_optimize_by_parts()
+    return problem.sequence
+
+
+def test_problem_random_generator():
+    np.random.seed(1)
+    sequence = experiment_3(123)
+    # Neither the global random state nor the parallelization affect the
+    # results.
+    np.random.seed(2)
+    assert experiment_3(123, parallel_workers=2) == sequence
+    assert experiment_3(456) != sequence
+
+
 if __name__ == "__main__":
     create_test_sequences_files()
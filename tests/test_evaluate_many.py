@@ -0,0 +1,239 @@
+import importlib
+from types import SimpleNamespace
+
+import numpy as np
+from dnachisel import (
+    DnaOptimizationProblem,
+    AvoidBlastMatches,
+    AvoidMatches,
+    AvoidPattern,
+    EnforceGCContent,
+    EnforceTranslation,
+    MaximizeCAI,
+    UniquifyAllKmers,
+    random_dna_sequence,
+    reverse_translate,
+)
+
+
+def test_evaluate_many_default():
+    problem = DnaOptimizationProblem(
+        sequence=random_dna_sequence(200, seed=123),
+        constraints=[AvoidPattern("BsmBI_site")],
+        objectives=[EnforceGCContent(0.4, 0.6, window=50)],
+        logger=None,
+    )
+    sequence = problem.sequence
+    candidates = [random_dna_sequence(200, seed=i) for i in range(5)]
+    objective = problem.objectives[0]
+    evaluations = objective.evaluate_many(problem, candidates)
+    assert problem.sequence == sequence
+    for candidate, evaluation in zip(candidates, evaluations):
+        problem.sequence = candidate
+        assert evaluation.score == objective.evaluate(problem).score
+
+
+def create_batched_cds_problem(evaluation_batch_size, randomization_threshold):
+    problem = DnaOptimizationProblem(
+        sequence=reverse_translate("MKLSPRTALLCAY"),
+        constraints=[EnforceTranslation(), AvoidPattern("TTA")],
+        objectives=[MaximizeCAI(species="e_coli")],
+        logger=None,
+    )
+    problem.evaluation_batch_size = evaluation_batch_size
+    problem.randomization_threshold = randomization_threshold
+    return problem
+
+
+def test_batched_exhaustive_search_gives_same_results():
+    sequences = []
+    for batch_size in [1, 20]:
+        problem = create_batched_cds_problem(
+            evaluation_batch_size=batch_size, randomization_threshold=10 ** 12
+        )
+        problem.resolve_constraints()
+        solution = problem.sequence
+        problem.optimize()
+        sequences.append((solution, problem.sequence))
+    assert sequences[0] == sequences[1]
+
+
+def test_batched_random_search():
+    np.random.seed(123)
+    problem = create_batched_cds_problem(
+        evaluation_batch_size=20, randomization_threshold=0
+    )
+    problem.resolve_constraints()
+    assert problem.all_constraints_pass()
+    score_before = problem.objective_scores_sum()
+    problem.optimize()
+    assert problem.all_constraints_pass()
+    assert problem.objective_scores_sum() > score_before
+
+
+def test_vectorized_evaluations():
+    sequence = random_dna_sequence(300, seed=123)
+    specifications = [
+        AvoidPattern("BsmBI_site"),
+        AvoidPattern("GGTCTC", location=(10, 200, -1)),
+        AvoidPattern("NGCN", location=(10, 200, 0)),
+        AvoidPattern("GAATTC", location=(5, 250, -1)),
+        AvoidPattern("5xA"),
+        EnforceGCContent(0.4, 0.6, window=30),
+        EnforceGCContent(0.45, 0.5),
+        MaximizeCAI("e_coli", location=(0, 150)),
+        MaximizeCAI("e_coli", location=(30, 90, -1)),
+        MaximizeCAI("e_coli", location=(30, 33, -1)),
+    ]
+    problem = DnaOptimizationProblem(
+        sequence, objectives=specifications, logger=None
+    )
+    candidates = [random_dna_sequence(300, seed=i) for i in range(20)]
+    for spec in problem.objectives:
+        evaluations = spec.evaluate_many(problem, candidates)
+        scores = spec.scores_many(problem, candidates)
+        for candidate, evaluation, score in zip(
+            candidates, evaluations, scores
+        ):
+            problem.sequence = candidate
+            expected = spec.evaluate(problem)
+            assert evaluation.score == score == expected.score
+            assert [loc.to_tuple() for loc in evaluation.locations] == [
+                loc.to_tuple() for loc in expected.locations
+            ]
+            assert evaluation.message == expected.message
+
+
+def test_passes_agrees_with_evaluate():
+    specifications = [
+        AvoidPattern("BsmBI_site"),
+        AvoidPattern("GGTCTC", location=(50, 150, -1)),
+        AvoidPattern("AAAA"),
+        EnforceGCContent(0.4, 0.6, window=50),
+        EnforceGCContent(0.3, 0.7),
+        UniquifyAllKmers(8),
+        UniquifyAllKmers(12, location=(20, 120)),
+    ]
+    for seed in range(10):
+        problem = DnaOptimizationProblem(
+            sequence=random_dna_sequence(200, seed=seed),
+            constraints=specifications,
+            logger=None,
+        )
+        for spec in problem.constraints:
+            assert spec.passes(problem) == spec.evaluate(problem).passes
+
+
+def fake_blast_sequence(sequence, subject_sequences=None, **kwargs):
+    """Mimic blast_sequence, with one record per query and subject."""
+    if isinstance(sequence, str):
+        queries = [("seq", sequence)]
+    else:
+        queries = [("seq_%d" % i, seq) for i, seq in enumerate(sequence)]
+    records = []
+    for query, query_sequence in queries:
+        for subject in subject_sequences:
+            start = query_sequence.find(subject)
+            hsps = []
+            if start >= 0:
+                hsp = SimpleNamespace(
+                    query_start=start + 1,
+                    query_end=start + len(subject),
+                    identities=len(subject),
+                )
+                hsps = [hsp]
+            alignment = SimpleNamespace(hsps=hsps)
+            record = SimpleNamespace(query=query, alignments=[alignment])
+            records.append(record)
+    if isinstance(sequence, str) and (len(records) == 1):
+        return records[0]
+    return records
+
+
+def test_avoid_blast_matches_evaluate_many(monkeypatch):
+    module = importlib.import_module(
+        "dnachisel.builtin_specifications.AvoidBlastMatches"
+    )
+    monkeypatch.setattr(module, "blast_sequence", fake_blast_sequence)
+    pattern_1 = "ACGTACGTACGTACGTACGTAC"
+    pattern_2 = "GGGCCCTTTAAAGGGCCCTTTA"
+    background = 100 * "T"
+    candidates = [
+        background,
+        background[:10] + pattern_1 + background[32:],
+        background[:50] + pattern_2 + background[72:],
+        background[:10] + pattern_1 + background[32:],
+        background[:10] + pattern_1 + pattern_2 + background[54:],
+    ]
+    for subjects in [[pattern_1], [pattern_1, pattern_2]]:
+        spec = AvoidBlastMatches(sequences=subjects, location=(5, 95))
+        problem = DnaOptimizationProblem(
+            sequence=background, objectives=[spec], logger=None
+        )
+        evaluations = spec.evaluate_many(problem, candidates)
+        assert len(evaluations) == len(candidates)
+        for candidate, evaluation in zip(candidates, evaluations):
+            problem.sequence = candidate
+            expected = spec.evaluate(problem)
+            assert evaluation.score == expected.score
+            assert evaluation.message == expected.message
+    assert [len(e.locations or []) for e in evaluations] == [0, 1, 1, 1, 2]
+
+
+def fake_align_kmers_with_bowtie(kmers, bowtie_index_path, max_mismatches=0):
+    """Mimic align_kmers_with_bowtie, with the index given as a list."""
+    return [
+        (i, 0)
+        for i, kmer in enumerate(kmers)
+        if any(kmer in sequence for sequence in bowtie_index_path)
+    ]
+
+
+def test_find_all_bowtie_matches_in_sequences(monkeypatch):
+    bowtie = importlib.import_module("dnachisel.biotools.bowtie")
+    monkeypatch.setattr(
+        bowtie, "align_kmers_with_bowtie", fake_align_kmers_with_bowtie
+    )
+    index = ["ACGTACGTAC", "GGGCCCTTTA"]
+    sequences = [
+        20 * "T",
+        5 * "T" + "ACGTACGTAC" + 5 * "T",
+        "GGGCCCTTTA" + "ACGTACGTAC",
+        5 * "T" + "ACGTACGTAC" + 5 * "T",
+        "",
+    ]
+    all_matches = bowtie.find_all_bowtie_matches_in_sequences(
+        sequences, bowtie_index_path=index, match_length=8
+    )
+    assert all_matches == [
+        bowtie.find_all_bowtie_matches(sequence, index, match_length=8)
+        for sequence in sequences
+    ]
+    assert [len(matches) for matches in all_matches] == [0, 3, 6, 3, 0]
+
+
+def test_avoid_matches_evaluate_many(monkeypatch):
+    bowtie = importlib.import_module("dnachisel.biotools.bowtie")
+    monkeypatch.setattr(
+        bowtie, "align_kmers_with_bowtie", fake_align_kmers_with_bowtie
+    )
+    index = ["CGTCTCAAGG", "TGCACATTGC"]
+    spec = AvoidMatches(match_length=6, bowtie_index=index, location=(5, 55))
+    background = 60 * "A"
+    candidates = [
+        background,
+        background[:10] + "CGTCTC" + background[16:],
+        background[:10] + "CGTCTC" + background[16:30] + "TGCACA" + 24 * "A",
+        background[:10] + "CGTCTC" + background[16:],
+        2 * "CGTCTC" + background[12:],
+    ]
+    problem = DnaOptimizationProblem(
+        sequence=background, objectives=[spec], logger=None
+    )
+    evaluations = spec.evaluate_many(problem, candidates)
+    for candidate, evaluation in zip(candidates, evaluations):
+        problem.sequence = candidate
+        expected = spec.evaluate(problem)
+        assert evaluation.score == expected.score
+        assert evaluation.message == expected.message
+    assert [len(e.locations or []) for e in evaluations] == [0, 3, 4, 3, 3]
@@ -0,0 +1,52 @@
+import numpy as np
+from dnachisel import (
+    DnaOptimizationProblem,
+    AvoidPattern,
+    EnforceTranslation,
+    MaximizeCAI,
+    random_dna_sequence,
+    reverse_translate,
+)
+
+
+def test_exhaustive_resolution_with_large_space():
+    problem = DnaOptimizationProblem(
+        sequence=random_dna_sequence(50, seed=123),
+        constraints=[AvoidPattern("T"), AvoidPattern("GG")],
+        logger=None,
+    )
+    # The space has 4**50 variants, but most are pruned early.
+    problem.randomization_threshold = 10 ** 40
+    problem.resolve_constraints()
+    assert problem.all_constraints_pass()
+
+
+def test_exhaustive_optimization_with_bounds():
+    np.random.seed(123)
+    problem = DnaOptimizationProblem(
+        sequence=reverse_translate("MKLWSPRTALLCAY"),
+        constraints=[EnforceTranslation()],
+        objectives=[MaximizeCAI(species="e_coli")],
+        logger=None,
+    )
+    problem.randomization_threshold = 10 ** 12
+    problem.optimize_by_exhaustive_search()
+    assert problem.objective_scores_sum() == 0
+
+
+def test_gray_code_exhaustive_search():
+    np.random.seed(123)
+    problem = DnaOptimizationProblem(
+        sequence=reverse_translate("MKLSPRTALLCAY"),
+        constraints=[EnforceTranslation(), AvoidPattern("TTA")],
+        objectives=[MaximizeCAI(species="e_coli")],
+        logger=None,
+    )
+    problem.exhaustive_search_order = "gray_code"
+    problem.randomization_threshold = 10 ** 12
+    problem.resolve_constraints()
+    assert problem.all_constraints_pass()
+    score_before = problem.objective_scores_sum()
+    problem.optimize()
+    assert problem.all_constraints_pass()
+    assert problem.objective_scores_sum() >= score_before
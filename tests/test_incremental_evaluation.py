@@ -0,0 +1,102 @@
+"""Check that incremental evaluators give the same scores as evaluate()."""
+
+import numpy as np
+import pytest
+import dnachisel as dc
+from dnachisel import (
+    DnaOptimizationProblem,
+    EnforceTranslation,
+    EnforceGCContent,
+    AvoidPattern,
+    MaximizeCAI,
+    MatchTargetCodonUsage,
+    UniquifyAllKmers,
+    Location,
+)
+
+
+def check_evaluator(problem, specification, n_iterations=200):
+    evaluator = specification.incremental_evaluator(problem)
+    assert evaluator is not None
+    for i in range(n_iterations):
+        score_before = evaluator.score
+        problem.apply_random_mutations([evaluator])
+        assert evaluator.score == specification.evaluate(problem).score
+        if i % 3:
+            problem.rollback_mutations([evaluator])
+            assert evaluator.score == score_before
+            assert evaluator.score == specification.evaluate(problem).score
+        else:
+            problem.commit_mutations([evaluator])
+
+
+@pytest.mark.parametrize(
+    "specification",
+    [
+        EnforceGCContent(mini=0.4, maxi=0.6, window=30),
+        EnforceGCContent(mini=0.45, maxi=0.55),
+        EnforceGCContent(target=0.5, window=20, location=(10, 200)),
+        AvoidPattern("BsmBI_site"),
+        AvoidPattern("3xA", location=(0, 150, -1)),
+        AvoidPattern("GGNCC", location=(30, 270)),
+        MaximizeCAI(species="e_coli"),
+        MaximizeCAI(species="e_coli", location=(0, 150, -1)),
+        MatchTargetCodonUsage(species="e_coli"),
+        UniquifyAllKmers(5),
+        UniquifyAllKmers(
+            4, location=(50, 150), include_reverse_complement=False
+        ),
+    ],
+)
+def test_incremental_evaluators(specification):
+    np.random.seed(123)
+    sequence = dc.random_dna_sequence(300)
+    problem = DnaOptimizationProblem(
+        sequence,
+        constraints=[EnforceTranslation()],
+        objectives=[specification],
+        logger=None,
+    )
+    problem.mutations_per_iteration = 3
+    check_evaluator(problem, problem.objectives[0])
+
+
+def test_localized_uniquify_all_kmers_evaluator():
+    np.random.seed(123)
+    sequence = dc.random_dna_sequence(300)
+    problem = DnaOptimizationProblem(
+        sequence, objectives=[UniquifyAllKmers(5)], logger=None
+    )
+    location = Location(100, 130)
+    localized = problem.objectives[0].localized(location, problem=problem)
+    local_problem = DnaOptimizationProblem(
+        problem.sequence,
+        mutation_space=problem.mutation_space.localized(location),
+        logger=None,
+    )
+    check_evaluator(local_problem, localized)
+
+
+def test_incremental_evaluation_gives_the_same_solutions():
+    sequences = []
+    for incremental_evaluation in [False, True]:
+        problem = DnaOptimizationProblem(
+            sequence=dc.random_dna_sequence(1200, seed=123),
+            constraints=[
+                AvoidPattern("BsmBI_site"),
+                EnforceGCContent(mini=0.35, maxi=0.65, window=50),
+                EnforceTranslation(location=(300, 900)),
+            ],
+            objectives=[
+                MaximizeCAI(species="e_coli", location=(300, 900)),
+                EnforceGCContent(target=0.5, window=100),
+            ],
+            logger=None,
+        )
+        problem.incremental_evaluation = incremental_evaluation
+        problem.max_random_iters = 200
+        np.random.seed(123)
+        problem.resolve_constraints()
+        problem.optimize()
+        sequences.append(problem.sequence)
+    assert sequences[0] == sequences[1]
@@ -0,0 +1,86 @@
+import numpy as np
+from dnachisel import (
+    DnaOptimizationProblem,
+    EnforceGCContent,
+    EnforceTranslation,
+    MaximizeCAI,
+    random_protein_sequence,
+    reverse_translate,
+)
+
+
+def create_cds_problem_with_strategy(strategy):
+    protein = random_protein_sequence(100, seed=123)
+    problem = DnaOptimizationProblem(
+        sequence=reverse_translate(protein),
+        constraints=[
+            EnforceTranslation(),
+            EnforceGCContent(0.3, 0.7, window=50),
+        ],
+        objectives=[MaximizeCAI(species="e_coli")],
+        logger=None,
+    )
+    problem.local_search_strategy = strategy
+    problem.randomization_threshold = 0
+    problem.max_random_iters = 300
+    return problem
+
+
+def test_local_search_strategies():
+    for strategy in ["hill_climbing", "simulated_annealing", "tabu_search"]:
+        np.random.seed(123)
+        problem = create_cds_problem_with_strategy(strategy)
+        problem.resolve_constraints()
+        score_before = problem.objective_scores_sum()
+        problem.optimize()
+        assert problem.all_constraints_pass()
+        assert problem.objective_scores_sum() > score_before
+
+
+def test_custom_local_search_strategy():
+    calls = []
+
+    def strategy(problem):
+        calls.append(problem.sequence)
+
+    problem = create_cds_problem_with_strategy(strategy)
+    problem.resolve_constraints()
+    sequence = problem.sequence
+    problem.optimize()
+    assert len(calls) > 0
+    assert problem.sequence == sequence
+
+
+def test_adaptive_search():
+    np.random.seed(123)
+    problem = create_cds_problem_with_strategy("hill_climbing")
+    problem.adaptive_search = True
+    problem.randomization_threshold = 10000
+    problem.resolve_constraints()
+    score_before = problem.objective_scores_sum()
+    problem.optimize()
+    assert problem.all_constraints_pass()
+    assert problem.objective_scores_sum() > score_before
+    assert any("search" in log for log in problem.logger.logs)
+
+    problem.mutations_per_iteration = 2
+    problem.adapt_mutations_per_iteration(0.5)
+    assert problem.mutations_per_iteration == 3
+    problem.adapt_mutations_per_iteration(0.0)
+    problem.adapt_mutations_per_iteration(0.0)
+    problem.adapt_mutations_per_iteration(0.0)
+    assert problem.mutations_per_iteration == 1
+
+
+def test_adaptive_search_is_reproducible():
+    results = []
+    for _ in range(2):
+        np.random.seed(123)
+        problem = create_cds_problem_with_strategy("hill_climbing")
+        problem.adaptive_search = True
+        problem.randomization_threshold = 10000
+        problem.resolve_constraints()
+        problem.optimize()
+        logs = [log for log in problem.logger.logs if "search" in log]
+        results.append((problem.sequence, logs))
+    assert results[0] == results[1]
@@ -0,0 +1,45 @@
+import numpy as np
+from dnachisel import (
+    DnaOptimizationProblem,
+    AvoidPattern,
+    LocalSolutionsCache,
+    random_dna_sequence,
+)
+
+
+def create_repeated_bsmbi_sites_problem(cache):
+    np.random.seed(123)
+    part = random_dna_sequence(50, seed=123) + "CGTCTC"
+    # Remove the BsmBI sites of the part itself, so all repeats are alike.
+    part = part.replace("GAGACG", "GAGTCG")
+    problem = DnaOptimizationProblem(
+        sequence=10 * part,
+        constraints=[AvoidPattern("BsmBI_site")],
+        logger=None,
+    )
+    problem.local_solutions_cache = cache
+    return problem
+
+
+def test_local_solutions_cache():
+    cache = LocalSolutionsCache()
+    problem = create_repeated_bsmbi_sites_problem(cache)
+    problem.resolve_constraints()
+    assert problem.all_constraints_pass()
+    assert cache.hits > 0
+    assert len(cache.solutions) < 10
+
+    # The cache can be shared with another problem.
+    hits = cache.hits
+    problem = create_repeated_bsmbi_sites_problem(cache)
+    problem.resolve_constraints()
+    assert problem.all_constraints_pass()
+    assert cache.hits >= hits + 10
+
+
+def test_local_solutions_cache_max_size():
+    cache = LocalSolutionsCache(max_size=1)
+    problem = create_repeated_bsmbi_sites_problem(cache)
+    problem.resolve_constraints()
+    assert problem.all_constraints_pass()
+    assert len(cache.solutions) == 1
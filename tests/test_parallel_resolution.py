@@ -0,0 +1,50 @@
+import numpy as np
+from dnachisel import (
+    DnaOptimizationProblem,
+    AvoidPattern,
+    EnforceGCContent,
+    random_dna_sequence,
+)
+
+
+def create_bsmbi_and_gc_problem(parallel_workers):
+    problem = DnaOptimizationProblem(
+        sequence=random_dna_sequence(20000, seed=123),
+        constraints=[
+            AvoidPattern("BsmBI_site"),
+            EnforceGCContent(mini=0.3, maxi=0.7, window=50),
+        ],
+        logger=None,
+    )
+    problem.parallel_workers = parallel_workers
+    return problem
+
+
+def test_independent_breaches_groups():
+    problem = create_bsmbi_and_gc_problem(2)
+    constraint = problem.constraints[0]
+    locations = sorted(constraint.evaluate(problem).locations)
+    groups = problem.independent_breaches_groups(constraint, locations)
+    assert len(groups) > 1
+    assert sorted(loc for group in groups for loc in group) == locations
+
+
+def test_global_constraint_prevents_grouping():
+    problem = create_bsmbi_and_gc_problem(2)
+    problem.constraints.append(EnforceGCContent(mini=0.3, maxi=0.7))
+    problem.initialize()
+    constraint = problem.constraints[0]
+    locations = sorted(constraint.evaluate(problem).locations)
+    groups = problem.independent_breaches_groups(constraint, locations)
+    assert len(groups) == 1
+
+
+def test_parallel_resolution_is_reproducible():
+    sequences = []
+    for workers in [2, 3]:
+        problem = create_bsmbi_and_gc_problem(workers)
+        np.random.seed(123)
+        problem.resolve_constraints()
+        assert problem.all_constraints_pass()
+        sequences.append(problem.sequence)
+    assert sequences[0] == sequences[1]
@@ -0,0 +1,92 @@
+import numpy as np
+from dnachisel import (
+    DnaOptimizationProblem,
+    AvoidPattern,
+    EnforceGCContent,
+    EnforceTranslation,
+    CodonOptimize,
+    random_protein_sequence,
+    reverse_translate,
+)
+
+
+def create_three_genes_problem(with_global_constraint=False):
+    genes = [
+        reverse_translate(random_protein_sequence(200, seed=i))
+        for i in range(3)
+    ]
+    spacer = 100 * "A"
+    sequence = spacer.join(genes)
+    locations = []
+    for i, gene in enumerate(genes):
+        start = i * (600 + len(spacer))
+        locations.append((start, start + len(gene)))
+    constraints = [
+        EnforceTranslation(location=location) for location in locations
+    ] + [
+        EnforceGCContent(mini=0.4, maxi=0.6, window=60, location=location)
+        for location in locations
+    ]
+    if with_global_constraint:
+        constraints.append(AvoidPattern("BsmBI_site"))
+    return DnaOptimizationProblem(
+        sequence=sequence,
+        constraints=constraints,
+        objectives=[
+            CodonOptimize(species="e_coli", location=location)
+            for location in locations
+        ],
+        logger=None,
+    )
+
+
+def test_independent_zones():
+    problem = create_three_genes_problem()
+    zones = problem.independent_zones()
+    assert [(z.start, z.end) for z in zones] == [
+        (0, 600),
+        (700, 1300),
+        (1400, 2000),
+    ]
+    # AvoidPattern has a global location, which links everything.
+    problem = create_three_genes_problem(with_global_constraint=True)
+    assert [(z.start, z.end) for z in problem.independent_zones()] == [
+        (0, 2000)
+    ]
+
+
+def test_resolve_and_optimize_by_parts():
+    sequences = []
+    for parallel_workers in [None, 2]:
+        problem = create_three_genes_problem()
+        problem.parallel_workers = parallel_workers
+        np.random.seed(123)
+        problem.resolve_and_optimize_by_parts()
+        assert problem.all_constraints_pass()
+        assert problem.sequence[600:700] == 100 * "A"
+        sequences.append(problem.sequence)
+    assert sequences[0] == sequences[1]
+    assert sequences[0] != create_three_genes_problem().sequence
+
+
+def test_resolve_by_parts_keeps_global_random_state():
+    # Only the subproblems' seeds are drawn from the global random state.
+    problem = create_three_genes_problem()
+    np.random.seed(123)
+    problem.spawn_random_seeds(3)
+    expected = np.random.random()
+    np.random.seed(123)
+    problem.resolve_and_optimize_by_parts(optimize=False)
+    assert np.random.random() == expected
+
+
+def test_resolve_by_parts_with_time_limit():
+    problem = create_three_genes_problem()
+    problem.time_limit = 0
+    problem.resolve_and_optimize_by_parts()
+    assert not problem.all_constraints_pass()
+    roles = set(role for role, _, _ in problem.skipped_locations)
+    assert roles == {"constraint", "objective"}
+    specifications = problem.constraints + problem.objectives
+    for role, specification, location in problem.skipped_locations:
+        assert specification in specifications
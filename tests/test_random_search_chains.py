@@ -0,0 +1,75 @@
+import numpy as np
+from dnachisel import (
+    DnaOptimizationProblem,
+    AvoidPattern,
+    EnforceGCContent,
+    EnforceTranslation,
+    MaximizeCAI,
+    NoSolutionError,
+    random_protein_sequence,
+    reverse_translate,
+)
+
+
+def create_cds_problem_with_chains(chains, parallel_workers=None):
+    protein = random_protein_sequence(100, seed=123)
+    problem = DnaOptimizationProblem(
+        sequence=reverse_translate(protein),
+        constraints=[
+            EnforceTranslation(),
+            AvoidPattern("BsmBI_site"),
+            EnforceGCContent(0.3, 0.7, window=50),
+        ],
+        objectives=[MaximizeCAI(species="e_coli")],
+        logger=None,
+    )
+    problem.random_search_chains = chains
+    problem.parallel_workers = parallel_workers
+    problem.randomization_threshold = 0
+    problem.max_random_iters = 200
+    return problem
+
+
+def test_random_search_chains():
+    for chains in [1, 4]:
+        np.random.seed(123)
+        problem = create_cds_problem_with_chains(chains)
+        problem.resolve_constraints()
+        assert problem.all_constraints_pass()
+        score_before = problem.objective_scores_sum()
+        problem.optimize()
+        assert problem.all_constraints_pass()
+        assert problem.objective_scores_sum() > score_before
+
+
+def test_parallel_random_search_chains_are_reproducible():
+    sequences = []
+    for workers in [None, 2]:
+        np.random.seed(123)
+        problem = create_cds_problem_with_chains(
+            chains=3, parallel_workers=workers
+        )
+        # A global constraint prevents the parallel resolution of breaches.
+        problem.constraints.append(EnforceGCContent(0.2, 0.8))
+        problem.initialize()
+        problem.resolve_constraints()
+        problem.optimize()
+        sequences.append(problem.sequence)
+    assert sequences[0] == sequences[1]
+
+
+def test_failed_random_search_chains_are_ignored(monkeypatch):
+    def optimize_by_random_mutations(problem):
+        raise NoSolutionError("No solution", problem=problem)
+
+    monkeypatch.setattr(
+        DnaOptimizationProblem,
+        "optimize_by_random_mutations",
+        optimize_by_random_mutations,
+    )
+    np.random.seed(123)
+    problem = create_cds_problem_with_chains(chains=3)
+    problem.resolve_constraints()
+    sequence = problem.sequence
+    problem.optimize_by_random_chains(problem.objective_scores_sum())
+    assert problem.sequence == sequence
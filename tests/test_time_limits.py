@@ -0,0 +1,94 @@
+import os
+import numpy as np
+import time
+from dnachisel import (
+    DnaOptimizationProblem,
+    AvoidPattern,
+    EnforceGCContent,
+    random_dna_sequence,
+)
+
+
+def test_time_limits():
+    np.random.seed(123)
+    problem = DnaOptimizationProblem(
+        sequence=random_dna_sequence(10000, seed=123),
+        constraints=[
+            AvoidPattern("BsmBI_site"),
+            EnforceGCContent(mini=0.3, maxi=0.7, window=50),
+        ],
+        objectives=[EnforceGCContent(target=0.5, window=100)],
+        logger=None,
+    )
+    problem.time_limit = 0
+    problem.resolve_constraints()
+    assert not problem.all_constraints_pass()
+    assert len(problem.skipped_locations) > 0
+    roles = [role for role, _, _ in problem.skipped_locations]
+    assert all(role == "constraint" for role in roles)
+
+    problem.time_limit = None
+    problem.skipped_locations = []
+    problem.resolve_constraints()
+    assert problem.all_constraints_pass()
+    assert problem.skipped_locations == []
+
+    score = problem.objective_scores_sum()
+    problem.specification_time_limit = 0
+    problem.optimize()
+    assert problem.objective_scores_sum() == score
+    assert len(problem.skipped_locations) > 0
+    assert all(role == "objective" for role, _, _ in problem.skipped_locations)
+
+
+def test_optimize_with_report_after_time_limit(tmpdir, monkeypatch):
+    np.random.seed(123)
+    problem = DnaOptimizationProblem(
+        sequence=random_dna_sequence(2000, seed=123),
+        constraints=[
+            AvoidPattern("BsmBI_site"),
+            EnforceGCContent(mini=0.3, maxi=0.7, window=50),
+        ],
+        objectives=[EnforceGCContent(target=0.5, window=100)],
+        logger=None,
+    )
+    resolve_constraints = problem.resolve_constraints
+
+    def resolve_constraints_with_time_limit(final_check=True):
+        # Only the constraints resolution runs out of time.
+        problem.time_limit = 0
+        resolve_constraints(final_check=final_check)
+        problem.time_limit = None
+
+    monkeypatch.setattr(
+        problem, "resolve_constraints", resolve_constraints_with_time_limit
+    )
+    score = problem.objective_scores_sum()
+    target = os.path.join(str(tmpdir), "time_limit")
+    success, message, data = problem.optimize_with_report(target)
+    assert not success
+    assert message.startswith("Time limit reached")
+    assert problem.objective_scores_sum() > score
+    assert "objective" in [role for role, _, _ in problem.skipped_locations]
+
+
+def test_resolve_constraint_in_parallel_with_time_limit():
+    for parallel_workers in [None, 2]:
+        problem = DnaOptimizationProblem(
+            sequence=random_dna_sequence(10000, seed=123),
+            constraints=[AvoidPattern("BsmBI_site")],
+            logger=None,
+        )
+        problem.set_random_seed(123)
+        problem.parallel_workers = parallel_workers
+        sequence = problem.sequence
+        constraint = problem.constraints[0]
+        locations = constraint.evaluate(problem).locations
+        groups = problem.independent_breaches_groups(constraint, locations)
+        assert len(groups) > 1
+        problem.resolve_constraint_in_parallel(
+            constraint, groups, deadline=time.monotonic()
+        )
+        assert problem.sequence == sequence
+        skipped = [loc.to_tuple() for _, _, loc in problem.skipped_locations]
+        assert sorted(skipped) == sorted(loc.to_tuple() for loc in locations)